@@ -143,8 +143,28 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# local memory by default, a db cache table (created with createcachetable)
+# is shared across instances
+CACHES = {
+    "default": {
+        "BACKEND": get_environment_variable(
+            "DJANGO_CACHE_BACKEND",
+            default_value="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": get_environment_variable(
+            "DJANGO_CACHE_LOCATION", default_value=""
+        ),
+    }
+}
+
 SWAGGER_SETTINGS = {"JSON_EDITOR": True}
 
+# page size of the keyset paginated list endpoints
+API_PAGE_SIZE = get_int_env_value("API_PAGE_SIZE", default_value=50)
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
 
@@ -166,3 +186,55 @@ CORS_ORIGIN_WHITELIST = get_list_env_value(
 )
 
 FIELD_MAX_LENGTH = get_int_env_value("FIELD_MAX_LENGTH", default_value=1000)
+
+# number of risk model validator plans cached in process, least recently used
+# first out
+RISK_MODEL_SCHEMA_CACHE_SIZE = get_int_env_value(
+    "RISK_MODEL_SCHEMA_CACHE_SIZE", default_value=128
+)
+
+# seconds a risk model validator plan cached in process is used before its
+# schema version is checked again
+RISK_MODEL_SCHEMA_CHECK_INTERVAL = get_int_env_value(
+    "RISK_MODEL_SCHEMA_CHECK_INTERVAL", default_value=5
+)
+
+# max age in seconds of the risk model list and detail responses in the
+# browser and CDN caches, revalidated with their ETag once stale
+RISK_MODEL_CACHE_MAX_AGE = get_int_env_value(
+    "RISK_MODEL_CACHE_MAX_AGE", default_value=0
+)
+
+# alias of the django cache shared by the processes as the second tier of the
+# schema cache, the plans are only cached in process if empty
+RISK_MODEL_SCHEMA_CACHE = get_environment_variable(
+    "RISK_MODEL_SCHEMA_CACHE", default_value=""
+)
+
+# number of field values written per transaction by the bulk risk data create
+RISK_DATA_BULK_CHUNK_SIZE = get_int_env_value(
+    "RISK_DATA_BULK_CHUNK_SIZE", default_value=5000
+)
+
+# number of worker processes validating the chunks of the bulk risk data
+# create and import, validated in process if 1 or less
+RISK_DATA_VALIDATION_WORKERS = get_int_env_value(
+    "RISK_DATA_VALIDATION_WORKERS", default_value=0
+)
+
+# maintain a document per successful submission (RiskDataDocument), read by
+# the risk data retrieve and the risk model export
+RISK_DATA_PROJECTION = get_boolean_env_value(
+    "RISK_DATA_PROJECTION", default_value=False
+)
+
+# maintain the daily rollups the risk model stats are read from
+RISK_DATA_STATS_ROLLUP = get_boolean_env_value(
+    "RISK_DATA_STATS_ROLLUP", default_value=False
+)
+
+# storage of the submitted field values: "rows", a FieldValue row per field,
+# or "document", a single primary RiskDataDocument per submission
+RISK_DATA_STORAGE = get_environment_variable(
+    "RISK_DATA_STORAGE", default_value="rows"
+)
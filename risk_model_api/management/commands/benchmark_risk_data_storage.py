@@ -0,0 +1,123 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from risk_model_api import models
+from risk_model_api.utils import exports, serializer_helpers, storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the insert and read throughput of the risk data storages, "
+        "on generated submissions that are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--submissions",
+            type=int,
+            default=10000,
+            help="Number of submissions inserted per storage.",
+        )
+        parser.add_argument(
+            "--fields",
+            type=int,
+            default=10,
+            help="Number of fields of the generated risk model.",
+        )
+        parser.add_argument(
+            "--retrieves",
+            type=int,
+            default=1000,
+            help="Number of submissions retrieved one at a time per storage.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Insert with COPY, like import_risk_data.",
+        )
+
+    def handle(self, *args, **options):
+        for name in storage.STORAGES:
+            with override_settings(
+                RISK_DATA_STORAGE=name, RISK_DATA_PROJECTION=False
+            ):
+                timings = self._benchmark(options)
+            self.stdout.write(
+                "{}: {}".format(
+                    name,
+                    ", ".join(
+                        "{} {:.0f} submissions/s".format(step, rate)
+                        for step, rate in timings
+                    ),
+                )
+            )
+
+    def _benchmark(self, options):
+        """
+        times the insert, export and retrieve of generated submissions with
+        the current storage, and rolls them back
+        """
+        count = options["submissions"]
+        with transaction.atomic():
+            risk_model = models.RiskModel.objects.create(
+                name="Storage Benchmark", button="Save"
+            )
+            fields = [
+                models.FieldName.objects.create(
+                    name="Benchmark Field {}".format(i),
+                    field_type="number" if i % 2 else "text",
+                    risk_model=risk_model,
+                    order=i,
+                    # a unique field, for the cost of the unique checks
+                    unique=i == 1,
+                )
+                for i in range(1, options["fields"] + 1)
+            ]
+            submissions = (
+                {
+                    "risk_model": risk_model.id,
+                    "risk_model_name": risk_model.name,
+                    "data": {
+                        field.slug: n
+                        if field.field_type == "number"
+                        else "value {}".format(n)
+                        for field in fields
+                    },
+                }
+                for n in range(count)
+            )
+            start = time.monotonic()
+            processor = serializer_helpers.BulkRiskDataProcessor(
+                submissions, use_copy=options["copy"]
+            )
+            form_submit_ids = [
+                result["form_submit"]
+                for result in processor.create_fields_data()
+            ]
+            insert_time = time.monotonic() - start
+
+            start = time.monotonic()
+            for row in exports.export_rows(risk_model.id, fields):
+                pass
+            export_time = time.monotonic() - start
+
+            retrieved = form_submit_ids[: options["retrieves"]]
+            start = time.monotonic()
+            for form_submit_id in retrieved:
+                list(storage.submission_field_values(form_submit_id))
+            retrieve_time = time.monotonic() - start
+            transaction.set_rollback(True)
+        return [
+            ("insert", self._rate(len(form_submit_ids), insert_time)),
+            ("export", self._rate(len(form_submit_ids), export_time)),
+            ("retrieve", self._rate(len(retrieved), retrieve_time)),
+        ]
+
+    def _rate(self, count, elapsed):
+        """
+        returns the submissions per second
+        """
+        return count / elapsed if elapsed else 0
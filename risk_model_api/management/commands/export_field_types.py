@@ -0,0 +1,30 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from risk_model_api.utils import field_types
+
+# field types module of the Vue.js app, bundled by its build
+OUTPUT = os.path.join(settings.BASE_DIR, "web-app", "src", "field_types.json")
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the field types served by the field_types endpoint into the "
+        "Vue.js app, so that its build does not have to fetch them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default=OUTPUT, help="Path of the written JSON file."
+        )
+
+    def handle(self, *args, **options):
+        with open(options["output"], "wb") as f:
+            f.write(field_types.CONTENT)
+        self.stdout.write(
+            "Wrote field types version {} to {}".format(
+                field_types.VERSION, options["output"]
+            )
+        )
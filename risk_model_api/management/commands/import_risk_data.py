@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ParseError
+from rest_framework.utils import encoders
+
+from risk_model_api import models
+from risk_model_api.utils import serializer_helpers, validator_plan
+from risk_model_api.v1 import parsers
+
+# field types whose csv cells hold a JSON array
+LIST_FIELD_TYPES = ["array", "multiselect"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports risk data submissions from a CSV or NDJSON file, one "
+        "submission per row or line, keyed by field slug."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="CSV or NDJSON file to import.")
+        parser.add_argument(
+            "--risk-model",
+            type=int,
+            required=True,
+            help="Id of the risk model the data is submitted to.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="Format of the file, guessed from its extension if "
+            "omitted.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Number of field values written per transaction.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of worker processes validating the chunks, "
+            "defaults to RISK_DATA_VALIDATION_WORKERS.",
+        )
+        parser.add_argument(
+            "--rejects",
+            help="NDJSON file the rejected rows and their errors are "
+            "written to.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            risk_model = models.RiskModel.objects.get(id=options["risk_model"])
+        except models.RiskModel.DoesNotExist:
+            raise CommandError(
+                "Risk model {} does not exist".format(options["risk_model"])
+            )
+        file_format = options["format"] or (
+            "csv" if options["file"].lower().endswith(".csv") else "ndjson"
+        )
+        rejects_file = (
+            open(options["rejects"], "w") if options["rejects"] else None
+        )
+        imported = rejected = 0
+        start = time.monotonic()
+        try:
+            with open(options["file"], "rb") as f:
+                if file_format == "csv":
+                    rows = self._csv_rows(f, risk_model)
+                else:
+                    rows = parsers.NDJSONParser().iter_documents(f, "utf-8")
+                processor = serializer_helpers.BulkRiskDataProcessor(
+                    self._submissions(rows, risk_model),
+                    chunk_size=options["chunk_size"],
+                    use_copy=True,
+                    workers=options["workers"],
+                )
+                for result in processor.create_fields_data():
+                    if "errors" not in result:
+                        imported += 1
+                        continue
+                    rejected += 1
+                    if rejects_file:
+                        rejects_file.write(
+                            json.dumps(
+                                {
+                                    "row": result["index"] + 1,
+                                    "errors": result["errors"],
+                                },
+                                cls=encoders.JSONEncoder,
+                            )
+                            + "\n"
+                        )
+        finally:
+            if rejects_file:
+                rejects_file.close()
+        elapsed = time.monotonic() - start
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Imported {} submissions in {:.2f}s ({:.0f} "
+                "submissions/s)".format(imported, elapsed, rate)
+            )
+        )
+        if rejected:
+            self.stdout.write(
+                self.style.WARNING("Rejected {} rows".format(rejected))
+            )
+
+    def _csv_rows(self, f, risk_model):
+        """
+        yields the rows of a csv file as slug keyed dicts. The cells of list
+        fields are decoded from JSON.
+        """
+        plan = validator_plan.get_plan(risk_model.id)
+        lines = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        for row in csv.DictReader(lines):
+            for slug, value in row.items():
+                field = plan.fields.get(slug)
+                if field and field.field_type in LIST_FIELD_TYPES:
+                    try:
+                        row[slug] = json.loads(value) if value else None
+                    except ValueError:
+                        pass  # left to the field validation to reject
+            yield row
+
+    def _submissions(self, rows, risk_model):
+        """
+        wraps the rows into risk data submissions of the risk model
+        """
+        for row in rows:
+            if isinstance(row, ParseError):
+                yield row
+            else:
+                yield {
+                    "risk_model": risk_model.id,
+                    "risk_model_name": risk_model.name,
+                    "data": row,
+                }
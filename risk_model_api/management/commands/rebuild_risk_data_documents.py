@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from risk_model_api import models
+from risk_model_api.utils import exports, projection
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the risk data documents of the successful submissions from "
+        "their field values."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--risk-model",
+            type=int,
+            action="append",
+            dest="risk_models",
+            help="Id of a risk model to rebuild, all of them if omitted. Can "
+            "be repeated.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.RISK_DATA_BULK_CHUNK_SIZE,
+            help="Number of documents inserted at once.",
+        )
+
+    def handle(self, *args, **options):
+        risk_models = models.RiskModel.objects.order_by("id")
+        if options["risk_models"]:
+            risk_models = risk_models.filter(id__in=options["risk_models"])
+        for risk_model_id in risk_models.values_list("id", flat=True):
+            count = self._rebuild(risk_model_id, options["chunk_size"])
+            self.stdout.write(
+                "Rebuilt {} documents of risk model {}".format(
+                    count, risk_model_id
+                )
+            )
+        if not projection.projection_enabled():
+            self.stdout.write(
+                self.style.WARNING(
+                    "RISK_DATA_PROJECTION is not set, the documents will not "
+                    "be maintained on submission"
+                )
+            )
+
+    @transaction.atomic
+    def _rebuild(self, risk_model_id, chunk_size):
+        """
+        replaces the documents of a risk model, inserting them in chunks
+        """
+        # soft deleted fields included, their values are kept
+        fields = models.FieldName.all_objects.filter(
+            risk_model_id=risk_model_id
+        ).in_bulk()
+        # the primary documents are the storage of their submissions
+        models.RiskDataDocument.objects.filter(
+            risk_model_id=risk_model_id, primary=False
+        ).delete()
+        count = 0
+        documents = []
+        for (
+            form_submit_id,
+            created_on,
+            field_values,
+        ) in exports.field_value_rows(risk_model_id, chunk_size):
+            documents.append(
+                projection.build_document(
+                    form_submit_id,
+                    risk_model_id,
+                    [
+                        (field_value_id, fields[field_id], value)
+                        for field_value_id, field_id, value in field_values
+                    ],
+                )
+            )
+            if len(documents) == chunk_size:
+                count += self._insert(documents)
+                documents = []
+        return count + self._insert(documents)
+
+    def _insert(self, documents):
+        """
+        inserts documents, skipping the ones written meanwhile by new
+        submissions and the primary ones
+        """
+        models.RiskDataDocument.objects.bulk_create(
+            documents, ignore_conflicts=True
+        )
+        return len(documents)
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from risk_model_api import models
+from risk_model_api.utils import stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the daily stats rollups of the risk models from their "
+        "successful submissions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--risk-model",
+            type=int,
+            action="append",
+            dest="risk_models",
+            help="Id of a risk model to rebuild, all of them if omitted. Can "
+            "be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        risk_models = models.RiskModel.objects.order_by("id")
+        if options["risk_models"]:
+            risk_models = risk_models.filter(id__in=options["risk_models"])
+        for risk_model_id in risk_models.values_list("id", flat=True):
+            count = stats.rebuild_rollups(risk_model_id)
+            self.stdout.write(
+                "Rebuilt {} rollups of risk model {}".format(
+                    count, risk_model_id
+                )
+            )
+        if not stats.rollups_enabled():
+            self.stdout.write(
+                self.style.WARNING(
+                    "RISK_DATA_STATS_ROLLUP is not set, the rollups will not "
+                    "be maintained on submission"
+                )
+            )
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0001_initial")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=models.Index(
+                fields=["field", "value"], name="fieldvalue_field_value_idx"
+            ),
+        )
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0002_fieldvalue_field_value_idx")]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fieldname",
+            index=models.Index(
+                fields=["slug"],
+                name="fieldname_slug_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fieldname",
+            index=models.Index(
+                condition=models.Q(deleted=False),
+                fields=["risk_model", "order"],
+                name="fieldname_risk_model_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=models.Index(
+                fields=["form_submit", "id"], name="fieldvalue_form_submit_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="formsubmit",
+            index=models.Index(
+                condition=models.Q(success=True),
+                fields=["-id"],
+                name="formsubmit_success_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="formsubmit",
+            index=models.Index(
+                condition=models.Q(success=True),
+                fields=["risk_model", "-id"],
+                name="formsubmit_risk_model_idx",
+            ),
+        ),
+    ]
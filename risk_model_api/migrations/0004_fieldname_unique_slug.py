@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+def dedupe_slugs(apps, schema_editor):
+    """
+    Re-slugs the fields sharing a slug with an older non deleted field, which
+    the racy check-then-insert slug generation could leave behind.
+    """
+    FieldName = apps.get_model("risk_model_api", "FieldName")
+    fields = FieldName.objects.filter(deleted=False)
+    duplicate_slugs = (
+        fields.values("slug")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .values_list("slug", flat=True)
+    )
+    for slug in duplicate_slugs:
+        for field in fields.filter(slug=slug).order_by("id")[1:]:
+            field.slug = f"{slug[:240]}-{field.id}"
+            field.save(update_fields=["slug"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0003_hot_path_indexes")]
+
+    operations = [
+        migrations.RunPython(dedupe_slugs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="fieldname",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(deleted=False),
+                fields=("slug",),
+                name="fieldname_unique_slug",
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+import django.contrib.postgres.fields.jsonb
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0004_fieldname_unique_slug")]
+
+    operations = [
+        migrations.CreateModel(
+            name="RiskDataDocument",
+            fields=[
+                (
+                    "form_submit",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="document",
+                        serialize=False,
+                        to="risk_model_api.FormSubmit",
+                    ),
+                ),
+                ("values", django.contrib.postgres.fields.jsonb.JSONField()),
+                ("data", django.contrib.postgres.fields.jsonb.JSONField()),
+                (
+                    "risk_model",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="risk_model_api.RiskModel",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="riskdatadocument",
+            index=models.Index(
+                fields=["risk_model", "form_submit"],
+                name="riskdatadoc_risk_model_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="riskdatadocument",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["data"],
+                name="riskdatadoc_data_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0005_riskdatadocument")]
+
+    operations = [
+        migrations.AddField(
+            model_name="riskdatadocument",
+            name="primary",
+            field=models.BooleanField(default=False),
+        )
+    ]
@@ -0,0 +1,199 @@
+import ast
+import math
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.contrib.postgres.fields import ArrayField
+from django.db import migrations, models
+from django.utils import dateparse
+
+# field values updated at once
+BATCH_SIZE = 5000
+
+# typed column of the values of each field type, as of this migration
+TYPED_COLUMNS = {
+    "number": "number_value",
+    "float": "float_value",
+    "date": "date_value",
+    "time": "time_value",
+    "checkbox": "boolean_value",
+    "switch": "boolean_value",
+    "array": "array_value",
+    "multiselect": "array_value",
+}
+
+# range of the bigint number_value column
+BIGINT_RANGE = range(-(2 ** 63), 2 ** 63)
+
+
+def parse_value(field_type, value):
+    """
+    parses a stored field value into the value of its typed column, None if
+    it cannot be. A copy of the parser of the app, so that the backfilled
+    values do not depend on when the migration runs
+    """
+    if value is None:
+        return None
+    try:
+        if field_type == "number":
+            number = int(value)
+            return number if number in BIGINT_RANGE else None
+        if field_type == "float":
+            number = float(value)
+            return number if math.isfinite(number) else None
+        if field_type == "date":
+            return dateparse.parse_date(value)
+        if field_type == "time":
+            return dateparse.parse_time(value)
+        if field_type in ["checkbox", "switch"]:
+            return value == "True"
+        if field_type == "array":
+            items = ast.literal_eval(value)
+            return [str(x) for x in items] if isinstance(items, list) else None
+        if field_type == "multiselect":
+            # stored as the repr of a set
+            items = set() if value == "set()" else ast.literal_eval(value)
+            if isinstance(items, (set, list)):
+                return [str(x) for x in sorted(items, key=str)]
+    except (ValueError, TypeError, SyntaxError):
+        pass
+    return None
+
+
+def update_batch(FieldValue, connection, column, batch):
+    """
+    sets the typed column of a batch of (id, typed value) pairs in a single
+    UPDATE, joined to the unnested pairs
+    """
+    field = FieldValue._meta.get_field(column)
+    if isinstance(field, ArrayField):
+        # arrays of different lengths cannot be unnested together
+        FieldValue.objects.bulk_update(
+            [FieldValue(id=pk, **{column: value}) for pk, value in batch],
+            [column],
+        )
+        return
+    quote_name = connection.ops.quote_name
+    table = quote_name(FieldValue._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "UPDATE {table} SET {column} = v.value "
+            "FROM unnest(%s::bigint[], %s::{db_type}[]) AS v(id, value) "
+            "WHERE {table}.id = v.id".format(
+                table=table,
+                column=quote_name(field.column),
+                db_type=field.db_type(connection),
+            ),
+            [[pk for pk, _ in batch], [value for _, value in batch]],
+        )
+
+
+def populate_typed_values(apps, schema_editor):
+    """
+    parses the existing field values into the typed column of their field's
+    type, a field at a time
+    """
+    FieldName = apps.get_model("risk_model_api", "FieldName")
+    FieldValue = apps.get_model("risk_model_api", "FieldValue")
+    # soft deleted fields included, their values are kept
+    fields = FieldName.objects.filter(
+        field_type__in=TYPED_COLUMNS
+    ).values_list("id", "field_type")
+    for field_id, field_type in fields:
+        column = TYPED_COLUMNS[field_type]
+        batch = []
+        field_values = (
+            FieldValue.objects.filter(field_id=field_id, value__isnull=False)
+            .order_by("id")
+            .values_list("id", "value")
+            .iterator(chunk_size=BATCH_SIZE)
+        )
+        for pk, value in field_values:
+            batch.append((pk, parse_value(field_type, value)))
+            if len(batch) == BATCH_SIZE:
+                update_batch(
+                    FieldValue, schema_editor.connection, column, batch
+                )
+                batch = []
+        if batch:
+            update_batch(FieldValue, schema_editor.connection, column, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0006_riskdatadocument_primary")]
+
+    operations = [
+        migrations.AddField(
+            model_name="fieldvalue",
+            name="array_value",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.TextField(), null=True, size=None
+            ),
+        ),
+        migrations.AddField(
+            model_name="fieldvalue",
+            name="boolean_value",
+            field=models.BooleanField(null=True),
+        ),
+        migrations.AddField(
+            model_name="fieldvalue",
+            name="date_value",
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name="fieldvalue",
+            name="float_value",
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name="fieldvalue",
+            name="number_value",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="fieldvalue",
+            name="time_value",
+            field=models.TimeField(null=True),
+        ),
+        # the values are populated ahead of their indexes
+        migrations.RunPython(populate_typed_values, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=models.Index(
+                condition=models.Q(number_value__isnull=False),
+                fields=["field", "number_value"],
+                name="fieldvalue_number_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=models.Index(
+                condition=models.Q(float_value__isnull=False),
+                fields=["field", "float_value"],
+                name="fieldvalue_float_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=models.Index(
+                condition=models.Q(date_value__isnull=False),
+                fields=["field", "date_value"],
+                name="fieldvalue_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=models.Index(
+                condition=models.Q(time_value__isnull=False),
+                fields=["field", "time_value"],
+                name="fieldvalue_time_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["array_value"], name="fieldvalue_array_idx"
+            ),
+        ),
+    ]
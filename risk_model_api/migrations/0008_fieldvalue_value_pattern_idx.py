@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0007_fieldvalue_typed_values")]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="fieldvalue", name="fieldvalue_field_value_idx"
+        ),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=models.Index(
+                fields=["field", "value"],
+                name="fieldvalue_field_value_idx",
+                opclasses=["int4_ops", "varchar_pattern_ops"],
+            ),
+        ),
+    ]
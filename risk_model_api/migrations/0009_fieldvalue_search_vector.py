@@ -0,0 +1,64 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# sets the search vector of the values of text and textarea fields on
+# insert, and when the value or its field change
+CREATE_TRIGGER = """
+CREATE FUNCTION risk_model_api_fieldvalue_search_vector()
+RETURNS trigger AS $$
+BEGIN
+    IF NEW.value IS NOT NULL AND EXISTS (
+        SELECT 1 FROM risk_model_api_fieldname
+        WHERE id = NEW.field_id AND field_type IN ('text', 'textarea')
+    ) THEN
+        NEW.search_vector := to_tsvector('english', NEW.value);
+    ELSE
+        NEW.search_vector := NULL;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER fieldvalue_search_vector
+BEFORE INSERT OR UPDATE OF value, field_id ON risk_model_api_fieldvalue
+FOR EACH ROW EXECUTE PROCEDURE risk_model_api_fieldvalue_search_vector();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER fieldvalue_search_vector ON risk_model_api_fieldvalue;
+DROP FUNCTION risk_model_api_fieldvalue_search_vector();
+"""
+
+# the existing values, in a single statement ahead of their index
+POPULATE_SEARCH_VECTORS = """
+UPDATE risk_model_api_fieldvalue
+SET search_vector = to_tsvector('english', risk_model_api_fieldvalue.value)
+FROM risk_model_api_fieldname
+WHERE risk_model_api_fieldname.id = risk_model_api_fieldvalue.field_id
+    AND risk_model_api_fieldname.field_type IN ('text', 'textarea')
+    AND risk_model_api_fieldvalue.value IS NOT NULL;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0008_fieldvalue_value_pattern_idx")]
+
+    operations = [
+        migrations.AddField(
+            model_name="fieldvalue",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, DROP_TRIGGER),
+        migrations.RunSQL(POPULATE_SEARCH_VECTORS, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name="fieldvalue",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="fieldvalue_search_idx"
+            ),
+        ),
+    ]
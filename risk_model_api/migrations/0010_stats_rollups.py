@@ -0,0 +1,76 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0009_fieldvalue_search_vector")]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "risk_model",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="risk_model_api.RiskModel",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="FieldValueRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "value",
+                    models.CharField(blank=True, default="", max_length=1000),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+                ("total", models.FloatField(null=True)),
+                ("minimum", models.FloatField(null=True)),
+                ("maximum", models.FloatField(null=True)),
+                (
+                    "field",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        to="risk_model_api.FieldName",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="submissionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("risk_model", "day"), name="submissionrollup_day_uniq"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="fieldvaluerollup",
+            constraint=models.UniqueConstraint(
+                fields=("field", "day", "value"),
+                name="fieldvaluerollup_day_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0010_stats_rollups")]
+
+    operations = [
+        migrations.AddField(
+            model_name="riskmodel",
+            name="schema_version",
+            field=models.PositiveIntegerField(default=1),
+        )
+    ]
@@ -0,0 +1,86 @@
+from django.db import migrations
+
+# documents updated at once
+BATCH_SIZE = 1000
+
+
+def reserve_ids(FieldValue, connection, count):
+    """
+    reserves ids from the FieldValue sequence, in a single query
+    """
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [FieldValue._meta.db_table, FieldValue._meta.pk.column, count],
+        )
+        return [pk for (pk,) in cursor.fetchall()]
+
+
+def update_batch(FieldValue, RiskDataDocument, connection, batch):
+    """
+    gives the values without an id of a batch of documents an id reserved
+    from the FieldValue sequence
+    """
+    field_value_ids = iter(
+        reserve_ids(
+            FieldValue,
+            connection,
+            sum(
+                1
+                for document in batch
+                for entry in document.values
+                if entry[0] is None
+            ),
+        )
+    )
+    for document in batch:
+        document.values = [
+            [
+                next(field_value_ids)
+                if field_value_id is None
+                else field_value_id,
+                field_id,
+                value,
+            ]
+            for field_value_id, field_id, value in document.values
+        ]
+    RiskDataDocument.objects.bulk_update(batch, ["values"])
+
+
+def reserve_value_ids(apps, schema_editor):
+    """
+    gives the values of the primary documents, written without field value
+    ids, an id reserved from the FieldValue sequence
+    """
+    FieldValue = apps.get_model("risk_model_api", "FieldValue")
+    RiskDataDocument = apps.get_model("risk_model_api", "RiskDataDocument")
+    documents = (
+        RiskDataDocument.objects.filter(primary=True)
+        .order_by("form_submit_id")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    batch = []
+    for document in documents:
+        if any(entry[0] is None for entry in document.values):
+            batch.append(document)
+        if len(batch) == BATCH_SIZE:
+            update_batch(
+                FieldValue, RiskDataDocument, schema_editor.connection, batch
+            )
+            batch = []
+    if batch:
+        update_batch(
+            FieldValue, RiskDataDocument, schema_editor.connection, batch
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0011_riskmodel_schema_version")]
+
+    operations = [
+        migrations.RunPython(reserve_value_ids, migrations.RunPython.noop)
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+# moves the float aggregates of the number fields to their exact columns,
+# rebuild the rollups for the values above 2 ** 53
+MOVE_NUMBER_AGGREGATES = """
+UPDATE risk_model_api_fieldvaluerollup
+SET number_total = round(total::numeric),
+    number_minimum = round(minimum)::bigint,
+    number_maximum = round(maximum)::bigint,
+    total = NULL,
+    minimum = NULL,
+    maximum = NULL
+FROM risk_model_api_fieldname
+WHERE risk_model_api_fieldname.id = risk_model_api_fieldvaluerollup.field_id
+    AND risk_model_api_fieldname.field_type = 'number';
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("risk_model_api", "0012_riskdatadocument_value_ids")]
+
+    operations = [
+        migrations.AddField(
+            model_name="fieldvaluerollup",
+            name="number_maximum",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="fieldvaluerollup",
+            name="number_minimum",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="fieldvaluerollup",
+            name="number_total",
+            field=models.DecimalField(
+                decimal_places=0, max_digits=40, null=True
+            ),
+        ),
+        migrations.RunSQL(MOVE_NUMBER_AGGREGATES, migrations.RunSQL.noop),
+    ]
@@ -1,10 +1,19 @@
+import functools
+import operator
+
 from django.conf import settings
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 from .utils import utils
 
+# attempts at saving a FieldName with a freshly generated slug, when
+# concurrent creates take the slug first
+SLUG_SAVE_ATTEMPTS = 3
+
 FIELD_TYPES = (
     ("array", "ARRAY"),
     ("checkbox", "CHECKBOX/BOOL"),
@@ -38,12 +47,16 @@ class RiskModel(models.Model):
     """
     Risk type model.
     """
+
     client = models.ForeignKey("Client", null=True, on_delete=models.PROTECT)
     name = models.CharField(max_length=255, unique=True)
     description = models.TextField(null=True)
     success_msg = models.TextField(null=True)
     button = models.CharField(max_length=255)
     activated = models.BooleanField(default=True)
+    # bumped on every change of the risk model or its fields, versions the
+    # cached validator plans
+    schema_version = models.PositiveIntegerField(default=1)
     # deleted = models.BooleanField(
     #     default=False
     # )  # not implemented: deprioritized
@@ -56,11 +69,12 @@ class RiskModel(models.Model):
 
 class NonDeletedFieldManager(models.Manager):
     """
-    Filters out Fields marked as deleted.
+    Filters out Fields marked as deleted and lists them in ascending order
+    of the 'order' attribute.
     """
 
     def get_queryset(self):
-        return super().get_queryset().filter(deleted=False)
+        return super().get_queryset().filter(deleted=False).order_by("order")
 
 
 class DefaultFieldManager(models.Manager):
@@ -72,6 +86,84 @@ class DefaultFieldManager(models.Manager):
         return super().get_queryset()
 
 
+class FieldValueManager(models.Manager):
+    """
+    Adds bulk lookups over submitted values.
+    """
+
+    def value_key(self, field, value):
+        """
+        returns the (field id, value) key a value is stored and looked up with
+        """
+        value_field = self.model._meta.get_field("value")
+        return (field.id, value_field.get_prep_value(value))
+
+    def taken_values(self, field_values):
+        """
+        returns the positions of the (field, value) pairs whose value is
+        already taken by a successful submission, checking all the pairs in
+        one query.
+        """
+        if not field_values:
+            return set()
+        query = functools.reduce(
+            operator.or_,
+            (
+                models.Q(field=field, value=value)
+                for field, value in field_values
+            ),
+        )
+        taken_keys = set(
+            self.filter(query, form_submit__success=True).values_list(
+                "field_id", "value"
+            )
+        )
+        return {
+            i
+            for i, (field, value) in enumerate(field_values)
+            if self.value_key(field, value) in taken_keys
+        }
+
+
+class RiskDataDocumentManager(models.Manager):
+    """
+    RiskDataDocument manager
+    """
+
+    def taken_values(self, field_values):
+        """
+        returns the positions of the (field, stored value, typed value)
+        triples whose value is already taken by a successful submission
+        stored as a document, checking all the triples in one query on the
+        data index. The documents are matched on the field id, as the slug
+        of a soft deleted field can be reused.
+        """
+        if not field_values:
+            return set()
+        query = functools.reduce(
+            operator.or_,
+            (
+                models.Q(
+                    risk_model_id=field.risk_model_id,
+                    data__contains={field.slug: value},
+                )
+                for field, stored_value, value in field_values
+            ),
+        )
+        taken_keys = set()
+        for values in self.filter(
+            query, primary=True, form_submit__success=True
+        ).values_list("values", flat=True):
+            taken_keys.update(
+                (field_id, value) for _, field_id, value in values
+            )
+        return {
+            i
+            for i, (field, stored_value, value) in enumerate(field_values)
+            if (field.id, stored_value) in taken_keys
+        }
+
+
 class FieldName(models.Model):
     name = models.CharField(max_length=255)
     slug = models.CharField(max_length=255)
@@ -116,6 +208,27 @@ class FieldName(models.Model):
 
     class Meta:
         app_label = "risk_model_api"
+        indexes = [
+            # varchar_pattern_ops serves both the equality and the prefix
+            # lookups on slug
+            models.Index(
+                fields=["slug"],
+                name="fieldname_slug_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            models.Index(
+                fields=["risk_model", "order"],
+                name="fieldname_risk_model_idx",
+                condition=models.Q(deleted=False),
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["slug"],
+                condition=models.Q(deleted=False),
+                name="fieldname_unique_slug",
+            )
+        ]
 
     @classmethod
     def field_choices(cls):
@@ -125,9 +238,19 @@ class FieldName(models.Model):
         return utils.tuple_to_dict(FIELD_TYPES)
 
     def save(self, *args, **kwargs):
-        if not self.slug:
+        if self.slug:
+            return super(FieldName, self).save(*args, **kwargs)
+        for attempt in range(1, SLUG_SAVE_ATTEMPTS + 1):
             self.slug = utils.generate_unique_slug(FieldName, self.name)
-        super(FieldName, self).save(*args, **kwargs)
+            try:
+                with transaction.atomic():
+                    return super(FieldName, self).save(*args, **kwargs)
+            except IntegrityError:
+                # the unique slug constraint failed: a concurrent create took
+                # the slug, generate the next one
+                self.slug = None
+                if attempt == SLUG_SAVE_ATTEMPTS:
+                    raise
 
 
 class FormSubmit(models.Model):
@@ -141,6 +264,19 @@ class FormSubmit(models.Model):
 
     class Meta:
         app_label = "risk_model_api"
+        indexes = [
+            # successful submissions, newest first
+            models.Index(
+                fields=["-id"],
+                name="formsubmit_success_idx",
+                condition=models.Q(success=True),
+            ),
+            models.Index(
+                fields=["risk_model", "-id"],
+                name="formsubmit_risk_model_idx",
+                condition=models.Q(success=True),
+            ),
+        ]
 
 
 class FieldValue(models.Model):
@@ -151,8 +287,155 @@ class FieldValue(models.Model):
     form_submit = models.ForeignKey("FormSubmit", on_delete=models.PROTECT)
     field = models.ForeignKey("FieldName", on_delete=models.PROTECT)
     value = models.CharField(max_length=settings.FIELD_MAX_LENGTH, null=True)
+    # the value parsed by field type, for index backed range filters and
+    # aggregates. Only the column of the field's type is set, see
+    # utils.typed_values
+    number_value = models.BigIntegerField(null=True)
+    float_value = models.FloatField(null=True)
+    date_value = models.DateField(null=True)
+    time_value = models.TimeField(null=True)
+    boolean_value = models.BooleanField(null=True)
+    array_value = ArrayField(models.TextField(), null=True)
+    # full-text search vector of the values of text and textarea fields, kept
+    # in sync by the fieldvalue_search_vector trigger (migration 0009)
+    search_vector = SearchVectorField(null=True, editable=False)
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
 
+    objects = FieldValueManager()
+
+    class Meta:
+        app_label = "risk_model_api"
+        indexes = [
+            # backs the unique field value checks, and the equality and
+            # prefix filters on the values of untyped fields
+            models.Index(
+                fields=["field", "value"],
+                name="fieldvalue_field_value_idx",
+                opclasses=["int4_ops", "varchar_pattern_ops"],
+            ),
+            models.Index(
+                fields=["form_submit", "id"], name="fieldvalue_form_submit_idx"
+            ),
+            # back the range filters on the typed values of a field
+            models.Index(
+                fields=["field", "number_value"],
+                name="fieldvalue_number_idx",
+                condition=models.Q(number_value__isnull=False),
+            ),
+            models.Index(
+                fields=["field", "float_value"],
+                name="fieldvalue_float_idx",
+                condition=models.Q(float_value__isnull=False),
+            ),
+            models.Index(
+                fields=["field", "date_value"],
+                name="fieldvalue_date_idx",
+                condition=models.Q(date_value__isnull=False),
+            ),
+            models.Index(
+                fields=["field", "time_value"],
+                name="fieldvalue_time_idx",
+                condition=models.Q(time_value__isnull=False),
+            ),
+            # backs the containment lookups on array and multiselect values
+            GinIndex(fields=["array_value"], name="fieldvalue_array_idx"),
+            GinIndex(fields=["search_vector"], name="fieldvalue_search_idx"),
+        ]
+
+
+class RiskDataDocument(models.Model):
+    """
+    Document of a successful submission, one per FormSubmit. Either a
+    materialized projection of its FieldValue rows, maintained when
+    RISK_DATA_PROJECTION is set, or its primary storage with the "document"
+    RISK_DATA_STORAGE.
+    """
+
+    # the document is derived from the form submit and goes with it
+    form_submit = models.OneToOneField(
+        "FormSubmit",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="document",
+    )
+    risk_model = models.ForeignKey("RiskModel", on_delete=models.PROTECT)
+    # [field value id, field id, stored value] of the field values, in id
+    # order
+    values = JSONField()
+    # typed values keyed by field slug
+    data = JSONField()
+    # the document is the storage of the submission, which has no
+    # FieldValue rows, rather than a projection of them
+    primary = models.BooleanField(default=False)
+
+    objects = RiskDataDocumentManager()
+
+    class Meta:
+        app_label = "risk_model_api"
+        indexes = [
+            models.Index(
+                fields=["risk_model", "form_submit"],
+                name="riskdatadoc_risk_model_idx",
+            ),
+            GinIndex(
+                fields=["data"],
+                name="riskdatadoc_data_idx",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ]
+
+
+class SubmissionRollup(models.Model):
+    """
+    Daily count of the successful submissions of a risk model, maintained on
+    insert when RISK_DATA_STATS_ROLLUP is set.
+    """
+
+    risk_model = models.ForeignKey("RiskModel", on_delete=models.PROTECT)
+    day = models.DateField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        app_label = "risk_model_api"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["risk_model", "day"], name="submissionrollup_day_uniq"
+            )
+        ]
+
+
+class FieldValueRollup(models.Model):
+    """
+    Daily aggregates of the successful submissions' values of a field,
+    maintained on insert when RISK_DATA_STATS_ROLLUP is set: a count per
+    choice of select and radio fields, and the count, total, minimum and
+    maximum of number and float fields, in columns of their type.
+    """
+
+    field = models.ForeignKey("FieldName", on_delete=models.PROTECT)
+    day = models.DateField()
+    # choice of the counted values, empty for number and float fields
+    value = models.CharField(
+        max_length=settings.FIELD_MAX_LENGTH, blank=True, default=""
+    )
+    count = models.BigIntegerField(default=0)
+    # aggregates of float fields
+    total = models.FloatField(null=True)
+    minimum = models.FloatField(null=True)
+    maximum = models.FloatField(null=True)
+    # aggregates of number fields, exact as their bigint values
+    number_total = models.DecimalField(
+        max_digits=40, decimal_places=0, null=True
+    )
+    number_minimum = models.BigIntegerField(null=True)
+    number_maximum = models.BigIntegerField(null=True)
+
     class Meta:
         app_label = "risk_model_api"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["field", "day", "value"],
+                name="fieldvaluerollup_day_uniq",
+            )
+        ]
@@ -0,0 +1,449 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core import checks
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from .. import models
+from ..utils import field_types
+
+
+class ImportRiskDataTestCase(TestCase):
+    """
+    Unit tests for the import_risk_data command.
+    """
+
+    def setUp(self):
+        self.risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        self.name_field = models.FieldName.objects.create(
+            name="First Name",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=1,
+        )
+        self.age_field = models.FieldName.objects.create(
+            name="Age",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=2,
+            required=False,
+        )
+        self.tags_field = models.FieldName.objects.create(
+            name="Tags",
+            field_type="array",
+            risk_model=self.risk_model,
+            order=3,
+            required=False,
+        )
+        self.passport_field = models.FieldName.objects.create(
+            name="Passport Number",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=4,
+            unique=True,
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def import_file(self, path, **options):
+        out = StringIO()
+        call_command(
+            "import_risk_data",
+            path,
+            risk_model=self.risk_model.id,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def submitted_values(self):
+        return [
+            list(
+                form_submit.fieldvalue_set.order_by(
+                    "field__order"
+                ).values_list("value", flat=True)
+            )
+            for form_submit in models.FormSubmit.objects.order_by("id")
+        ]
+
+    def test_import_csv(self):
+        """
+        The rows of a csv file are imported as submissions, and the invalid
+        rows are reported as rejects.
+        """
+        path = self.write_file(
+            "data.csv",
+            "{},{},{},{}\n".format(
+                self.name_field.slug,
+                self.age_field.slug,
+                self.tags_field.slug,
+                self.passport_field.slug,
+            )
+            + 'John,25,"[""a"", ""b""]",A0001\n'
+            + "Jane,,,A0002\n"
+            + "Josh,eighteen,,A0003\n"
+            + "Jade,30,,A0001\n",
+        )
+        rejects = os.path.join(self.tmp_dir.name, "rejects.ndjson")
+        out = self.import_file(path, rejects=rejects)
+        self.assertIn("Imported 2 submissions", out)
+        self.assertIn("Rejected 2 rows", out)
+        self.assertEqual(
+            self.submitted_values(),
+            [
+                ["John", "25", "['a', 'b']", "A0001"],
+                ["Jane", None, None, "A0002"],
+            ],
+        )
+        with open(rejects) as f:
+            self.assertEqual(
+                [json.loads(line) for line in f],
+                [
+                    {
+                        "row": 3,
+                        "errors": {
+                            self.age_field.name: [
+                                "A valid integer is required."
+                            ]
+                        },
+                    },
+                    {
+                        "row": 4,
+                        "errors": {
+                            self.passport_field.name: [
+                                "An entry with this value already exists."
+                            ]
+                        },
+                    },
+                ],
+            )
+
+    def test_import_typed_values(self):
+        """
+        The typed columns of the imported values are written along with
+        them.
+        """
+        path = self.write_file(
+            "data.ndjson",
+            json.dumps(
+                {
+                    self.name_field.slug: "John",
+                    self.age_field.slug: 25,
+                    self.tags_field.slug: ['say "hi"', "back\\slash", "a,b"],
+                    self.passport_field.slug: "A0001",
+                }
+            )
+            + "\n",
+        )
+        self.import_file(path)
+        self.assertEqual(
+            list(
+                models.FieldValue.objects.order_by("field__order").values_list(
+                    "number_value", "array_value"
+                )
+            ),
+            [
+                (None, None),
+                (25, None),
+                (None, ['say "hi"', "back\\slash", "a,b"]),
+                (None, None),
+            ],
+        )
+
+    def test_import_ndjson(self):
+        """
+        The lines of an NDJSON file are imported as submissions, in chunks.
+        """
+        lines = [
+            json.dumps(
+                {
+                    self.name_field.slug: "John\tDoe\\",
+                    self.age_field.slug: None,
+                    self.tags_field.slug: ["a"],
+                    self.passport_field.slug: f"A000{i}",
+                }
+            )
+            for i in range(5)
+        ]
+        lines.insert(2, "{not json")
+        path = self.write_file("data.ndjson", "\n".join(lines))
+        out = self.import_file(path, chunk_size=3)
+        self.assertIn("Imported 5 submissions", out)
+        self.assertIn("Rejected 1 rows", out)
+        self.assertEqual(
+            self.submitted_values(),
+            [["John\tDoe\\", None, "['a']", f"A000{i}"] for i in range(5)],
+        )
+        self.assertEqual(
+            models.FormSubmit.objects.filter(
+                success=True, created_on__isnull=False
+            ).count(),
+            5,
+        )
+
+    def test_import_in_parallel(self):
+        """
+        The rows validated by worker processes are imported and rejected as
+        the rows validated in process, the ones the workers cannot validate
+        included.
+        """
+        rows = [
+            {
+                self.name_field.slug: "John",
+                self.age_field.slug: 25,
+                self.tags_field.slug: ["a"],
+                self.passport_field.slug: "A0001",
+            },
+            {self.name_field.slug: "Jane", self.passport_field.slug: "A0002"},
+            {
+                self.name_field.slug: "Josh",
+                self.age_field.slug: "eighteen",
+                self.passport_field.slug: "A0003",
+            },
+            {self.name_field.slug: "Jade", self.passport_field.slug: "A0001"},
+            {self.name_field.slug: "Joan", "height": 180},
+            {self.age_field.slug: 30, self.passport_field.slug: "A0004"},
+            {self.name_field.slug: "Jake", self.passport_field.slug: "A0005"},
+        ]
+        lines = [json.dumps(row) for row in rows]
+        lines.insert(3, "{not json")
+        path = self.write_file("data.ndjson", "\n".join(lines))
+        results = []
+        for workers in [0, 2]:
+            with self.subTest(workers=workers):
+                rejects = os.path.join(
+                    self.tmp_dir.name, f"rejects-{workers}.ndjson"
+                )
+                out = self.import_file(
+                    path, chunk_size=5, workers=workers, rejects=rejects
+                )
+                self.assertIn("Imported 3 submissions", out)
+                self.assertIn("Rejected 5 rows", out)
+                with open(rejects) as f:
+                    results.append(
+                        (self.submitted_values(), [json.loads(x) for x in f])
+                    )
+                models.FieldValue.objects.all().delete()
+                models.FormSubmit.objects.all().delete()
+        self.assertEqual(results[1], results[0])
+        self.assertEqual([x["row"] for x in results[0][1]], [3, 4, 5, 6, 7])
+
+    def test_import_to_unknown_risk_model(self):
+        """
+        The import fails when the risk model does not exist.
+        """
+        path = self.write_file("data.ndjson", "")
+        with self.assertRaises(CommandError):
+            call_command("import_risk_data", path, risk_model=0)
+
+
+class RebuildRiskDataDocumentsTestCase(TestCase):
+    """
+    Unit tests for the rebuild_risk_data_documents command.
+    """
+
+    def setUp(self):
+        self.risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        self.age_field = models.FieldName.objects.create(
+            name="Age",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=1,
+        )
+        self.form_submits = [
+            models.FormSubmit.objects.create(
+                risk_model=self.risk_model, success=success
+            )
+            for success in [True, True, False]
+        ]
+        models.FieldValue.objects.bulk_create(
+            [
+                models.FieldValue(
+                    form_submit=form_submit, field=self.age_field, value="25"
+                )
+                for form_submit in self.form_submits[::2]
+            ]
+        )
+
+    def test_rebuild_documents(self):
+        """
+        A document is built per successful submission, replacing the
+        existing ones.
+        """
+        models.RiskDataDocument.objects.create(
+            form_submit=self.form_submits[0],
+            risk_model=self.risk_model,
+            values=[],
+            data={},
+        )
+        out = StringIO()
+        call_command(
+            "rebuild_risk_data_documents",
+            risk_model=[self.risk_model.id],
+            stdout=out,
+        )
+        self.assertIn("Rebuilt 2 documents", out.getvalue())
+        self.assertEqual(
+            list(
+                models.RiskDataDocument.objects.order_by(
+                    "form_submit_id"
+                ).values_list("form_submit_id", "data")
+            ),
+            [
+                (self.form_submits[0].id, {self.age_field.slug: 25}),
+                (self.form_submits[1].id, {}),
+            ],
+        )
+
+    @override_settings(RISK_DATA_PROJECTION=True)
+    def test_import_maintains_documents(self):
+        """
+        The documents of the imported submissions are written along with
+        them, and match the rebuilt ones.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write(f"{self.age_field.slug}\n30\n31\n")
+            f.flush()
+            call_command(
+                "import_risk_data",
+                f.name,
+                risk_model=self.risk_model.id,
+                stdout=StringIO(),
+            )
+        imported = list(
+            models.RiskDataDocument.objects.order_by(
+                "form_submit_id"
+            ).values_list("form_submit_id", "values", "data")
+        )
+        self.assertEqual(
+            [data for _, _, data in imported],
+            [{self.age_field.slug: 30}, {self.age_field.slug: 31}],
+        )
+        call_command("rebuild_risk_data_documents", stdout=StringIO())
+        self.assertEqual(
+            list(
+                models.RiskDataDocument.objects.filter(
+                    form_submit_id__in=[x for x, _, _ in imported]
+                )
+                .order_by("form_submit_id")
+                .values_list("form_submit_id", "values", "data")
+            ),
+            imported,
+        )
+
+    @override_settings(RISK_DATA_STORAGE="document")
+    def test_rebuild_keeps_primary_documents(self):
+        """
+        The submissions imported with the document storage are stored as
+        primary documents only, which the rebuild leaves as they are.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as f:
+            f.write(f"{self.age_field.slug}\n30\n")
+            f.flush()
+            call_command(
+                "import_risk_data",
+                f.name,
+                risk_model=self.risk_model.id,
+                stdout=StringIO(),
+            )
+        imported = models.RiskDataDocument.objects.get()
+        self.assertTrue(imported.primary)
+        self.assertEqual(imported.data, {self.age_field.slug: 30})
+        self.assertFalse(
+            models.FieldValue.objects.filter(
+                form_submit_id=imported.form_submit_id
+            ).exists()
+        )
+        call_command("rebuild_risk_data_documents", stdout=StringIO())
+        self.assertEqual(
+            models.RiskDataDocument.objects.get(
+                form_submit_id=imported.form_submit_id
+            ).data,
+            {self.age_field.slug: 30},
+        )
+        self.assertEqual(
+            models.RiskDataDocument.objects.filter(primary=False).count(), 2
+        )
+
+
+class BenchmarkRiskDataStorageTestCase(TestCase):
+    """
+    Unit tests for the benchmark_risk_data_storage command.
+    """
+
+    def test_benchmark(self):
+        """
+        The throughput of each storage is reported, and the generated data
+        rolled back.
+        """
+        out = StringIO()
+        call_command(
+            "benchmark_risk_data_storage",
+            submissions=20,
+            fields=3,
+            retrieves=5,
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            [x.split(":")[0] for x in lines], ["rows", "document"]
+        )
+        self.assertIn("insert", lines[0])
+        self.assertFalse(models.RiskModel.objects.exists())
+        self.assertFalse(models.FormSubmit.objects.exists())
+
+
+class ExportFieldTypesTestCase(TestCase):
+    """
+    Unit tests for the export_field_types command.
+    """
+
+    def test_export_field_types(self):
+        """
+        The field types are written as served by the field_types endpoint.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "field_types.json")
+            out = StringIO()
+            call_command("export_field_types", output=path, stdout=out)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), field_types.CONTENT)
+        self.assertIn(field_types.VERSION, out.getvalue())
+
+    def test_web_app_field_types_are_current(self):
+        """
+        The field types bundled by the Vue.js app are the current ones, else
+        export_field_types has to be run.
+        """
+        path = os.path.join(
+            settings.BASE_DIR, "web-app", "src", "field_types.json"
+        )
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), field_types.CONTENT)
+
+
+class CheckTestCase(TestCase):
+    """
+    Unit tests for the check command.
+    """
+
+    def test_check(self):
+        """
+        The system checks of the project report no issue.
+        """
+        self.assertEqual(checks.run_checks(), [])
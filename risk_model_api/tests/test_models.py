@@ -1,5 +1,8 @@
+from unittest import mock, skipUnless
+
 from django.conf import settings
 from django.core.validators import ValidationError
+from django.db import IntegrityError, connection
 from django.test import TestCase
 
 from .. import models
@@ -116,6 +119,50 @@ class FieldNameTestCase(TestCase):
         self.assertNotEqual("long_field_1.slug", "long_field_2.slug")
         self.assertEqual(len(long_field_2.slug), 255)
 
+    def test_slug_field_concurrent_create(self):
+        """
+        A slug taken by a concurrent create, between its generation and the
+        insert, is replaced by a newly generated slug.
+        """
+        field = models.FieldName.objects.create(
+            name="Occupation",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=3,
+        )
+        generate_unique_slug = utils.generate_unique_slug
+        with mock.patch.object(
+            utils,
+            "generate_unique_slug",
+            side_effect=[field.slug, "occupation-1"],
+        ) as mocked_generate_unique_slug:
+            new_field = models.FieldName.objects.create(
+                name="Occupation",
+                field_type="text",
+                risk_model=self.risk_model,
+                order=4,
+            )
+        self.assertEqual(mocked_generate_unique_slug.call_count, 2)
+        self.assertEqual(new_field.slug, "occupation-1")
+        self.assertEqual(
+            generate_unique_slug(models.FieldName, "Occupation"),
+            "occupation-2",
+        )
+
+    def test_unique_slug_constraint(self):
+        """
+        Non deleted fields can't share a slug.
+        """
+        field = models.FieldName.objects.first()
+        with self.assertRaises(IntegrityError):
+            models.FieldName.objects.create(
+                name="Field 6",
+                slug=field.slug,
+                field_type="text",
+                risk_model=self.risk_model,
+                order=3,
+            )
+
     def test_field_choices(self):
         """
         The field types should be defined.
@@ -144,3 +191,166 @@ class FieldNameTestCase(TestCase):
             utils.tuple_to_dict(field_types),
             models.FieldName().field_choices(),
         )
+
+
+class FieldValueTestCase(TestCase):
+    """
+    Unit tests for the FieldValue model.
+    """
+
+    def setUp(self):
+        self.risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        self.email_field = models.FieldName.objects.create(
+            name="Email",
+            field_type="email",
+            risk_model=self.risk_model,
+            order=1,
+            unique=True,
+        )
+        self.phone_field = models.FieldName.objects.create(
+            name="Phone",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=2,
+            unique=True,
+        )
+        form_submit = models.FormSubmit.objects.create(
+            risk_model=self.risk_model, success=True
+        )
+        failed_form_submit = models.FormSubmit.objects.create(
+            risk_model=self.risk_model, success=False
+        )
+        models.FieldValue.objects.bulk_create(
+            [
+                models.FieldValue(
+                    form_submit=form_submit,
+                    field=self.email_field,
+                    value="josh@brite.core",
+                ),
+                models.FieldValue(
+                    form_submit=failed_form_submit,
+                    field=self.phone_field,
+                    value="0800",
+                ),
+            ]
+        )
+
+    def test_taken_values(self):
+        """
+        The positions of the values taken by successful submissions are
+        returned in a single query.
+        """
+        with self.assertNumQueries(1):
+            taken_positions = models.FieldValue.objects.taken_values(
+                [
+                    (self.email_field, "josh@brite.core"),
+                    (self.phone_field, "0800"),
+                ]
+            )
+        self.assertEqual(taken_positions, {0})
+
+    def test_taken_values_without_values(self):
+        """
+        No query is made when there are no values to check.
+        """
+        with self.assertNumQueries(0):
+            self.assertEqual(models.FieldValue.objects.taken_values([]), set())
+
+
+@skipUnless(connection.vendor == "postgresql", "Query plans of Postgres.")
+class IndexUsageTestCase(TestCase):
+    """
+    Asserts the query plans of the hot query patterns use their indexes.
+    """
+
+    def setUp(self):
+        self.risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        self.field = models.FieldName.objects.create(
+            name="Email",
+            field_type="email",
+            risk_model=self.risk_model,
+            order=1,
+        )
+        self.form_submit = models.FormSubmit.objects.create(
+            risk_model=self.risk_model, success=True
+        )
+        models.FieldValue.objects.create(
+            form_submit=self.form_submit,
+            field=self.field,
+            value="josh@brite.core",
+        )
+        # the tables are too small for the planner to prefer an index
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        self.assertIn(index_name, queryset.explain())
+
+    def test_field_name_slug_index(self):
+        """
+        FieldName lookups by slug use the slug index.
+        """
+        self.assertUsesIndex(
+            models.FieldName.all_objects.filter(slug=self.field.slug),
+            "fieldname_slug_idx",
+        )
+
+    def test_field_name_risk_model_index(self):
+        """
+        The ordered fields of a risk model are read from the partial
+        risk model index.
+        """
+        self.assertUsesIndex(
+            models.FieldName.objects.filter(
+                risk_model=self.risk_model
+            ).order_by("order"),
+            "fieldname_risk_model_idx",
+        )
+
+    def test_field_value_field_value_index(self):
+        """
+        FieldValue lookups by field and value use the field value index.
+        """
+        self.assertUsesIndex(
+            models.FieldValue.objects.filter(
+                field=self.field, value="josh@brite.core"
+            ),
+            "fieldvalue_field_value_idx",
+        )
+
+    def test_field_value_form_submit_index(self):
+        """
+        The values of a form submission, ordered by id, use the form submit
+        index.
+        """
+        self.assertUsesIndex(
+            models.FieldValue.objects.filter(
+                form_submit=self.form_submit
+            ).order_by("id"),
+            "fieldvalue_form_submit_idx",
+        )
+
+    def test_form_submit_success_index(self):
+        """
+        The latest successful submissions use the partial success index.
+        """
+        self.assertUsesIndex(
+            models.FormSubmit.objects.filter(success=True).order_by("-id"),
+            "formsubmit_success_idx",
+        )
+
+    def test_form_submit_risk_model_index(self):
+        """
+        The latest successful submissions of a risk model use the partial
+        risk model index.
+        """
+        self.assertUsesIndex(
+            models.FormSubmit.objects.filter(
+                success=True, risk_model=self.risk_model
+            ).order_by("-id"),
+            "formsubmit_risk_model_idx",
+        )
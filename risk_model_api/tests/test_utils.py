@@ -1,11 +1,33 @@
+import ast
+import datetime
+import os
+from unittest import mock
+
 from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
 from django.http import QueryDict
 from django.test import TestCase, override_settings
 
 from botocore.exceptions import ParamValidationError
+from rest_framework.exceptions import ValidationError
 
 from .. import models as models
-from ..utils import utils
+from ..utils import projection, typed_values, utils, validator_plan
+
+# standard library attributes, modules and executor keyword arguments added
+# in Python 3.7, while the project runs on Python 3.6
+PYTHON_37_ATTRIBUTES = {
+    "fromisoformat",
+    "nullcontext",
+    "monotonic_ns",
+    "perf_counter_ns",
+    "time_ns",
+    "isascii",
+    "get_running_loop",
+}
+PYTHON_37_MODULES = {"contextvars", "dataclasses", "importlib.resources"}
+PYTHON_37_EXECUTOR_KEYWORDS = {"initializer", "initargs", "mp_context"}
 
 
 class UtilsTestCase(TestCase):
@@ -92,6 +114,53 @@ class UtilsTestCase(TestCase):
         # assert 2nd slug is different from 1st slug
         self.assertNotEqual(slug_1, slug_2)
 
+    def test_generate_unique_slug_query_count(self):
+        """
+        The generate_unique_slug() method finds the next free suffix with a
+        single query, however many slugs collide.
+        """
+        risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        for order in range(1, 6):
+            models.FieldName.objects.create(
+                name="Email",
+                field_type="email",
+                risk_model=risk_model,
+                order=1,
+            )
+        # slugs that only look like suffixed slugs
+        models.FieldName.objects.create(
+            name="Email 07", field_type="text", risk_model=risk_model, order=1
+        )
+        models.FieldName.objects.create(
+            name="Email Address 9",
+            field_type="text",
+            risk_model=risk_model,
+            order=1,
+        )
+        with self.assertNumQueries(1):
+            slug = utils.generate_unique_slug(models.FieldName, "Email")
+        self.assertEqual(slug, "email-5")
+
+    def test_generate_unique_truncated_slug(self):
+        """
+        Slugs truncated to fit their suffix stay unique.
+        """
+        risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        name = "x" * 255
+        slugs = set()
+        for order in range(1, 13):
+            field = models.FieldName.objects.create(
+                name=name, field_type="text", risk_model=risk_model, order=1
+            )
+            self.assertLessEqual(len(field.slug), 255)
+            slugs.add(field.slug)
+        self.assertEqual(len(slugs), 12)
+        self.assertIn("x" * 252 + "-11", slugs)
+
     def test_generate_inmemory_text_file(self):
         """
         The inmemory_text_file() util should return an inmemory file object.
@@ -115,3 +184,471 @@ class UtilsTestCase(TestCase):
         )
         with self.assertRaisesMessage(ParamValidationError, msg):
             utils.store_file(file)
+
+
+class ValidatorPlanTestCase(TestCase):
+    """
+    Unit tests for the validator_plan module.
+    """
+
+    def setUp(self):
+        self.risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        self.field = models.FieldName.objects.create(
+            name="Age",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=1,
+        )
+
+    def test_get_plan_is_cached(self):
+        """
+        The validator plan of a risk model is compiled once and reused.
+        """
+        plan = validator_plan.get_plan(self.risk_model.id)
+        with self.assertNumQueries(0):
+            self.assertIs(validator_plan.get_plan(self.risk_model.id), plan)
+        self.assertEqual(plan.validate(self.field, "25"), 25)
+
+    def test_plan_validation_error(self):
+        """
+        Validation errors raised by the plan are keyed by the field name.
+        """
+        plan = validator_plan.get_plan(self.risk_model.id)
+        with self.assertRaisesMessage(
+            ValidationError, "A valid integer is required."
+        ) as error:
+            plan.validate(self.field, "twenty")
+        self.assertIn(self.field.name, error.exception.detail)
+
+    def test_invalidate_plan(self):
+        """
+        An invalidated plan is recompiled from the db on next use, and
+        dropped again once the change is committed.
+        """
+        plan = validator_plan.get_plan(self.risk_model.id)
+        with mock.patch.object(transaction, "on_commit") as on_commit:
+            validator_plan.invalidate_plan(self.risk_model.id)
+        self.assertIsNot(validator_plan.get_plan(self.risk_model.id), plan)
+        # a concurrent request cached the plan of the previous version
+        plan = validator_plan.get_plan(self.risk_model.id)
+        (publish,), _ = on_commit.call_args
+        publish()
+        self.assertNotIn(self.risk_model.id, validator_plan._plans)
+
+    @override_settings(RISK_MODEL_SCHEMA_CHECK_INTERVAL=0)
+    def test_plan_version_is_checked_in_process(self):
+        """
+        Without a shared tier, a cached plan is checked against the schema
+        version in the db once the check interval is over, and recompiled
+        once another process changed the schema.
+        """
+        plan = validator_plan.get_plan(self.risk_model.id)
+        with self.assertNumQueries(1):
+            self.assertIs(validator_plan.get_plan(self.risk_model.id), plan)
+        models.RiskModel.objects.filter(id=self.risk_model.id).update(
+            schema_version=2
+        )
+        self.assertEqual(
+            validator_plan.get_plan(self.risk_model.id).version, 2
+        )
+
+    @override_settings(RISK_MODEL_SCHEMA_CACHE_SIZE=1)
+    def test_plans_are_evicted_least_recently_used_first(self):
+        """
+        The plans cached in process are bounded, the least recently used
+        plans are dropped first.
+        """
+        other_risk_model = models.RiskModel.objects.create(
+            name="Risk Model 2", button="Save"
+        )
+        plan = validator_plan.get_plan(self.risk_model.id)
+        validator_plan.get_plan(other_risk_model.id)
+        self.assertNotIn(self.risk_model.id, validator_plan._plans)
+        self.assertIsNot(validator_plan.get_plan(self.risk_model.id), plan)
+
+    @override_settings(
+        RISK_MODEL_SCHEMA_CACHE="default", RISK_MODEL_SCHEMA_CHECK_INTERVAL=0
+    )
+    def test_shared_schema_cache(self):
+        """
+        With a shared tier, the plans are compiled without db queries in the
+        processes that did not cache them yet, and recompiled once another
+        process publishes a new schema version.
+        """
+        caches["default"].clear()
+        self.assertEqual(
+            validator_plan.get_plan(self.risk_model.id).version, 1
+        )
+        # another process
+        validator_plan._plans.clear()
+        with self.assertNumQueries(0):
+            plan = validator_plan.get_plan(self.risk_model.id)
+            self.assertIs(validator_plan.get_plan(self.risk_model.id), plan)
+        self.assertEqual(list(plan.fields), [self.field.slug])
+
+        self.field.deleted = True
+        self.field.save()
+        models.RiskModel.objects.filter(id=self.risk_model.id).update(
+            schema_version=2
+        )
+        caches["default"].set(
+            validator_plan.VERSION_KEY.format(
+                risk_model_id=self.risk_model.id
+            ),
+            2,
+        )
+        plan = validator_plan.get_plan(self.risk_model.id)
+        self.assertEqual(plan.version, 2)
+        self.assertEqual(plan.fields, {})
+
+
+class BatchValidationTestCase(TestCase):
+    """
+    Differential tests of the column validation of the validator plans
+    against their value by value validation.
+    """
+
+    # values of all the types the fast paths special-case, and edge cases
+    # of their formats
+    VALUES = [
+        None,
+        "",
+        " ",
+        "Jane",
+        "  Jane ",
+        "J",
+        "J" * 20,
+        "Ja\x00ne",
+        "jane@britecore.com",
+        " jane@britecore.com",
+        "jane@",
+        "https://britecore.com",
+        "britecore",
+        "abc123",
+        "0",
+        "25",
+        "-25",
+        "+25",
+        "007",
+        " 25",
+        "25.0",
+        "25.5",
+        "1e3",
+        "1_000",
+        "\u0663",
+        "nan",
+        "9" * 1001,
+        25,
+        -3,
+        2 ** 70,
+        2.5,
+        25.0,
+        float("inf"),
+        True,
+        False,
+        "True",
+        "false",
+        1,
+        "2020-01-31",
+        "2020-02-30",
+        "2020-1-31",
+        "2020-01-31T10:00",
+        "12:30",
+        "12:30:45",
+        "12:30:45.5",
+        "25:00",
+        "9:05",
+        "Vue",
+        "React",
+        "vue",
+        ["Vue"],
+        ["Vue", "React", "Vue"],
+        ["Vue", "Angular"],
+        [],
+        [1, "a", None],
+        ("Vue",),
+        {"Vue"},
+        {"a": 1},
+    ]
+
+    def build_fields(self, required):
+        """
+        builds a field of each field type
+        """
+        fields = []
+        for i, (field_type, label) in enumerate(models.FIELD_TYPES):
+            fields.append(
+                models.FieldName(
+                    name=label,
+                    slug=f"{field_type}-{i}",
+                    field_type=field_type,
+                    required=required,
+                    choices=["Vue", "React"],
+                    min_length=2 if field_type != "url" else None,
+                    max_length=12 if field_type != "email" else None,
+                    regex_pattern=r"^[a-z]+[0-9]*$",
+                    order=i + 1,
+                )
+            )
+        fields.append(
+            models.FieldName(
+                name="Phone",
+                slug="phone",
+                field_type="phone",
+                required=required,
+                order=len(fields) + 1,
+            )
+        )
+        return fields
+
+    def validate(self, plan, field, value):
+        """
+        validates a value on its own, returning the value and the error
+        """
+        try:
+            return plan.validate(field, value), None
+        except ValidationError as e:
+            return None, e.detail
+
+    def unexpected_validation(self, value):
+        """
+        validator of the values expected to take a fast path
+        """
+        self.fail(f"{value!r} was validated by its DRF field.")
+
+    def test_validate_column_matches_validate(self):
+        """
+        The validated values and errors of a column are the ones of its
+        values validated on their own, for every field type.
+        """
+        for required in [True, False]:
+            fields = self.build_fields(required)
+            plan = validator_plan.ValidatorPlan(fields)
+            for field in fields:
+                validated, errors = plan.validate_column(field, self.VALUES)
+                for value, column_result in zip(
+                    self.VALUES, zip(validated, errors)
+                ):
+                    with self.subTest(
+                        field_type=field.field_type,
+                        required=required,
+                        value=value,
+                    ):
+                        result = self.validate(plan, field, value)
+                        # repr tells the types apart, and nan from nan
+                        self.assertEqual(repr(column_result), repr(result))
+
+    def test_validate_column_fast_paths(self):
+        """
+        The values in the formats of the fast paths are validated without
+        their DRF field.
+        """
+        fields = {x.field_type: x for x in self.build_fields(True)}
+        plan = validator_plan.ValidatorPlan(fields.values())
+        for field_type, values in [
+            ("text", ["Jane", " Jane "]),
+            ("email", ["jane@britecore.com"]),
+            ("number", [25, "-25"]),
+            ("float", [2.5, 25, "2.5"]),
+            ("date", ["2020-01-31"]),
+            ("time", ["12:30", "12:30:45"]),
+            ("select", ["Vue"]),
+            ("multiselect", [["Vue", "React"]]),
+            ("checkbox", [True, False]),
+            ("array", [[1, "a"]]),
+        ]:
+            field = fields[field_type]
+            with self.subTest(field_type=field_type):
+                plan.validators[field.slug] = self.unexpected_validation
+                validated, errors = plan.validate_column(field, values)
+                self.assertEqual(errors, [None] * len(values))
+
+
+class ProjectionTestCase(TestCase):
+    """
+    Unit tests for the projection module.
+    """
+
+    def test_typed_value(self):
+        """
+        Stored values are converted to the typed value of their field type,
+        None if they cannot be.
+        """
+        for field_type, value, typed_value in [
+            ("number", "25", 25),
+            ("number", str(2 ** 63), 2 ** 63),
+            ("float", "2.5", 2.5),
+            ("float", "nan", None),
+            ("checkbox", "True", True),
+            ("switch", "False", False),
+            ("array", "['a', 1]", ["a", 1]),
+            ("multiselect", "{'b', 'a'}", ["a", "b"]),
+            ("multiselect", "set()", []),
+            ("date", "2020-01-02", "2020-01-02"),
+            ("date", "2020-13-02", None),
+            ("time", "10:30:00", "10:30:00"),
+            ("text", "25", "25"),
+            ("number", None, None),
+            ("number", "25.5", None),
+        ]:
+            self.assertEqual(
+                projection.typed_value(field_type, value), typed_value
+            )
+
+    def test_build_document(self):
+        """
+        The document of a submission holds its stored values in id order and
+        its typed values keyed by slug.
+        """
+        risk_model = models.RiskModel.objects.create(
+            name="Risk Model 1", button="Save"
+        )
+        age_field = models.FieldName.objects.create(
+            name="Age", field_type="number", risk_model=risk_model, order=1
+        )
+        name_field = models.FieldName.objects.create(
+            name="Name", field_type="text", risk_model=risk_model, order=2
+        )
+        document = projection.build_document(
+            10, risk_model.id, [(1, age_field, 25), (2, name_field, None)]
+        )
+        self.assertEqual(document.form_submit_id, 10)
+        self.assertEqual(
+            document.values,
+            [[1, age_field.id, "25"], [2, name_field.id, None]],
+        )
+        self.assertEqual(
+            document.data, {age_field.slug: 25, name_field.slug: None}
+        )
+
+
+class TypedValuesTestCase(TestCase):
+    """
+    Unit tests for the typed_values module.
+    """
+
+    def test_parse_value(self):
+        """
+        Stored values are parsed into the value of their field type's typed
+        column, None if they cannot be.
+        """
+        for field_type, value, parsed_value in [
+            ("number", "25", 25),
+            ("number", str(2 ** 63), None),
+            ("number", "25.5", None),
+            ("float", "2.5", 2.5),
+            ("float", "nan", None),
+            ("date", "2020-01-02", datetime.date(2020, 1, 2)),
+            ("time", "10:30:00", datetime.time(10, 30)),
+            ("checkbox", "True", True),
+            ("switch", "False", False),
+            ("array", "['a', 1]", ["a", "1"]),
+            ("array", "'a'", None),
+            ("multiselect", "{'b', 'a'}", ["a", "b"]),
+            ("multiselect", "set()", []),
+            ("text", "25", None),
+            ("number", None, None),
+        ]:
+            self.assertEqual(
+                typed_values.parse_value(field_type, value), parsed_value
+            )
+
+    def test_typed_columns_match_documents(self):
+        """
+        The typed column of a stored value and its typed value in the risk
+        data documents are parsed alike, but for the bigint range and the
+        text items of the array column.
+        """
+        for field_type, value in [
+            ("number", "25"),
+            ("number", "25.5"),
+            ("number", "twenty"),
+            ("float", "2.5"),
+            ("float", "inf"),
+            ("date", "2020-01-02"),
+            ("date", "2020-13-02"),
+            ("time", "10:30:00"),
+            ("time", "25:00"),
+            ("checkbox", "True"),
+            ("array", "['a', 1]"),
+            ("array", "'a'"),
+            ("multiselect", "{'b', 'a'}"),
+        ]:
+            with self.subTest(field_type=field_type, value=value):
+                parsed_value = typed_values.parse_value(field_type, value)
+                typed_value = projection.typed_value(field_type, value)
+                if isinstance(parsed_value, (datetime.date, datetime.time)):
+                    parsed_value = parsed_value.isoformat()
+                if isinstance(typed_value, list):
+                    typed_value = [str(x) for x in typed_value]
+                self.assertEqual(parsed_value, typed_value)
+
+    def test_typed_row(self):
+        """
+        The typed row of a value only sets the column of its field type.
+        """
+        row = typed_values.typed_row("number", "25")
+        self.assertEqual(
+            dict(zip(typed_values.TYPED_FIELD_NAMES, row)),
+            {
+                "array_value": None,
+                "boolean_value": None,
+                "date_value": None,
+                "float_value": None,
+                "number_value": 25,
+                "time_value": None,
+            },
+        )
+        self.assertEqual(typed_values.typed_columns("text", "25"), {})
+
+
+class PythonVersionTestCase(TestCase):
+    """
+    Checks the app runs on Python 3.6.
+    """
+
+    def python_37_usages(self, tree):
+        """
+        yields the Python 3.7 APIs used by a module's syntax tree
+        """
+        for node in ast.walk(tree):
+            if (
+                isinstance(node, ast.Attribute)
+                and node.attr in PYTHON_37_ATTRIBUTES
+            ):
+                yield node.attr
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name in PYTHON_37_MODULES:
+                        yield alias.name
+            elif isinstance(node, ast.ImportFrom):
+                if node.module in PYTHON_37_MODULES:
+                    yield node.module
+                if node.module == "__future__" and any(
+                    x.name == "annotations" for x in node.names
+                ):
+                    yield "from __future__ import annotations"
+            elif isinstance(node, ast.Call) and getattr(
+                node.func, "attr", getattr(node.func, "id", None)
+            ) in ["ProcessPoolExecutor", "ThreadPoolExecutor"]:
+                for keyword in node.keywords:
+                    if keyword.arg in PYTHON_37_EXECUTOR_KEYWORDS:
+                        yield f"executor {keyword.arg}"
+
+    def test_no_python_37_api(self):
+        """
+        The modules of the app, its migrations included, use none of the
+        standard library APIs added in Python 3.7.
+        """
+        app_dir = os.path.dirname(os.path.dirname(__file__))
+        for root, _, file_names in os.walk(app_dir):
+            for file_name in file_names:
+                if not file_name.endswith(".py"):
+                    continue
+                path = os.path.join(root, file_name)
+                with open(path) as source:
+                    tree = ast.parse(source.read(), path)
+                with self.subTest(path=os.path.relpath(path, app_dir)):
+                    self.assertEqual(list(self.python_37_usages(tree)), [])
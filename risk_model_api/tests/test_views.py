@@ -1,12 +1,22 @@
+import csv
+import json
+from io import StringIO
+from unittest import mock, skipUnless
+
 from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIRequestFactory
 
 from .. import models
-from ..utils import utils
-from ..v1 import views
+from ..utils import field_types, storage, utils, validator_plan
+from ..v1 import renderers, views
 
 
 class RiskModelViewSetTest(TestCase):
@@ -55,7 +65,36 @@ class RiskModelViewSetTest(TestCase):
         request = self.factory.get(url)
         response = views.RiskModelViewSet.as_view({"get": "list"})(request)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+    def test_list_risk_models_query_count(self):
+        """
+        The risk model list view makes a fixed number of queries, however
+        many risk models are listed, and lists their fields in 'order'.
+        """
+        for i in range(2, 6):
+            risk_model = models.RiskModel.objects.create(
+                name=f"Risk Model {i}", button="Save"
+            )
+            for order in [2, 1]:
+                models.FieldName.objects.create(
+                    name=f"Field {order}",
+                    field_type="text",
+                    risk_model=risk_model,
+                    order=order,
+                )
+        url = reverse("risk_model:risk_model-list")
+        request = self.factory.get(url)
+        # the version of the risk models and fields, the page and the fields
+        with self.assertNumQueries(4):
+            response = views.RiskModelViewSet.as_view({"get": "list"})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 5)
+        for risk_model in response.data["results"]:
+            self.assertEqual(
+                [x["order"] for x in risk_model["fields"]], [1, 2]
+            )
 
     def test_create_risk_model_with_fields(self):
         """
@@ -225,6 +264,108 @@ class RiskModelViewSetTest(TestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_risk_model_retrieve_query_count(self):
+        """
+        The risk model retrieve view makes a fixed number of queries.
+        """
+        url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        request = self.factory.get(url)
+        # the version, the risk model and its fields
+        with self.assertNumQueries(3):
+            response = views.RiskModelViewSet.as_view({"get": "retrieve"})(
+                request, pk=self.risk_model.id
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["fields"]), 2)
+
+    def test_risk_model_retrieve_not_modified(self):
+        """
+        The risk model retrieve view returns a 304 in a single query, if
+        the ETag or the modification date sent are the current ones, and
+        the risk model again once it or one of its fields change.
+        """
+        url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertEqual(response["Cache-Control"], "public, max-age=0")
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.normal_field_1.help_text = "First field"
+        self.normal_field_1.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(
+            response.data["fields"][0]["help_text"], "First field"
+        )
+
+    def test_risk_model_retrieve_etag_per_representation(self):
+        """
+        The JSON and browsable API responses of the risk model retrieve view
+        have their own ETag and vary on the Accept header.
+        """
+        url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        response = self.client.get(url, HTTP_ACCEPT="application/json")
+        etag = response["ETag"]
+        self.assertIn("Accept", response["Vary"])
+        response = self.client.get(
+            url, HTTP_ACCEPT="text/html", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/html; charset=utf-8")
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Accept", response["Vary"])
+        response = self.client.get(
+            url, HTTP_ACCEPT="application/json", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn("Accept", response["Vary"])
+
+    def test_risk_model_retrieve_unknown_has_no_etag(self):
+        """
+        The risk model retrieve view returns a 404 without cache headers for
+        an unknown risk model.
+        """
+        url = reverse("risk_model:risk_model-detail", args=[0])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_list_risk_models_not_modified(self):
+        """
+        The risk model list view returns a 304 if the ETag sent is the
+        current one of the requested page, and the page again once a risk
+        model is added.
+        """
+        url = reverse("risk_model:risk_model-list")
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(
+            url, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        models.RiskModel.objects.create(name="Risk Model 2", button="Save")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
     def test_risk_model_update(self):
         """
         A 200 status is returned by the risk model update view.
@@ -327,6 +468,255 @@ class RiskModelViewSetTest(TestCase):
             updated_response.data["fields"][0]["default"], str(no_of_children)
         )
 
+    def test_update_risk_model_invalidates_validator_plan(self):
+        """
+        Risk data submitted after a risk model update is validated against
+        the updated fields.
+        """
+        url = reverse("risk_model:risk_data-list")
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "25",
+                self.normal_field_2.slug: "josh@techintel.dev",
+            },
+        }
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # change the first field to a number field
+        detail_url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        request = self.factory.get(detail_url)
+        response = views.RiskModelViewSet.as_view({"get": "retrieve"})(
+            request, pk=self.risk_model.id
+        )
+        updated_data = dict(response.data)
+        updated_data["fields"][0]["field_type"] = "number"
+        request = self.factory.put(detail_url, updated_data, format="json")
+        response = views.RiskModelViewSet.as_view({"put": "update"})(
+            request, pk=self.risk_model.id
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        risk_data["data"][self.normal_field_1.slug] = "twenty five"
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(self.normal_field_1.name, response.data)
+
+    @override_settings(RISK_MODEL_SCHEMA_CACHE="default")
+    def test_update_risk_model_publishes_schema_version(self):
+        """
+        A risk model update bumps its schema version and publishes it to the
+        shared schema cache once committed, and the risk data submitted with
+        a warm schema cache is validated without schema queries.
+        """
+        caches["default"].clear()
+        url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        request = self.factory.get(url)
+        response = views.RiskModelViewSet.as_view({"get": "retrieve"})(
+            request, pk=self.risk_model.id
+        )
+        request = self.factory.put(url, dict(response.data), format="json")
+        with mock.patch.object(
+            transaction, "on_commit", side_effect=lambda func: func()
+        ):
+            response = views.RiskModelViewSet.as_view({"put": "update"})(
+                request, pk=self.risk_model.id
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.risk_model.refresh_from_db()
+        self.assertEqual(self.risk_model.schema_version, 2)
+        self.assertEqual(
+            caches["default"].get(
+                validator_plan.VERSION_KEY.format(
+                    risk_model_id=self.risk_model.id
+                )
+            ),
+            2,
+        )
+
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+            },
+        }
+        view = views.RiskDataViewSet.as_view({"post": "create"})
+        url = reverse("risk_model:risk_data-list")
+        view(self.factory.post(url, risk_data, format="json"))
+        risk_data["data"][self.normal_field_1.slug] = "Jane"
+        with CaptureQueriesContext(connection) as queries:
+            response = view(self.factory.post(url, risk_data, format="json"))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [
+                x["sql"]
+                for x in queries
+                if models.RiskModel._meta.db_table + '"' in x["sql"]
+                or models.FieldName._meta.db_table + '"' in x["sql"]
+            ],
+            [],
+        )
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+            },
+            "schema": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "risk_model_schema_cache",
+            },
+        },
+        RISK_MODEL_SCHEMA_CACHE="schema",
+    )
+    def test_bulk_risk_data_create_with_db_schema_cache(self):
+        """
+        With the db cache as the shared schema tier, the schema version is
+        not read per submitted row by the bulk create.
+        """
+        call_command("createcachetable", stdout=StringIO())
+        validator_plan.get_plan(self.risk_model.id, reload=True)
+        submissions = [
+            {
+                "risk_model": self.risk_model.id,
+                "risk_model_name": self.risk_model.name,
+                "data": {
+                    self.normal_field_1.slug: f"Joshua {i}",
+                    self.normal_field_2.slug: "josh@techintel.dev",
+                },
+            }
+            for i in range(5)
+        ]
+        url = reverse("risk_model:risk_data-bulk")
+        request = self.factory.post(url, submissions, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            response = views.RiskDataViewSet.as_view({"post": "bulk"})(request)
+        self.assertTrue(all("form_submit" in x for x in response.data))
+        self.assertEqual(
+            [
+                x["sql"]
+                for x in queries
+                if "risk_model_schema_cache" in x["sql"]
+            ],
+            [],
+        )
+
+    def test_update_risk_model_field_choices(self):
+        """
+        The choices of the risk model fields are updated by the update view.
+        """
+        select_field = models.FieldName.objects.create(
+            name="Framework",
+            field_type="select",
+            choices=["Vue", "React"],
+            risk_model=self.risk_model,
+            order=3,
+        )
+        url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        request = self.factory.get(url)
+        response = views.RiskModelViewSet.as_view({"get": "retrieve"})(
+            request, pk=self.risk_model.id
+        )
+        updated_data = dict(response.data)
+        updated_data["fields"][2]["choices"] = ["Vue", "React", "Angular"]
+
+        request = self.factory.put(url, updated_data, format="json")
+        updated_response = views.RiskModelViewSet.as_view({"put": "update"})(
+            request, pk=self.risk_model.id
+        )
+        self.assertEqual(updated_response.status_code, status.HTTP_200_OK)
+        select_field.refresh_from_db()
+        self.assertEqual(select_field.choices, ["Vue", "React", "Angular"])
+        self.normal_field_1.refresh_from_db()
+        self.assertIsNone(self.normal_field_1.choices)
+
+    def test_update_risk_model_query_count(self):
+        """
+        The number of queries made by the update view does not grow with the
+        number of fields updated or deleted.
+        """
+        url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        retrieve_view = views.RiskModelViewSet.as_view({"get": "retrieve"})
+        update_view = views.RiskModelViewSet.as_view({"put": "update"})
+
+        def update_risk_model():
+            response = retrieve_view(
+                self.factory.get(url), pk=self.risk_model.id
+            )
+            updated_data = dict(response.data)
+            # rename the kept fields and delete the last one
+            deleted_field = updated_data["fields"].pop()
+            for field_data in updated_data["fields"]:
+                field_data["name"] = f"{field_data['name']} (edited)"
+            request = self.factory.put(url, updated_data, format="json")
+            with CaptureQueriesContext(connection) as queries:
+                response = update_view(request, pk=self.risk_model.id)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse(
+                models.FieldName.objects.filter(
+                    id=deleted_field["id"]
+                ).exists()
+            )
+            return len(queries)
+
+        initial_query_count = update_risk_model()
+        for order in range(2, 12):
+            models.FieldName.objects.create(
+                name=f"Field {order}",
+                field_type="text",
+                risk_model=self.risk_model,
+                order=order,
+            )
+        self.assertEqual(update_risk_model(), initial_query_count)
+
+    def test_update_foreign_risk_model_field(self):
+        """
+        A 404 status is returned by the update view when a field of another
+        risk model is posted.
+        """
+        other_risk_model = models.RiskModel.objects.create(
+            name="Risk Model 2", button="Save"
+        )
+        foreign_field = models.FieldName.objects.create(
+            name="Nickname",
+            field_type="text",
+            risk_model=other_risk_model,
+            order=1,
+        )
+        url = reverse(
+            "risk_model:risk_model-detail", args=[self.risk_model.id]
+        )
+        request = self.factory.get(url)
+        response = views.RiskModelViewSet.as_view({"get": "retrieve"})(
+            request, pk=self.risk_model.id
+        )
+        updated_data = dict(response.data)
+        updated_data["fields"][0]["id"] = foreign_field.id
+
+        request = self.factory.put(url, updated_data, format="json")
+        updated_response = views.RiskModelViewSet.as_view({"put": "update"})(
+            request, pk=self.risk_model.id
+        )
+        self.assertEqual(
+            updated_response.status_code, status.HTTP_404_NOT_FOUND
+        )
+        foreign_field.refresh_from_db()
+        self.assertEqual(foreign_field.name, "Nickname")
+
     def test_update_risk_model_fields(self):
         """
         New nested fields are added to the risk model through the update view.
@@ -530,71 +920,767 @@ class RiskModelViewSetTest(TestCase):
             request
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, models.FieldName().field_choices())
-
-
-class RiskDataViewSetTest(TestCase):
-    """
-    Unit tests for the Risk Data view.
-    """
+        field_type_choices = json.loads(response.content)
+        self.assertEqual(
+            [
+                {"text": x["text"], "value": x["value"]}
+                for x in field_type_choices
+            ],
+            models.FieldName().field_choices(),
+        )
+        self.assertEqual(
+            {x["value"]: x["attributes"] for x in field_type_choices}["regex"],
+            ["min_length", "max_length", "regex_pattern"],
+        )
 
-    def setUp(self):
-        self.factory = APIRequestFactory()
+    def test_field_type_choices_cache_headers(self):
+        """
+        The field_type choices are served with their version as ETag,
+        cached for a day, or for a year if requested with their version,
+        and a 304 is returned if the client has them.
+        """
+        url = reverse("risk_model:risk_model-field-types")
+        response = self.client.get(url)
+        self.assertEqual(response["ETag"], f'"{field_types.VERSION}"')
+        self.assertEqual(response["Cache-Control"], "public, max-age=86400")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(url, {"v": field_types.VERSION})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
 
-        # create client
-        client = models.Client.objects.create(name="Client 1")
+    def create_export_data(self):
+        """
+        creates two successful submissions, the second one without a value
+        for the email field, and a failed submission
+        """
+        form_submits = [
+            models.FormSubmit.objects.create(
+                risk_model=self.risk_model, success=success
+            )
+            for success in [True, True, False]
+        ]
+        models.FieldValue.objects.bulk_create(
+            [
+                models.FieldValue(
+                    form_submit=form_submits[0],
+                    field=self.normal_field_1,
+                    value="Brite, Core",
+                ),
+                models.FieldValue(
+                    form_submit=form_submits[0],
+                    field=self.normal_field_2,
+                    value="john@britecore.com",
+                ),
+                models.FieldValue(
+                    form_submit=form_submits[0],
+                    field=self.deleted_field,
+                    value="deleted",
+                ),
+                models.FieldValue(
+                    form_submit=form_submits[1],
+                    field=self.normal_field_1,
+                    value="Jane",
+                ),
+                models.FieldValue(
+                    form_submit=form_submits[2],
+                    field=self.normal_field_1,
+                    value="Failed",
+                ),
+            ]
+        )
+        return form_submits
 
-        # create risk model
-        self.risk_model = models.RiskModel.objects.create(
-            client=client, name="Risk Model 1", button="Save"
+    def test_export_risk_model_data_as_csv(self):
+        """
+        The successful submissions of a risk model are streamed as csv by the
+        risk model export view, one column per non deleted field.
+        """
+        form_submits = self.create_export_data()
+        url = reverse(
+            "risk_model:risk_model-export", kwargs={"pk": self.risk_model.id}
         )
-        # create fields
-        self.normal_field_1 = models.FieldName.objects.create(
-            name="First Name",
-            field_type="text",
-            risk_model=self.risk_model,
-            order=1,
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(
+            csv.reader(
+                b"".join(response.streaming_content).decode().splitlines()
+            )
         )
-        self.normal_field_2 = models.FieldName.objects.create(
-            name="Email",
-            field_type="email",
-            risk_model=self.risk_model,
-            order=2,
+        self.assertEqual(
+            rows[0],
+            [
+                "form_submit",
+                "created_on",
+                self.normal_field_1.slug,
+                self.normal_field_2.slug,
+            ],
         )
-        self.normal_field_3 = models.FieldName.objects.create(
-            name="Age",
-            field_type="number",
-            risk_model=self.risk_model,
-            order=3,
+        self.assertEqual(
+            [row[:1] + row[2:] for row in rows[1:]],
+            [
+                [str(form_submits[0].id), "Brite, Core", "john@britecore.com"],
+                [str(form_submits[1].id), "Jane", ""],
+            ],
         )
-        # log form submission
-        self.form_submit = models.FormSubmit.objects.create(
-            risk_model=self.risk_model, success=True
+
+    def test_export_risk_model_data_as_ndjson(self):
+        """
+        The risk model export view streams ndjson when asked to.
+        """
+        form_submits = self.create_export_data()
+        url = reverse(
+            "risk_model:risk_model-export", kwargs={"pk": self.risk_model.id}
         )
-        # create risk data
-        self.data = [
-            models.FieldValue(
-                form_submit=self.form_submit,
-                field=self.normal_field_1,
-                value="Brite",
-            ),
-            models.FieldValue(
-                form_submit=self.form_submit,
-                field=self.normal_field_2,
-                value="john@britecore.com",
-            ),
-            models.FieldValue(
-                form_submit=self.form_submit,
-                field=self.normal_field_3,
-                value=25,
-            ),
+        response = self.client.get(url, {"format": "ndjson"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
         ]
-        self.risk_data_1 = models.FieldValue.objects.bulk_create(self.data)
+        self.assertEqual(
+            [
+                (row["form_submit"], row[self.normal_field_2.slug])
+                for row in rows
+            ],
+            [
+                (form_submits[0].id, "john@britecore.com"),
+                (form_submits[1].id, None),
+            ],
+        )
 
-    def test_risk_data_create(self):
+    @skipUnless(renderers.pyarrow, "requires pyarrow")
+    def test_export_risk_model_data_as_parquet(self):
         """
-        A 201 is returned by the risk data create view.
-        POST requests to risk_data-list creates risk data.
+        The risk model export view streams parquet when asked to.
+        """
+        form_submits = self.create_export_data()
+        url = reverse(
+            "risk_model:risk_model-export", kwargs={"pk": self.risk_model.id}
+        )
+        response = self.client.get(url, {"format": "parquet"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = renderers.pyarrow.parquet.read_table(
+            renderers.pyarrow.BufferReader(
+                b"".join(response.streaming_content)
+            )
+        )
+        self.assertEqual(
+            table.column(self.normal_field_1.slug).to_pylist(),
+            ["Brite, Core", "Jane"],
+        )
+        self.assertEqual(
+            table.column("form_submit").to_pylist(),
+            [str(form_submits[0].id), str(form_submits[1].id)],
+        )
+
+    @override_settings(RISK_DATA_PROJECTION=True)
+    def test_export_risk_model_data_from_documents(self):
+        """
+        The risk model export view reads the risk data documents when every
+        submission has its document.
+        """
+        self.create_export_data()
+        url = reverse(
+            "risk_model:risk_model-export", kwargs={"pk": self.risk_model.id}
+        )
+        expected = b"".join(self.client.get(url).streaming_content)
+        call_command("rebuild_risk_data_documents", stdout=StringIO())
+        with CaptureQueriesContext(connection) as queries:
+            content = b"".join(self.client.get(url).streaming_content)
+        self.assertEqual(content, expected)
+        self.assertFalse(
+            [
+                x["sql"]
+                for x in queries
+                if models.FieldValue._meta.db_table in x["sql"]
+            ]
+        )
+
+    def test_export_risk_model_data_from_both_storages(self):
+        """
+        The risk model export view reads the submissions stored as documents
+        and the ones stored as FieldValue rows, in order.
+        """
+        form_submits = self.create_export_data()
+        with self.settings(RISK_DATA_STORAGE="document"):
+            form_submit = models.FormSubmit.objects.create(
+                risk_model=self.risk_model, success=True
+            )
+            storage.get_storage().insert(
+                [form_submit], [[(self.normal_field_2, "jane@britecore.com")]]
+            )
+            url = reverse(
+                "risk_model:risk_model-export",
+                kwargs={"pk": self.risk_model.id},
+            )
+            response = self.client.get(url, {"format": "ndjson"})
+            rows = [
+                json.loads(line)
+                for line in b"".join(response.streaming_content).splitlines()
+            ]
+        self.assertEqual(
+            [
+                (
+                    row["form_submit"],
+                    row[self.normal_field_1.slug],
+                    row[self.normal_field_2.slug],
+                )
+                for row in rows
+            ],
+            [
+                (form_submits[0].id, "Brite, Core", "john@britecore.com"),
+                (form_submits[1].id, "Jane", None),
+                (form_submit.id, None, "jane@britecore.com"),
+            ],
+        )
+
+    def create_stats_data(self):
+        """
+        creates select, number and float fields, and posts three
+        submissions with values for them to the bulk risk data create view
+        """
+        self.level_field = models.FieldName.objects.create(
+            name="Level",
+            field_type="select",
+            choices=["Low", "Mid", "High"],
+            risk_model=self.risk_model,
+            order=4,
+            required=False,
+        )
+        self.age_field = models.FieldName.objects.create(
+            name="Age",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=5,
+            required=False,
+        )
+        self.rate_field = models.FieldName.objects.create(
+            name="Rate",
+            field_type="float",
+            risk_model=self.risk_model,
+            order=6,
+            required=False,
+        )
+        self.post_stats_data()
+
+    def post_stats_data(self):
+        """
+        posts three submissions with values for the create_stats_data fields
+        to the bulk risk data create view
+        """
+        submissions = [
+            {
+                "risk_model": self.risk_model.id,
+                "risk_model_name": self.risk_model.name,
+                "data": {
+                    self.normal_field_1.slug: "Jane",
+                    self.normal_field_2.slug: "jane@britecore.com",
+                    **data,
+                },
+            }
+            for data in [
+                {
+                    self.level_field.slug: "Low",
+                    self.age_field.slug: 20,
+                    self.rate_field.slug: 1.5,
+                },
+                {self.level_field.slug: "High", self.age_field.slug: 41},
+                {self.level_field.slug: "Low", self.rate_field.slug: 2.5},
+            ]
+        ]
+        response = self.client.post(
+            reverse("risk_model:risk_data-bulk"),
+            submissions,
+            content_type="application/json",
+        )
+        self.assertEqual(len(response.data), 3)
+
+    def assert_stats(self, data, times=1):
+        """
+        asserts the stats of the create_stats_data submissions, posted
+        'times' times
+        """
+        self.assertEqual(data["submissions"], 3 * times)
+        self.assertEqual(
+            data["per_day"],
+            [{"day": timezone.localdate(), "submissions": 3 * times}],
+        )
+        self.assertEqual(
+            data["fields"],
+            [
+                {
+                    "field": self.level_field.slug,
+                    "name": "Level",
+                    "field_type": "select",
+                    "choices": {"Low": 2 * times, "Mid": 0, "High": times},
+                },
+                {
+                    "field": self.age_field.slug,
+                    "name": "Age",
+                    "field_type": "number",
+                    "count": 2 * times,
+                    "min": 20,
+                    "max": 41,
+                    "avg": 30.5,
+                },
+                {
+                    "field": self.rate_field.slug,
+                    "name": "Rate",
+                    "field_type": "float",
+                    "count": 2 * times,
+                    "min": 1.5,
+                    "max": 2.5,
+                    "avg": 2.0,
+                },
+            ],
+        )
+
+    def test_risk_model_stats(self):
+        """
+        The risk model stats view aggregates the successful submissions of a
+        risk model per day, per choice of its select fields, and the number
+        and float values of its fields.
+        """
+        self.create_stats_data()
+        models.FormSubmit.objects.create(
+            risk_model=self.risk_model, success=False
+        )
+        url = reverse(
+            "risk_model:risk_model-stats", kwargs={"pk": self.risk_model.id}
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assert_stats(response.data)
+
+    @override_settings(RISK_DATA_STATS_ROLLUP=True)
+    def test_risk_model_stats_from_rollups(self):
+        """
+        The risk model stats view reads the rollups maintained on insert when
+        they are enabled, which match the rebuilt ones.
+        """
+        self.create_stats_data()
+        url = reverse(
+            "risk_model:risk_model-stats", kwargs={"pk": self.risk_model.id}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assert_stats(response.data)
+        self.assertFalse(
+            [
+                x["sql"]
+                for x in queries
+                if models.FieldValue._meta.db_table + '"' in x["sql"]
+            ]
+        )
+        out = StringIO()
+        call_command("rebuild_risk_data_rollups", stdout=out)
+        self.assertIn(
+            f"Rebuilt 5 rollups of risk model {self.risk_model.id}",
+            out.getvalue(),
+        )
+        self.assert_stats(self.client.get(url).data)
+
+    @override_settings(RISK_DATA_STATS_ROLLUP=True)
+    def test_risk_model_stats_in_document_storage(self):
+        """
+        With the document storage, the stats aggregate the values of the
+        submissions stored as primary documents along with the ones stored
+        as FieldValue rows, from the rollups maintained on insert, from the
+        rebuilt ones and live.
+        """
+        self.create_stats_data()
+        url = reverse(
+            "risk_model:risk_model-stats", kwargs={"pk": self.risk_model.id}
+        )
+        with self.settings(RISK_DATA_STORAGE="document"):
+            self.post_stats_data()
+            self.assertEqual(
+                models.RiskDataDocument.objects.filter(primary=True).count(), 3
+            )
+            self.assert_stats(self.client.get(url).data, times=2)
+            call_command("rebuild_risk_data_rollups", stdout=StringIO())
+            self.assert_stats(self.client.get(url).data, times=2)
+            with self.settings(RISK_DATA_STATS_ROLLUP=False):
+                self.assert_stats(self.client.get(url).data, times=2)
+
+    def test_risk_model_stats_of_big_numbers(self):
+        """
+        The stats of number values beyond the float precision are exact,
+        from the rollups as from the FieldValue rows.
+        """
+        age_field = models.FieldName.objects.create(
+            name="Age",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=4,
+            required=False,
+        )
+        url = reverse(
+            "risk_model:risk_model-stats", kwargs={"pk": self.risk_model.id}
+        )
+        expected = {
+            "field": age_field.slug,
+            "name": "Age",
+            "field_type": "number",
+            "count": 2,
+            "min": 2 ** 53 + 1,
+            "max": 2 ** 62 + 1,
+            "avg": (2 ** 53 + 2 ** 62 + 2) / 2,
+        }
+        with self.settings(RISK_DATA_STATS_ROLLUP=True):
+            self.client.post(
+                reverse("risk_model:risk_data-bulk"),
+                [
+                    {
+                        "risk_model": self.risk_model.id,
+                        "risk_model_name": self.risk_model.name,
+                        "data": {
+                            self.normal_field_1.slug: "Jane",
+                            self.normal_field_2.slug: "jane@britecore.com",
+                            age_field.slug: age,
+                        },
+                    }
+                    for age in [2 ** 53 + 1, 2 ** 62 + 1]
+                ],
+                content_type="application/json",
+            )
+            self.assertEqual(self.client.get(url).data["fields"], [expected])
+            call_command("rebuild_risk_data_rollups", stdout=StringIO())
+            self.assertEqual(self.client.get(url).data["fields"], [expected])
+        self.assertEqual(self.client.get(url).data["fields"], [expected])
+
+    def test_export_unknown_risk_model(self):
+        """
+        A 404 status is returned by the risk model export view for an unknown
+        risk model.
+        """
+        url = reverse("risk_model:risk_model-export", kwargs={"pk": 0})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RiskDataViewSetTest(TestCase):
+    """
+    Unit tests for the Risk Data view.
+    """
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+        # create client
+        client = models.Client.objects.create(name="Client 1")
+
+        # create risk model
+        self.risk_model = models.RiskModel.objects.create(
+            client=client, name="Risk Model 1", button="Save"
+        )
+        # create fields
+        self.normal_field_1 = models.FieldName.objects.create(
+            name="First Name",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=1,
+        )
+        self.normal_field_2 = models.FieldName.objects.create(
+            name="Email",
+            field_type="email",
+            risk_model=self.risk_model,
+            order=2,
+        )
+        self.normal_field_3 = models.FieldName.objects.create(
+            name="Age",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=3,
+        )
+        # log form submission
+        self.form_submit = models.FormSubmit.objects.create(
+            risk_model=self.risk_model, success=True
+        )
+        # create risk data
+        self.data = [
+            models.FieldValue(
+                form_submit=self.form_submit,
+                field=self.normal_field_1,
+                value="Brite",
+            ),
+            models.FieldValue(
+                form_submit=self.form_submit,
+                field=self.normal_field_2,
+                value="john@britecore.com",
+            ),
+            models.FieldValue(
+                form_submit=self.form_submit,
+                field=self.normal_field_3,
+                value=25,
+            ),
+        ]
+        self.risk_data_1 = models.FieldValue.objects.bulk_create(self.data)
+
+    def test_risk_data_create(self):
+        """
+        A 201 is returned by the risk data create view.
+        POST requests to risk_data-list creates risk data.
+        """
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNotNone(response.data["form_submit"])
+
+    def test_create_risk_data_with_foreign_field_slug(self):
+        """
+        A 400 status is returned by the risk data create view when the data
+        contains a field slug of another risk model.
+        """
+        other_risk_model = models.RiskModel.objects.create(
+            name="Risk Model 2", button="Save"
+        )
+        foreign_field = models.FieldName.objects.create(
+            name="Nickname",
+            field_type="text",
+            risk_model=other_risk_model,
+            order=1,
+        )
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+                foreign_field.slug: "Josh",
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("data", response.data)
+        self.assertFalse(
+            models.FieldValue.objects.filter(field=foreign_field).exists()
+        )
+
+    def test_invalid_risk_data_create_makes_no_writes(self):
+        """
+        A risk data submission failing validation writes nothing to the db.
+        """
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: "eighteen",
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, risk_data, format="json")
+        with CaptureQueriesContext(connection) as queries:
+            response = views.RiskDataViewSet.as_view({"post": "create"})(
+                request
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(
+            [
+                x["sql"]
+                for x in queries
+                if not x["sql"].lstrip().upper().startswith("SELECT")
+            ]
+        )
+        self.assertEqual(models.FormSubmit.objects.count(), 1)
+
+    def test_risk_data_create_query_count(self):
+        """
+        The number of queries made by the risk data create view does not grow
+        with the number of fields submitted.
+        """
+        url = reverse("risk_model:risk_data-list")
+        view = views.RiskDataViewSet.as_view({"post": "create"})
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+            },
+        }
+        with CaptureQueriesContext(connection) as initial_queries:
+            response = view(self.factory.post(url, risk_data, format="json"))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # submit to a risk model with more fields
+        risk_model = models.RiskModel.objects.create(
+            name="Risk Model 2", button="Save"
+        )
+        risk_data = {
+            "risk_model": risk_model.id,
+            "risk_model_name": risk_model.name,
+            "data": {},
+        }
+        for order in range(1, 10):
+            field = models.FieldName.objects.create(
+                name=f"Field {order}",
+                field_type="text",
+                risk_model=risk_model,
+                order=order,
+            )
+            risk_data["data"][field.slug] = "Brite"
+        with CaptureQueriesContext(connection) as queries:
+            response = view(self.factory.post(url, risk_data, format="json"))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(queries), len(initial_queries))
+
+    def test_create_risk_data_with_repeated_unique_values(self):
+        """
+        A 400 status is returned by the risk data create view when a unique
+        field value was already submitted, and no risk data is created.
+        """
+        unique_field_1 = models.FieldName.objects.create(
+            name="Passport Number",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=4,
+            unique=True,
+        )
+        unique_field_2 = models.FieldName.objects.create(
+            name="Plate Number",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=5,
+            unique=True,
+        )
+        models.FieldValue.objects.create(
+            form_submit=self.form_submit, field=unique_field_2, value="LAG-1"
+        )
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+                unique_field_1.slug: "A0001",
+                unique_field_2.slug: "LAG-1",
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {
+                unique_field_2.name: [
+                    "An entry with this value already exists."
+                ]
+            },
+        )
+        self.assertFalse(
+            models.FieldValue.objects.filter(field=unique_field_1).exists()
+        )
+        self.assertEqual(models.FormSubmit.objects.count(), 1)
+
+    def test_bulk_risk_data_create(self):
+        """
+        A result is returned per submission by the bulk risk data create view,
+        and only the valid submissions are created.
+        """
+        unique_field = models.FieldName.objects.create(
+            name="Passport Number",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=4,
+            unique=True,
+        )
+        submissions = [
+            {
+                "risk_model": self.risk_model.id,
+                "risk_model_name": self.risk_model.name,
+                "data": {
+                    self.normal_field_1.slug: f"Joshua {i}",
+                    self.normal_field_2.slug: "josh@techintel.dev",
+                    self.normal_field_3.slug: age,
+                    unique_field.slug: passport,
+                },
+            }
+            for i, (age, passport) in enumerate(
+                [(18, "A0001"), ("eighteen", "A0002"), (18, "A0001")]
+            )
+        ]
+        url = reverse("risk_model:risk_data-bulk")
+        request = self.factory.post(url, submissions, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "bulk"})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([x["index"] for x in response.data], [0, 1, 2])
+        self.assertIn("form_submit", response.data[0])
+        self.assertIn(self.normal_field_3.name, response.data[1]["errors"])
+        self.assertEqual(
+            response.data[2]["errors"],
+            {unique_field.name: ["An entry with this value already exists."]},
+        )
+        self.assertEqual(
+            list(
+                models.FieldValue.objects.filter(
+                    form_submit_id=response.data[0]["form_submit"]
+                )
+                .order_by("field__order")
+                .values_list("value", flat=True)
+            ),
+            ["Joshua 0", "josh@techintel.dev", "18", "A0001"],
+        )
+        self.assertEqual(models.FormSubmit.objects.count(), 2)
+
+    def test_bulk_risk_data_create_with_ndjson(self):
+        """
+        The bulk risk data create view streams a result per line of a newline
+        delimited JSON body, malformed lines included.
+        """
+        submission = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+            },
+        }
+        lines = [json.dumps(submission)] * 3
+        lines.insert(1, "{not json")
+        url = reverse("risk_model:risk_data-bulk")
+        response = self.client.post(
+            url, "\n".join(lines) + "\n", content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        results = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([x["index"] for x in results], [0, 1, 2, 3])
+        self.assertIn("non_field_errors", results[1]["errors"])
+        self.assertTrue(all("form_submit" in results[i] for i in [0, 2, 3]))
+        self.assertEqual(models.FormSubmit.objects.count(), 4)
+
+    def test_bulk_risk_data_create_errors_match_create(self):
+        """
+        The bulk risk data create view rejects submissions with the same
+        errors as the risk data create view.
         """
         risk_data = {
             "risk_model": self.risk_model.id,
@@ -605,11 +1691,81 @@ class RiskDataViewSetTest(TestCase):
                 self.normal_field_3.slug: 18,
             },
         }
+        submissions = [
+            {**risk_data, "data": {**risk_data["data"], slug: value}}
+            for slug, value in [
+                (self.normal_field_3.slug, 18.5),
+                (self.normal_field_2.slug, "josh"),
+                (self.normal_field_3.slug, "eighteen"),
+                ("not-a-field", "Josh"),
+            ]
+        ]
+        submissions.append({**risk_data, "risk_model": 0})
+        submissions.append({**risk_data, "data": {}})
+        # the first error in data order is returned
+        for data in [
+            {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh",
+                self.normal_field_3.slug: "eighteen",
+            },
+            {
+                self.normal_field_3.slug: "eighteen",
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh",
+            },
+            {
+                self.normal_field_1.slug: "Joshua",
+                "not-a-field": "Josh",
+                self.normal_field_2.slug: "josh",
+            },
+        ]:
+            submissions.append({**risk_data, "data": data})
         url = reverse("risk_model:risk_data-list")
-        request = self.factory.post(url, risk_data, format="json")
-        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertIsNotNone(response.data["form_submit"])
+        view = views.RiskDataViewSet.as_view({"post": "create"})
+        errors = []
+        for submission in submissions:
+            response = view(self.factory.post(url, submission, format="json"))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            errors.append(response.data)
+
+        url = reverse("risk_model:risk_data-bulk")
+        request = self.factory.post(url, submissions, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "bulk"})(request)
+        self.assertEqual([x["errors"] for x in response.data], errors)
+        self.assertEqual(models.FormSubmit.objects.count(), 1)
+
+    @override_settings(RISK_DATA_BULK_CHUNK_SIZE=6)
+    def test_bulk_risk_data_create_query_count(self):
+        """
+        The bulk risk data create view writes the submissions in chunks, the
+        number of queries grows with the number of chunks only.
+        """
+        url = reverse("risk_model:risk_data-bulk")
+        view = views.RiskDataViewSet.as_view({"post": "bulk"})
+        submission = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+            },
+        }
+        validator_plan.get_plan(self.risk_model.id)
+        with CaptureQueriesContext(connection) as initial_queries:
+            response = view(
+                self.factory.post(url, [submission] * 2, format="json")
+            )
+        self.assertEqual(len(response.data), 2)
+        with CaptureQueriesContext(connection) as queries:
+            response = view(
+                self.factory.post(url, [submission] * 6, format="json")
+            )
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(models.FormSubmit.objects.count(), 9)
+        # two more chunks of (savepoint, insert, insert, release)
+        self.assertEqual(len(queries), len(initial_queries) + 8)
 
     def test_create_risk_data_with_invalid_field_type(self):
         """
@@ -776,6 +1932,308 @@ class RiskDataViewSetTest(TestCase):
         self.assertEqual(response.data[1]["value"], "john@britecore.com")
         self.assertEqual(response.data[2]["value"], "25")
 
+    def test_risk_data_retrieve_query_count(self):
+        """
+        The risk data retrieve view makes a single query, however many
+        fields were submitted.
+        """
+        for order in range(4, 10):
+            field = models.FieldName.objects.create(
+                name=f"Document {order}",
+                field_type="file",
+                risk_model=self.risk_model,
+                order=order,
+            )
+            models.FieldValue.objects.create(
+                form_submit=self.form_submit,
+                field=field,
+                value=f"/media/doc-{order}.txt",
+            )
+        url = reverse(
+            "risk_model:risk_data-detail", args=[self.form_submit.id]
+        )
+        request = self.factory.get(url)
+        request.META["HTTP_HOST"] = "192.168.0.1"
+        with self.assertNumQueries(1):
+            response = views.RiskDataViewSet.as_view({"get": "retrieve"})(
+                request, pk=self.form_submit.id
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 9)
+        self.assertEqual(
+            response.data[3]["value"], "http://192.168.0.1/media/doc-4.txt"
+        )
+
+    @override_settings(RISK_DATA_PROJECTION=True)
+    def test_risk_data_create_maintains_document(self):
+        """
+        The risk data create view writes the document of the submission when
+        the projection is maintained, and the retrieve view reads it.
+        """
+        deleted_field = models.FieldName.objects.create(
+            name="Nickname",
+            field_type="text",
+            risk_model=self.risk_model,
+            order=4,
+            required=False,
+        )
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+                deleted_field.slug: "Josh",
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        form_submit_id = response.data["form_submit"]
+        document = models.RiskDataDocument.objects.get(
+            form_submit_id=form_submit_id
+        )
+        self.assertEqual(document.data[self.normal_field_3.slug], 18)
+        deleted_field.deleted = True
+        deleted_field.save()
+
+        url = reverse("risk_model:risk_data-detail", args=[form_submit_id])
+        view = views.RiskDataViewSet.as_view({"get": "retrieve"})
+        request = self.factory.get(url)
+        with self.settings(RISK_DATA_PROJECTION=False):
+            expected = view(request, pk=form_submit_id).data
+        validator_plan.get_plan(self.risk_model.id, reload=True)
+        # the document, and the soft deleted field missing from the plan
+        with self.assertNumQueries(2):
+            response = view(request, pk=form_submit_id)
+        self.assertEqual(response.data, expected)
+        self.assertEqual(len(response.data), 4)
+
+    @override_settings(RISK_DATA_PROJECTION=True)
+    def test_bulk_risk_data_create_maintains_documents(self):
+        """
+        The bulk risk data create view writes the documents of the created
+        submissions when the projection is maintained.
+        """
+        submissions = [
+            {
+                "risk_model": self.risk_model.id,
+                "risk_model_name": self.risk_model.name,
+                "data": {
+                    self.normal_field_1.slug: name,
+                    self.normal_field_2.slug: "josh@techintel.dev",
+                    self.normal_field_3.slug: 18,
+                },
+            }
+            for name in ["Joshua", "Jane"]
+        ]
+        url = reverse("risk_model:risk_data-bulk")
+        request = self.factory.post(url, submissions, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "bulk"})(request)
+        documents = models.RiskDataDocument.objects.filter(
+            form_submit_id__in=[x["form_submit"] for x in response.data]
+        ).order_by("form_submit_id")
+        self.assertEqual(
+            [x.data[self.normal_field_1.slug] for x in documents],
+            ["Joshua", "Jane"],
+        )
+        self.assertEqual(
+            [[value for _, _, value in x.values] for x in documents],
+            [
+                ["Joshua", "josh@techintel.dev", "18"],
+                ["Jane", "josh@techintel.dev", "18"],
+            ],
+        )
+
+    def test_risk_data_create_writes_typed_values(self):
+        """
+        The risk data create view writes the typed column of the values of
+        typed fields, which range filters can use.
+        """
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        field_value = models.FieldValue.objects.get(
+            form_submit_id=response.data["form_submit"],
+            field=self.normal_field_3,
+        )
+        self.assertEqual(field_value.value, "18")
+        self.assertEqual(field_value.number_value, 18)
+        self.assertEqual(
+            list(
+                models.FieldValue.objects.filter(
+                    field=self.normal_field_3, number_value__lt=20
+                ).values_list("form_submit_id", flat=True)
+            ),
+            [response.data["form_submit"]],
+        )
+
+    @override_settings(RISK_DATA_STORAGE="document")
+    def test_risk_data_create_in_document_storage(self):
+        """
+        The risk data create view writes a submission as a single primary
+        document with the document storage, and the retrieve view reads it.
+        """
+        risk_data = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, risk_data, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        form_submit_id = response.data["form_submit"]
+        self.assertFalse(
+            models.FieldValue.objects.filter(
+                form_submit_id=form_submit_id
+            ).exists()
+        )
+        document = models.RiskDataDocument.objects.get(
+            form_submit_id=form_submit_id
+        )
+        self.assertTrue(document.primary)
+        self.assertEqual(document.data[self.normal_field_3.slug], 18)
+
+        url = reverse("risk_model:risk_data-detail", args=[form_submit_id])
+        request = self.factory.get(url)
+        response = views.RiskDataViewSet.as_view({"get": "retrieve"})(
+            request, pk=form_submit_id
+        )
+        self.assertEqual(
+            [(x["field_name"], x["value"]) for x in response.data],
+            [
+                (self.normal_field_1.name, "Joshua"),
+                (self.normal_field_2.name, "josh@techintel.dev"),
+                (self.normal_field_3.name, "18"),
+            ],
+        )
+        # the values have ids, reserved from the FieldValue sequence
+        value_ids = [x["id"] for x in response.data]
+        self.assertEqual(
+            value_ids,
+            [field_value_id for field_value_id, _, _ in document.values],
+        )
+        self.assertNotIn(None, value_ids)
+        self.assertGreater(
+            min(value_ids),
+            models.FieldValue.objects.order_by("-id").values_list(
+                "id", flat=True
+            )[0],
+        )
+
+    @override_settings(RISK_DATA_STORAGE="document")
+    def test_repeated_unique_values_in_document_storage(self):
+        """
+        Unique values are checked against the submissions stored as
+        documents and as FieldValue rows with the document storage.
+        """
+        unique_field = models.FieldName.objects.create(
+            name="Passport Number",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=4,
+            unique=True,
+        )
+        models.FieldValue.objects.create(
+            form_submit=self.form_submit, field=unique_field, value="100"
+        )
+        submissions = [
+            {
+                "risk_model": self.risk_model.id,
+                "risk_model_name": self.risk_model.name,
+                "data": {
+                    self.normal_field_1.slug: "Joshua",
+                    self.normal_field_2.slug: "josh@techintel.dev",
+                    self.normal_field_3.slug: 18,
+                    unique_field.slug: passport,
+                },
+            }
+            for passport in [100, 200]
+        ]
+        url = reverse("risk_model:risk_data-bulk")
+        request = self.factory.post(url, submissions, format="json")
+        response = views.RiskDataViewSet.as_view({"post": "bulk"})(request)
+        self.assertEqual(
+            response.data[0]["errors"],
+            {unique_field.name: ["An entry with this value already exists."]},
+        )
+        self.assertIn("form_submit", response.data[1])
+
+        url = reverse("risk_model:risk_data-list")
+        request = self.factory.post(url, submissions[1], format="json")
+        response = views.RiskDataViewSet.as_view({"post": "create"})(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {unique_field.name: ["An entry with this value already exists."]},
+        )
+
+    @override_settings(RISK_DATA_STORAGE="document")
+    def test_unique_values_of_reused_slug_in_document_storage(self):
+        """
+        The unique values of a field stored as documents are not taken by
+        the documents of a soft deleted field whose slug it reuses.
+        """
+        deleted_field = models.FieldName.objects.create(
+            name="Passport Number",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=4,
+            unique=True,
+        )
+        submission = {
+            "risk_model": self.risk_model.id,
+            "risk_model_name": self.risk_model.name,
+            "data": {
+                self.normal_field_1.slug: "Joshua",
+                self.normal_field_2.slug: "josh@techintel.dev",
+                self.normal_field_3.slug: 18,
+                deleted_field.slug: 100,
+            },
+        }
+        url = reverse("risk_model:risk_data-list")
+        view = views.RiskDataViewSet.as_view({"post": "create"})
+        request = self.factory.post(url, submission, format="json")
+        self.assertEqual(view(request).status_code, status.HTTP_201_CREATED)
+        deleted_field.deleted = True
+        deleted_field.save()
+        unique_field = models.FieldName.objects.create(
+            name="Passport Number",
+            field_type="number",
+            risk_model=self.risk_model,
+            order=4,
+            unique=True,
+        )
+        self.assertEqual(unique_field.slug, deleted_field.slug)
+        validator_plan.invalidate_plan(self.risk_model.id)
+
+        request = self.factory.post(url, submission, format="json")
+        self.assertEqual(view(request).status_code, status.HTTP_201_CREATED)
+        request = self.factory.post(url, submission, format="json")
+        response = view(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {unique_field.name: ["An entry with this value already exists."]},
+        )
+
     def test_retrieve_risk_data_file_url(self):
         """
         The url of 'file' field types are available in the retrieved risk data.
@@ -970,7 +2428,7 @@ class RiskDataLogViewSetTest(TestCase):
         request = self.factory.get(url)
         response = views.RiskDataLogViewSet.as_view({"get": "list"})(request)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data["results"]), 5)
 
     def test_risk_model_risk_data_log_list(self):
         """
@@ -982,4 +2440,277 @@ class RiskDataLogViewSetTest(TestCase):
         request = self.factory.get(url, data)
         response = views.RiskDataLogViewSet.as_view({"get": "list"})(request)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(response.data["results"]), 3)
+
+    def test_risk_data_log_list_pagination(self):
+        """
+        The risk_data_log list view pages through the logs, newest first,
+        following the 'next' cursor.
+        """
+        url = reverse("risk_model:risk_data_log-list")
+        view = views.RiskDataLogViewSet.as_view({"get": "list"})
+        response = view(self.factory.get(url, {"page_size": 2}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [x["id"] for x in response.data["results"]],
+            [self.form_submit_7.id, self.form_submit_6.id],
+        )
+
+        # a submission logged in between pages doesn't shift the next page
+        models.FormSubmit.objects.create(
+            risk_model=self.risk_model_1, success=True
+        )
+        response = view(self.factory.get(response.data["next"]))
+        self.assertEqual(
+            [x["id"] for x in response.data["results"]],
+            [self.form_submit_5.id, self.form_submit_2.id],
+        )
+        response = view(self.factory.get(response.data["next"]))
+        self.assertEqual(
+            [x["id"] for x in response.data["results"]],
+            [self.form_submit_1.id],
+        )
+        self.assertIsNone(response.data["next"])
+
+    def create_filter_data(self):
+        """
+        stores the first name and age of the successful submissions on risk
+        model 1
+        """
+        storage.get_storage().insert(
+            [self.form_submit_1, self.form_submit_2, self.form_submit_3],
+            [
+                [(self.normal_field_1, "John"), (self.normal_field_3, 25)],
+                [(self.normal_field_1, "Jane"), (self.normal_field_3, 40)],
+                [(self.normal_field_1, "Jane"), (self.normal_field_3, 40)],
+            ],
+        )
+
+    def test_risk_data_log_list_field_filters(self):
+        """
+        The risk_data_log list view filters the submissions of a risk model
+        on the values of its fields, with the operators of their type.
+        """
+        self.create_filter_data()
+        url = reverse("risk_model:risk_data_log-list")
+        view = views.RiskDataLogViewSet.as_view({"get": "list"})
+        name, age = self.normal_field_1.slug, self.normal_field_3.slug
+        for query, form_submits in [
+            ({name: "Jane"}, [self.form_submit_2]),
+            (
+                {f"{name}__prefix": "J"},
+                [self.form_submit_2, self.form_submit_1],
+            ),
+            ({f"{name}__in": "John,Josh"}, [self.form_submit_1]),
+            ({f"{age}__gt": "30"}, [self.form_submit_2]),
+            ({f"{age}__lte": "40", name: "John"}, [self.form_submit_1]),
+            (
+                {f"{age}__in": "25,40"},
+                [self.form_submit_2, self.form_submit_1],
+            ),
+            ({f"{age}__lt": "25"}, []),
+        ]:
+            response = view(
+                self.factory.get(
+                    url, {"risk_model": self.risk_model_1.id, **query}
+                )
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [x["id"] for x in response.data["results"]],
+                [x.id for x in form_submits],
+                query,
+            )
+
+    @override_settings(RISK_DATA_STORAGE="document")
+    def test_risk_data_log_list_field_filters_in_document_storage(self):
+        """
+        With the document storage, the risk_data_log list view filters the
+        submissions stored as documents on their data, and the ones stored
+        as FieldValue rows on their values.
+        """
+        form_submit = models.FormSubmit.objects.create(
+            risk_model=self.risk_model_1, success=True
+        )
+        storage.RowStorage().insert(
+            [self.form_submit_1],
+            [[(self.normal_field_1, "John"), (self.normal_field_3, 25)]],
+        )
+        storage.get_storage().insert(
+            [self.form_submit_2, form_submit],
+            [
+                [(self.normal_field_1, "Jane"), (self.normal_field_3, 40)],
+                [(self.normal_field_1, "Josh"), (self.normal_field_3, None)],
+            ],
+        )
+        url = reverse("risk_model:risk_data_log-list")
+        view = views.RiskDataLogViewSet.as_view({"get": "list"})
+        name, age = self.normal_field_1.slug, self.normal_field_3.slug
+        for query, form_submits in [
+            ({name: "Jane"}, [self.form_submit_2]),
+            (
+                {f"{name}__prefix": "J"},
+                [form_submit, self.form_submit_2, self.form_submit_1],
+            ),
+            ({f"{name}__in": "John,Josh"}, [form_submit, self.form_submit_1]),
+            ({f"{age}__gt": "30"}, [self.form_submit_2]),
+            ({f"{age}__lte": "40"}, [self.form_submit_2, self.form_submit_1]),
+            ({f"{age}__lte": "40", name: "John"}, [self.form_submit_1]),
+            (
+                {f"{age}__in": "25,40"},
+                [self.form_submit_2, self.form_submit_1],
+            ),
+            ({f"{age}__lt": "25"}, []),
+        ]:
+            response = view(
+                self.factory.get(
+                    url, {"risk_model": self.risk_model_1.id, **query}
+                )
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [x["id"] for x in response.data["results"]],
+                [x.id for x in form_submits],
+                query,
+            )
+
+    def test_risk_data_log_list_field_filters_pagination(self):
+        """
+        The field filters are kept by the 'next' cursor of the
+        risk_data_log list view.
+        """
+        self.create_filter_data()
+        url = reverse("risk_model:risk_data_log-list")
+        view = views.RiskDataLogViewSet.as_view({"get": "list"})
+        response = view(
+            self.factory.get(
+                url,
+                {
+                    "risk_model": self.risk_model_1.id,
+                    f"{self.normal_field_3.slug}__gte": "25",
+                    "page_size": 1,
+                },
+            )
+        )
+        self.assertEqual(
+            [x["id"] for x in response.data["results"]],
+            [self.form_submit_2.id],
+        )
+        response = view(self.factory.get(response.data["next"]))
+        self.assertEqual(
+            [x["id"] for x in response.data["results"]],
+            [self.form_submit_1.id],
+        )
+        self.assertIsNone(response.data["next"])
+
+    def test_risk_data_log_list_invalid_field_filters(self):
+        """
+        A 400 status is returned by the risk_data_log list view for filters
+        on unknown fields, with unsupported operators or invalid values, or
+        without a risk model.
+        """
+        url = reverse("risk_model:risk_data_log-list")
+        view = views.RiskDataLogViewSet.as_view({"get": "list"})
+        age = self.normal_field_3.slug
+        response = view(
+            self.factory.get(
+                url,
+                {
+                    "risk_model": self.risk_model_1.id,
+                    "height": "2",
+                    f"{age}__prefix": "2",
+                    f"{self.normal_field_1.slug}__gt": "J",
+                    f"{age}__gte": "old",
+                },
+            )
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {
+                "height": ["height is not a field of this risk model."],
+                f"{age}__prefix": ["prefix is not a filter of number fields."],
+                f"{self.normal_field_1.slug}__gt": [
+                    "gt is not a filter of text fields."
+                ],
+                f"{age}__gte": ["A valid integer is required."],
+            },
+        )
+        response = view(self.factory.get(url, {age: "25"}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {"risk_model": ["A risk model is required to filter on fields."]},
+        )
+
+    def test_risk_data_log_list_search(self):
+        """
+        The risk_data_log list view filters the submissions on a full-text
+        search of their text and textarea values.
+        """
+        description_field = models.FieldName.objects.create(
+            name="Incident Description",
+            field_type="textarea",
+            risk_model=self.risk_model_1,
+            order=4,
+        )
+        storage.get_storage().insert(
+            [self.form_submit_1, self.form_submit_2, self.form_submit_5],
+            [
+                [
+                    (
+                        description_field,
+                        "The kitchen flooded after a pipe burst",
+                    )
+                ],
+                [
+                    (description_field, "A fire started in the garage"),
+                    (self.normal_field_1, "Kitchen staff"),
+                    # not a text field, the value is not searched
+                    (self.normal_field_3, 1),
+                ],
+                [(self.normal_field_5, "flood@britecore.com")],
+            ],
+        )
+        url = reverse("risk_model:risk_data_log-list")
+        view = views.RiskDataLogViewSet.as_view({"get": "list"})
+        for query, form_submits in [
+            # stemmed, "floods" matches "flooded"
+            ({"search": "floods"}, [self.form_submit_1]),
+            ({"search": "burst pipes"}, [self.form_submit_1]),
+            ({"search": "fire pipe"}, []),
+            # the words may match different values of a submission
+            ({"search": "kitchen fires"}, [self.form_submit_2]),
+            (
+                {"search": "the kitchen"},
+                [self.form_submit_2, self.form_submit_1],
+            ),
+            ({"search": "the"}, []),
+            (
+                {"search": "garage", "risk_model": self.risk_model_1.id},
+                [self.form_submit_2],
+            ),
+            ({"search": "garage", "risk_model": self.risk_model_2.id}, []),
+        ]:
+            response = view(self.factory.get(url, query))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                [x["id"] for x in response.data["results"]],
+                [x.id for x in form_submits],
+                query,
+            )
+
+    @override_settings(RISK_DATA_STORAGE="document")
+    def test_risk_data_log_list_search_in_document_storage(self):
+        """
+        A 400 status is returned by the risk_data_log list view for a search
+        with the document storage, whose submissions are not searchable.
+        """
+        url = reverse("risk_model:risk_data_log-list")
+        view = views.RiskDataLogViewSet.as_view({"get": "list"})
+        response = view(self.factory.get(url, {"search": "flood"}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data,
+            {"search": ["Search is not available with the document storage."]},
+        )
@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.db import connection
+
+# characters escaped in the COPY text format
+COPY_ESCAPES = str.maketrans(
+    {"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"}
+)
+
+
+def supports_copy():
+    """Checks if the database supports COPY FROM STDIN.
+
+    Returns:
+        {bool} -- True on PostgreSQL.
+    """
+    return connection.vendor == "postgresql"
+
+
+def copy_text(value):
+    """Formats a db prepared value as a COPY text format column.
+
+    Arguments:
+        value {object} -- Value prepared for the db.
+    Returns:
+        {str} -- Escaped column text, \\N for NULL.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(COPY_ESCAPES)
+    if isinstance(value, list):
+        return copy_text(array_text(value))
+    # numbers, booleans and dates have no characters to escape
+    return str(value)
+
+
+def array_text(values):
+    """Formats a list of strings as a PostgreSQL array literal.
+
+    Arguments:
+        values {list} -- Strings, or None for NULL elements.
+    Returns:
+        {str} -- Array literal, every element quoted.
+    """
+    return "{%s}" % ",".join(
+        "NULL"
+        if x is None
+        else '"{}"'.format(x.replace("\\", "\\\\").replace('"', '\\"'))
+        for x in values
+    )
+
+
+def reserve_ids(model, count):
+    """Reserves primary keys from the model's id sequence, in a single
+    query.
+
+    Arguments:
+        model {Model} -- Model class whose ids are reserved.
+        count {int} -- Number of ids to reserve.
+    Returns:
+        {list} -- Reserved ids.
+    """
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return [pk for (pk,) in cursor.fetchall()]
+
+
+def copy_rows(model, field_names, rows):
+    """Inserts rows into the model's table with a single COPY FROM STDIN.
+
+    Arguments:
+        model {Model} -- Model class of the table.
+        field_names {list} -- Names of the fields the row values are for.
+        rows {iterable} -- Tuples of values prepared for the db.
+    """
+    buffer = StringIO()
+    for row in rows:
+        buffer.write("\t".join(map(copy_text, row)))
+        buffer.write("\n")
+    if not buffer.tell():
+        return
+    buffer.seek(0)
+    quote_name = connection.ops.quote_name
+    columns = [model._meta.get_field(name).column for name in field_names]
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            "COPY {} ({}) FROM STDIN".format(
+                quote_name(model._meta.db_table),
+                ", ".join(quote_name(column) for column in columns),
+            ),
+            buffer,
+        )
@@ -0,0 +1,118 @@
+from rest_framework import serializers
+
+from .. import models
+from . import projection
+
+# leading columns of an exported table, followed by a column per field slug
+EXPORT_COLUMNS = ["form_submit", "created_on"]
+
+
+def export_columns(fields):
+    """Returns the column names of a risk model's exported table.
+
+    Arguments:
+        fields {list} -- Exported fields of the risk model, in order.
+    Returns:
+        {list} -- Column names.
+    """
+    return EXPORT_COLUMNS + [field.slug for field in fields]
+
+
+def field_value_rows(risk_model_id, chunk_size=2000):
+    """Yields the successful submissions of a risk model with their field
+    values, read from FieldValue only.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+    Keyword Arguments:
+        chunk_size {int} -- Rows fetched per cursor round trip.
+            (default: {2000})
+    Returns:
+        {generator} -- Same tuples as submission_rows.
+    """
+    return submission_rows(risk_model_id, chunk_size, read_documents=False)
+
+
+def submission_rows(risk_model_id, chunk_size=2000, read_documents=None):
+    """Yields the successful submissions of a risk model with their field
+    values, read from their risk data document if they have one, else from
+    FieldValue.
+    The form submits, joined to their documents, and the field values are
+    read in order from two server-side cursors and merged, so memory use
+    does not grow with the number of submissions. The FieldValue cursor is
+    only opened at the first submission without a document.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+    Keyword Arguments:
+        chunk_size {int} -- Rows fetched per cursor round trip.
+            (default: {2000})
+        read_documents {bool} -- Read the documents, defaults to whether
+            the submissions may have one. (default: {None})
+    Returns:
+        {generator} -- (form submit id, created on, field values) tuples,
+            field values being (field value id, field id, value) in id order.
+    """
+    if read_documents is None:
+        read_documents = projection.documents_readable()
+    columns = ["id", "created_on"]
+    if read_documents:
+        columns.append("document__values")
+    form_submits = (
+        models.FormSubmit.objects.filter(
+            risk_model_id=risk_model_id, success=True
+        )
+        .order_by("id")
+        .values_list(*columns)
+        .iterator(chunk_size=chunk_size)
+    )
+    field_values = None
+    field_value = None
+    for form_submit_id, created_on, *document in form_submits:
+        if document and document[0] is not None:
+            yield form_submit_id, created_on, document[0]
+            continue
+        if field_values is None:
+            field_values = (
+                models.FieldValue.objects.filter(
+                    form_submit__risk_model_id=risk_model_id,
+                    form_submit__success=True,
+                    form_submit_id__gte=form_submit_id,
+                )
+                .order_by("form_submit_id", "id")
+                .values_list("form_submit_id", "id", "field_id", "value")
+                .iterator(chunk_size=chunk_size)
+            )
+            field_value = next(field_values, None)
+        values = []
+        while field_value is not None and field_value[0] <= form_submit_id:
+            if field_value[0] == form_submit_id:
+                values.append(field_value[1:])
+            field_value = next(field_values, None)
+        yield form_submit_id, created_on, values
+
+
+def export_rows(risk_model_id, fields, chunk_size=2000):
+    """Yields the successful submissions of a risk model as a wide table,
+    one row per form submit and one column per field.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        fields {list} -- Exported fields of the risk model, in order.
+    Keyword Arguments:
+        chunk_size {int} -- Rows fetched per cursor round trip.
+            (default: {2000})
+    Returns:
+        {generator} -- Lists of the row values, in column order.
+    """
+    positions = {field.id: i for i, field in enumerate(fields)}
+    # timestamps are formatted like in the api responses
+    format_datetime = serializers.DateTimeField().to_representation
+    for form_submit_id, created_on, field_values in submission_rows(
+        risk_model_id, chunk_size
+    ):
+        values = [None] * len(fields)
+        for field_value_id, field_id, value in field_values:
+            if field_id in positions:
+                values[positions[field_id]] = value
+        yield [form_submit_id, format_datetime(created_on)] + values
@@ -0,0 +1,77 @@
+import hashlib
+import json
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from .. import models
+
+# validation attributes of a field, by the field types that validate them
+ATTRIBUTE_FIELD_TYPES = {
+    "min_length": ["email", "password", "regex", "text", "textarea", "url"],
+    "max_length": ["email", "password", "regex", "text", "textarea", "url"],
+    "choices": ["multiselect", "radio", "select"],
+    "regex_pattern": ["regex"],
+}
+
+# max age in seconds of an unversioned field types response, revalidated
+# with its ETag once stale
+MAX_AGE = 24 * 60 * 60
+
+# max age in seconds of a field types response requested with the current
+# version, which never changes
+VERSIONED_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def field_type_metadata():
+    """Describes the field types with their supported validation attributes.
+
+    Returns:
+        {list} -- 'text', 'value' and 'attributes' keyed dicts, in
+            FIELD_TYPES order.
+    """
+    return [
+        {
+            "text": text,
+            "value": value,
+            "attributes": [
+                attribute
+                for attribute, field_types in ATTRIBUTE_FIELD_TYPES.items()
+                if value in field_types
+            ],
+        }
+        for value, text in models.FIELD_TYPES
+    ]
+
+
+# field types response body, serialized once
+CONTENT = json.dumps(field_type_metadata(), indent=2).encode("utf-8") + b"\n"
+
+# hash of the field types, which changes with them only
+VERSION = hashlib.sha1(CONTENT).hexdigest()
+
+ETAG = quote_etag(VERSION)
+
+
+def field_types_response(request):
+    """Serves the precomputed field types, with a 304 if the client has
+    them, and cached for a year if requested with the current version
+    (?v=VERSION).
+
+    Arguments:
+        request {Request} -- GET request.
+    Returns:
+        {HttpResponse} -- Field types response.
+    """
+    response = get_conditional_response(request, etag=ETAG)
+    if response is None:
+        response = HttpResponse(CONTENT, content_type="application/json")
+    response["ETag"] = ETAG
+    if request.GET.get("v") == VERSION:
+        patch_cache_control(
+            response, public=True, max_age=VERSIONED_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=MAX_AGE)
+    return response
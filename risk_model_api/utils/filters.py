@@ -0,0 +1,326 @@
+import datetime
+import functools
+import operator as operator_module
+
+from django.conf import settings
+from django.contrib.postgres.fields.jsonb import KeyTextTransform, KeyTransform
+from django.contrib.postgres.search import SearchQueryField
+from django.db import connection
+from django.db.models import CharField, Func, Q, Value
+from django.db.models.functions import Cast
+from rest_framework import serializers
+
+from .. import models
+from . import typed_values
+
+# query parameters of the risk data log that are not field filters
+RESERVED_PARAMS = ["risk_model", "search", "cursor", "page_size", "format"]
+
+# text search configuration of the FieldValue search vectors, see migration
+# 0009
+SEARCH_CONFIG = "english"
+
+# lexemes of searched words, as in their search vector
+SEARCH_LEXEMES = "SELECT lexeme FROM unnest(to_tsvector(%s::regconfig, %s))"
+
+# separator of a filter's field slug and operator, "<slug>__<operator>"
+OPERATOR_SEPARATOR = "__"
+
+# separator of the values of an "in" filter
+IN_SEPARATOR = ","
+
+# filter operators, "eq" when the parameter has none
+OPERATORS = ["eq", "gt", "gte", "lt", "lte", "in", "prefix"]
+
+# values of an "in" filter at most
+MAX_IN_VALUES = 100
+
+# FieldValue lookup of each operator, by the column the field's values are
+# filtered on
+LOOKUPS = {
+    "number_value": {
+        "eq": "exact",
+        "gt": "gt",
+        "gte": "gte",
+        "lt": "lt",
+        "lte": "lte",
+        "in": "in",
+    },
+    "boolean_value": {"eq": "exact"},
+    # arrays match if they hold the value, or any of the "in" values
+    "array_value": {"eq": "contains", "in": "overlap"},
+    "value": {"eq": "exact", "in": "in", "prefix": "startswith"},
+}
+for column in ["float_value", "date_value", "time_value"]:
+    LOOKUPS[column] = LOOKUPS["number_value"]
+
+# RiskDataDocument lookups of the range and prefix operators, on the typed
+# value of the field in the document data, or its text for prefixes. The
+# "eq" and "in" filters are containments, on the GIN index of the data.
+DOCUMENT_LOOKUPS = {
+    "gt": (KeyTransform, "gt"),
+    "gte": (KeyTransform, "gte"),
+    "lt": (KeyTransform, "lt"),
+    "lte": (KeyTransform, "lte"),
+    "prefix": (KeyTextTransform, "startswith"),
+}
+
+# JSON type of the typed values in the document data, by column. JSON
+# values of different types are ordered by type, so range filters only
+# compare the values of the column's type.
+DOCUMENT_TYPES = {
+    "number_value": "number",
+    "float_value": "number",
+    "date_value": "string",
+    "time_value": "string",
+    "boolean_value": "boolean",
+    "array_value": "array",
+    "value": "string",
+}
+
+# parsers of the filtered values, by column
+PARSERS = {
+    "number_value": serializers.IntegerField(
+        min_value=typed_values.BIGINT_RANGE.start,
+        max_value=typed_values.BIGINT_RANGE.stop - 1,
+    ),
+    "float_value": serializers.FloatField(),
+    "date_value": serializers.DateField(),
+    "time_value": serializers.TimeField(),
+    "boolean_value": serializers.BooleanField(),
+    "array_value": serializers.CharField(),
+    "value": serializers.CharField(max_length=settings.FIELD_MAX_LENGTH),
+}
+
+
+def parse_filter(param):
+    """Splits a filter query parameter into its field slug and operator.
+
+    Arguments:
+        param {str} -- Query parameter, "<slug>" or "<slug>__<operator>".
+    Returns:
+        {tuple} -- (slug, operator), the operator defaults to "eq".
+    """
+    slug, separator, operator = param.rpartition(OPERATOR_SEPARATOR)
+    if separator and operator in OPERATORS:
+        return slug, operator
+    return param, "eq"
+
+
+def build_filters(plan, query_params):
+    """Compiles the field filters of a query string into FieldValue lookups.
+
+    Arguments:
+        plan {ValidatorPlan} -- Validator plan of the filtered risk model.
+        query_params {QueryDict} -- Query parameters, the reserved ones are
+            skipped.
+    Returns:
+        {list} -- (field, column, operator, value) tuples, column being the
+            typed FieldValue column of the field's values.
+    Raises:
+        {ValidationError} -- If a parameter is not a field of the risk
+            model, or its operator or value are invalid for the field type.
+    """
+    filters = []
+    errors = {}
+    for param, raw_values in query_params.lists():
+        if param in RESERVED_PARAMS:
+            continue
+        slug, operator = parse_filter(param)
+        field = plan.fields.get(slug)
+        if field is None:
+            errors[param] = [f"{slug} is not a field of this risk model."]
+            continue
+        column = typed_values.typed_column(field.field_type) or "value"
+        if operator not in LOOKUPS[column]:
+            errors[param] = [
+                f"{operator} is not a filter of {field.field_type} fields."
+            ]
+            continue
+        for raw_value in raw_values:
+            try:
+                value = parse_value(column, operator, raw_value)
+            except serializers.ValidationError as e:
+                errors[param] = e.detail
+                break
+            filters.append((field, column, operator, value))
+    if errors:
+        raise serializers.ValidationError(errors)
+    return filters
+
+
+def parse_value(column, operator, raw_value):
+    """Parses a filtered value, or the comma separated values of an "in"
+    filter, into the type of the filtered column.
+
+    Arguments:
+        column {str} -- Filtered FieldValue column.
+        operator {str} -- Filter operator.
+        raw_value {str} -- Query parameter value.
+    Returns:
+        {object} -- Lookup value.
+    Raises:
+        {ValidationError} -- If the value is invalid.
+    """
+    parser = PARSERS[column]
+    if operator != "in":
+        value = parser.run_validation(raw_value)
+        # arrays are looked up by the values they contain
+        return [value] if column == "array_value" else value
+    raw_values = raw_value.split(IN_SEPARATOR)
+    if len(raw_values) > MAX_IN_VALUES:
+        raise serializers.ValidationError(
+            [f"Ensure there are no more than {MAX_IN_VALUES} values."]
+        )
+    return [parser.run_validation(x) for x in raw_values]
+
+
+def document_value(value):
+    """Converts a filtered value to its typed value in the document data.
+
+    Arguments:
+        value {object} -- Parsed filter value.
+    Returns:
+        {object} -- JSON serializable value, dates and times as ISO strings.
+    """
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def document_filter(field, column, operator, value):
+    """Compiles a filter into a lookup of the risk data documents, on the
+    typed value of the field in their data.
+
+    Arguments:
+        field {FieldName} -- Filtered field.
+        column {str} -- Typed FieldValue column of the field's values.
+        operator {str} -- Filter operator.
+        value {object} -- Parsed filter value.
+    Returns:
+        {QuerySet} -- Matching RiskDataDocument queryset.
+    """
+    # the documents of a soft deleted field whose slug the field reuses
+    # were all written before it
+    documents = models.RiskDataDocument.objects.filter(
+        risk_model_id=field.risk_model_id,
+        primary=True,
+        form_submit__created_on__gte=field.created_on,
+    )
+    if operator in ["eq", "in"]:
+        values = value if operator == "in" else [value]
+        if column == "array_value" and operator == "in":
+            # arrays contain any of the "in" values
+            values = [[x] for x in value]
+        return documents.filter(
+            functools.reduce(
+                operator_module.or_,
+                (
+                    Q(data__contains={field.slug: document_value(x)})
+                    for x in values
+                ),
+            )
+        )
+    transform, lookup = DOCUMENT_LOOKUPS[operator]
+    return documents.annotate(
+        filtered_value=transform(field.slug, "data"),
+        filtered_type=Func(
+            KeyTransform(field.slug, "data"),
+            function="jsonb_typeof",
+            output_field=CharField(),
+        ),
+    ).filter(
+        filtered_type=DOCUMENT_TYPES[column],
+        **{f"filtered_value__{lookup}": document_value(value)},
+    )
+
+
+def filter_submissions(queryset, filters):
+    """Restricts form submits to the ones whose field values match all the
+    filters. Each filter is a semi-join on the index of its typed column,
+    and with the document storage on the risk data documents too.
+
+    Arguments:
+        queryset {QuerySet} -- FormSubmit queryset.
+        filters {list} -- (field, column, operator, value) tuples of
+            build_filters.
+    Returns:
+        {QuerySet} -- Filtered queryset.
+    """
+    documents = settings.RISK_DATA_STORAGE == "document"
+    for field, column, operator, value in filters:
+        lookup = f"{column}__{LOOKUPS[column][operator]}"
+        match = Q(
+            id__in=models.FieldValue.objects.filter(
+                field=field, **{lookup: value}
+            ).values("form_submit_id")
+        )
+        if documents:
+            # the submissions stored as FieldValue rows before the switch to
+            # documents are filtered too
+            match |= Q(
+                id__in=document_filter(field, column, operator, value).values(
+                    "form_submit_id"
+                )
+            )
+        queryset = queryset.filter(match)
+    return queryset
+
+
+def search_lexemes(text):
+    """Parses searched words into the lexemes they are searched by, stemmed
+    and without stop words, as the search vectors are built.
+
+    Arguments:
+        text {str} -- Searched words.
+    Returns:
+        {list} -- Lexemes.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_LEXEMES, [SEARCH_CONFIG, text])
+        return [lexeme for (lexeme,) in cursor.fetchall()]
+
+
+def lexeme_query(lexeme):
+    """Builds the text search query of a single lexeme, which is matched as
+    is rather than parsed again.
+
+    Arguments:
+        lexeme {str} -- Lexeme.
+    Returns:
+        {Cast} -- tsquery expression.
+    """
+    # the quotes and backslashes of a tsquery literal are doubled
+    quoted = "'{}'".format(lexeme.replace("\\", "\\\\").replace("'", "''"))
+    return Cast(Value(quoted), SearchQueryField())
+
+
+def search_submissions(queryset, text):
+    """Restricts form submits to the ones whose text and textarea values
+    match a full-text search, each of the words in any of the values, with
+    a semi-join per word on the GIN index of the search vectors.
+
+    Arguments:
+        queryset {QuerySet} -- FormSubmit queryset.
+        text {str} -- Searched words, all of them must match.
+    Returns:
+        {QuerySet} -- Filtered queryset.
+    Raises:
+        {ValidationError} -- If the submissions are stored as documents,
+            which have no search vectors.
+    """
+    if settings.RISK_DATA_STORAGE == "document":
+        raise serializers.ValidationError(
+            {"search": ["Search is not available with the document storage."]}
+        )
+    lexemes = search_lexemes(text)
+    if not lexemes:
+        # stop words only
+        return queryset.none()
+    for lexeme in lexemes:
+        queryset = queryset.filter(
+            id__in=models.FieldValue.objects.filter(
+                search_vector=lexeme_query(lexeme)
+            ).values("form_submit_id")
+        )
+    return queryset
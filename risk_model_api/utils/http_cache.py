@@ -0,0 +1,147 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+from .. import models
+
+
+def make_etag(*parts):
+    """Derives a strong ETag from version parts.
+
+    Arguments:
+        *parts {object} -- Parts of the version, converted to text.
+    Returns:
+        {str} -- Quoted ETag.
+    """
+    version = "|".join(str(x) for x in parts)
+    return quote_etag(hashlib.sha1(version.encode("utf-8")).hexdigest())
+
+
+def latest(*timestamps):
+    """Returns the latest of timestamps, ignoring the missing ones.
+
+    Arguments:
+        *timestamps {datetime} -- Timestamps, or None.
+    Returns:
+        {datetime} -- Latest timestamp, or None if all are missing.
+    """
+    return max((x for x in timestamps if x is not None), default=None)
+
+
+def risk_model_version(risk_model_id, representation):
+    """Reads the version of a risk model and its fields in a single query,
+    including the fields soft deleted since.
+
+    Arguments:
+        risk_model_id {str} -- Risk model id.
+        representation {str} -- Format of the rendered response, each
+            representation has its own ETag.
+    Returns:
+        {tuple} -- (etag, last modified), or None if the risk model does not
+            exist.
+    """
+    try:
+        version = (
+            models.RiskModel.objects.filter(id=risk_model_id)
+            .annotate(fields_updated_on=Max("fields__updated_on"))
+            .values_list("schema_version", "updated_on", "fields_updated_on")
+            .first()
+        )
+    except ValueError:
+        return None
+    if version is None:
+        return None
+    schema_version, updated_on, fields_updated_on = version
+    return (
+        make_etag(
+            risk_model_id,
+            representation,
+            schema_version,
+            updated_on,
+            fields_updated_on,
+        ),
+        latest(updated_on, fields_updated_on),
+    )
+
+
+def risk_models_version(query_string, representation):
+    """Reads the version of all the risk models and their fields, which
+    versions every page of the risk model list.
+
+    Arguments:
+        query_string {str} -- Query string of the listed page.
+        representation {str} -- Format of the rendered response, each
+            representation has its own ETag.
+    Returns:
+        {tuple} -- (etag, last modified).
+    """
+    risk_models = models.RiskModel.objects.aggregate(
+        count=Count("id"),
+        schema_versions=Sum("schema_version"),
+        updated_on=Max("updated_on"),
+    )
+    fields = models.FieldName.all_objects.aggregate(
+        count=Count("id"), updated_on=Max("updated_on")
+    )
+    return (
+        make_etag(
+            query_string,
+            representation,
+            *sorted(risk_models.items()),
+            *sorted(fields.items()),
+        ),
+        latest(risk_models["updated_on"], fields["updated_on"]),
+    )
+
+
+def patch_cache_headers(response, etag, last_modified):
+    """Sets the validators, Cache-Control and Vary headers of a response.
+
+    Arguments:
+        response {HttpResponse} -- Response.
+        etag {str} -- Quoted ETag.
+        last_modified {datetime} -- Last modification, or None.
+    Returns:
+        {HttpResponse} -- The response.
+    """
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    # shared caches (e.g. CloudFront) may store the response, and revalidate
+    # it once stale
+    patch_cache_control(
+        response, public=True, max_age=settings.RISK_MODEL_CACHE_MAX_AGE
+    )
+    # the JSON and browsable API representations are cached apart
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def not_modified(request, etag, last_modified):
+    """Checks the conditional headers of a GET request against a version.
+
+    Arguments:
+        request {Request} -- Request.
+        etag {str} -- Quoted ETag of the current version.
+        last_modified {datetime} -- Last modification, or None.
+    Returns:
+        {HttpResponse} -- 304 response with the cache headers if the client
+            has the current version, else None.
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=(
+            int(last_modified.timestamp()) if last_modified else None
+        ),
+    )
+    if response is None:
+        return None
+    return patch_cache_headers(response, etag, last_modified)
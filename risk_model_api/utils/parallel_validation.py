@@ -0,0 +1,115 @@
+import multiprocessing
+
+import django
+from rest_framework.exceptions import ParseError
+
+# The workers are spawned, so that they do not inherit the db connections of
+# the main process, and this module is imported in them before Django is set
+# up: the models are imported in init_worker only.
+
+# processor of the submissions validated by the worker, set by init_worker
+_processor = None
+
+
+def field_definition(field):
+    """Describes a field as the values of its concrete model fields, which
+    rebuild it in a worker without a query.
+
+    Arguments:
+        field {FieldName} -- Field of a risk model.
+    Returns:
+        {dict} -- Values keyed by attribute name.
+    """
+    return {
+        x.attname: getattr(field, x.attname)
+        for x in field._meta.concrete_fields
+    }
+
+
+def plan_definitions(plans):
+    """Describes validator plans as the definitions of their fields.
+
+    Arguments:
+        plans {dict} -- Validator plans, keyed by risk model id.
+    Returns:
+        {dict} -- (schema version, field definitions) tuples, keyed by risk
+            model id.
+    """
+    return {
+        risk_model_id: (
+            plan.version,
+            [field_definition(x) for x in plan.fields.values()],
+        )
+        for risk_model_id, plan in plans.items()
+    }
+
+
+def init_worker(definitions):
+    """Sets up Django in a worker and compiles the validator plans it was
+    started with.
+
+    Arguments:
+        definitions {dict} -- Plan definitions, see plan_definitions.
+    """
+    global _processor
+    django.setup()
+    from .. import models
+    from . import serializer_helpers, validator_plan
+
+    plans = {
+        risk_model_id: validator_plan.ValidatorPlan(
+            [models.FieldName(**x) for x in fields], version
+        )
+        for risk_model_id, (version, fields) in definitions.items()
+    }
+    _processor = serializer_helpers.WorkerRiskDataProcessor(plans)
+
+
+def validate_chunk(submissions):
+    """Validates a chunk of submissions in a worker.
+
+    Arguments:
+        submissions {list} -- (index, submission) pairs.
+    Returns:
+        {list} -- Results of WorkerRiskDataProcessor.validate_chunk.
+    """
+    return _processor.validate_chunk(submissions)
+
+
+def validation_pool(workers, plans):
+    """Starts a pool of validation workers, which do not access the db.
+
+    Arguments:
+        workers {int} -- Number of worker processes.
+        plans {dict} -- Validator plans the workers validate against, keyed
+            by risk model id.
+    Returns:
+        {Pool} -- Pool, terminated on exiting its context.
+    """
+    return multiprocessing.get_context("spawn").Pool(
+        workers, init_worker, (plan_definitions(plans),)
+    )
+
+
+def submit(pool, chunk):
+    """Submits a chunk of submissions to a validation worker. The malformed
+    lines of a streamed body are sent as None, which the worker defers.
+
+    Arguments:
+        pool {Pool} -- Validation pool.
+        chunk {list} -- (index, submission) pairs.
+    Returns:
+        {AsyncResult} -- Pending result of the worker.
+    """
+    return pool.apply_async(
+        validate_chunk,
+        (
+            [
+                (
+                    index,
+                    None if isinstance(submission, ParseError) else submission,
+                )
+                for index, submission in chunk
+            ],
+        ),
+    )
@@ -0,0 +1,108 @@
+import datetime
+
+from django.conf import settings
+
+from .. import models
+from . import typed_values, validator_plan
+
+
+def projection_enabled():
+    """Checks if the risk data documents are maintained.
+
+    Returns:
+        {bool} -- The RISK_DATA_PROJECTION setting.
+    """
+    return settings.RISK_DATA_PROJECTION
+
+
+def documents_readable():
+    """Checks if the submissions may have a risk data document to read
+    their values from.
+
+    Returns:
+        {bool} -- True if the projection is maintained or the submissions
+            are stored as documents.
+    """
+    return projection_enabled() or settings.RISK_DATA_STORAGE == "document"
+
+
+def typed_value(field_type, value):
+    """Converts a stored field value to the typed value of its field type,
+    as stored in the risk data documents: the value of its typed column, see
+    typed_values.parse_stored_value, with dates and times kept as ISO
+    strings.
+
+    Arguments:
+        field_type {str} -- Field type of the value's field.
+        value {str} -- Stored value.
+    Returns:
+        {object} -- JSON serializable typed value.
+    """
+    parsed = typed_values.parse_stored_value(field_type, value)
+    if isinstance(parsed, (datetime.date, datetime.time)):
+        return parsed.isoformat()
+    return parsed
+
+
+def build_document(form_submit_id, risk_model_id, field_values, primary=False):
+    """Builds the risk data document of a submission.
+
+    Arguments:
+        form_submit_id {int} -- Form submit id.
+        risk_model_id {int} -- Risk model id.
+        field_values {list} -- (field value id, field, value) of the
+            submission's field values, in id order.
+    Keyword Arguments:
+        primary {bool} -- The document is the storage of the submission.
+            (default: {False})
+    Returns:
+        {RiskDataDocument} -- Unsaved document.
+    """
+    # the values as they are stored by FieldValue
+    prep_value = models.FieldValue._meta.get_field("value").get_prep_value
+    field_values = [
+        (field_value_id, field, prep_value(value))
+        for field_value_id, field, value in field_values
+    ]
+    return models.RiskDataDocument(
+        form_submit_id=form_submit_id,
+        risk_model_id=risk_model_id,
+        primary=primary,
+        values=[
+            [field_value_id, field.id, value]
+            for field_value_id, field, value in field_values
+        ],
+        data={
+            field.slug: typed_value(field.field_type, value)
+            for field_value_id, field, value in field_values
+        },
+    )
+
+
+def document_field_values(document):
+    """Returns the field values of a risk data document as unsaved
+    FieldValue instances, for the FieldValue serializers. The fields are
+    taken from the validator plan, the ones missing from it (soft deleted
+    since) are fetched.
+
+    Arguments:
+        document {RiskDataDocument} -- Risk data document.
+    Returns:
+        {list} -- FieldValue instances, in id order.
+    """
+    plan = validator_plan.get_plan(document.risk_model_id)
+    fields = {field.id: field for field in plan.fields.values()}
+    missing_field_ids = {
+        field_id for _, field_id, _ in document.values
+    }.difference(fields)
+    if missing_field_ids:
+        fields.update(models.FieldName.all_objects.in_bulk(missing_field_ids))
+    return [
+        models.FieldValue(
+            id=field_value_id,
+            form_submit_id=document.form_submit_id,
+            field=fields[field_id],
+            value=value,
+        )
+        for field_value_id, field_id, value in document.values
+    ]
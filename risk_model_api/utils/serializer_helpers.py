@@ -1,9 +1,15 @@
+import collections
+import itertools
+
+from django.conf import settings
+from django.db import transaction
 from django.http import QueryDict
-from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import exceptions
 
 from .. import models
 from ..v1 import serializers
-from . import utils
+from . import bulk_copy, parallel_validation, storage, utils, validator_plan
 
 
 class RiskDataProcessor:
@@ -16,6 +22,9 @@ class RiskDataProcessor:
         instantiate class with request data
         """
         self.data = data
+        # risk models whose plan was reloaded by this processor
+        self.reloaded_plans = set()
+        self.storage = storage.get_storage()
 
     def querydict_to_dict(self):
         """
@@ -26,62 +35,93 @@ class RiskDataProcessor:
             return utils.nested_field_parse(self.data)
         return self.data
 
-    def build_field_value_object(self, field, value, form_submit):
+    def clean_value(self, field, value):
         """
-        builds and returns a FieldValue dict
+        normalizes a submitted value before validation
         """
         value = None if value == "" else value
         if field.field_type in ["checkbox", "switch"] and value is None:
             value = False
-        field_value_data = {
-            "form_submit": form_submit.pk,
-            "field": field.pk,
-            "value": value,
-        }
-        return field_value_data
+        return value
+
+    def get_plan(self, risk_model_id, data):
+        """
+        returns the compiled validator plan of the risk model
+        """
+        plan = validator_plan.get_plan(risk_model_id)
+        if (
+            not set(data).issubset(plan.fields)
+            and risk_model_id not in self.reloaded_plans
+        ):
+            # the cached plan may predate fields added since, reload it once
+            plan = validator_plan.get_plan(risk_model_id, reload=True)
+            self.reloaded_plans.add(risk_model_id)
+        return plan
+
+    def check_unique_values(self, field_values):
+        """
+        checks the values of unique fields against successful submissions in
+        a single query
+        """
+        taken_positions = self.storage.taken_values(field_values)
+        for i, (field, value) in enumerate(field_values):
+            if i in taken_positions:
+                raise serializers.ValidationError(
+                    {field.name: ["An entry with this value already exists."]}
+                )
+
+    def validate_field_values(self, plan, data):
+        """
+        validates the individual field-value pairs in the 'data' nested dict
+        and returns them as a list of (field, value) pairs
+        """
+        field_values = []
+        for slug, value in data.items():
+            field = plan.fields.get(slug)
+            if field is None:
+                raise serializers.ValidationError(
+                    {"data": [f"{slug} is not a field of this risk model."]}
+                )
+            value = plan.validate(field, self.clean_value(field, value))
+            field_values.append((field, value))
+        return field_values
+
+    def store_files(self, field_values):
+        """
+        stores the files of 'file' fields and swaps them for their url in
+        the validated field-value pairs
+        """
+        stored_field_values = []
+        for field, value in field_values:
+            if field.field_type == "file" and value is not None:
+                value = utils.store_file(value)
+            stored_field_values.append((field, value))
+        return stored_field_values
 
     def create_fields_data(self):
         """
-        validate and create risk form field data
+        validate and create risk form field data.
+        Nothing is written unless all the data is valid, the form submit and
+        its field values are then inserted in a single transaction.
         """
-        # Log form submission event
-        form_submit = models.FormSubmit.objects.create(
-            risk_model_id=self.validated_data["risk_model"]
+        plan = self.get_plan(
+            self.validated_data["risk_model"], self.validated_data["data"]
         )
-        # loop through the individual field-value pairs in the 'data' nested
-        # dict, validate and append to list for efficient bulk create
-        bulk_field_value_ls = []
-        for field, value in self.validated_data["data"].items():
-            field = get_object_or_404(models.FieldName, slug=field)
-            field_value_data = self.build_field_value_object(
-                field, value, form_submit
-            )
-            context = {"field": field}
-            field_value_serializer = serializers.FieldValueSerializer(
-                data=field_value_data, context=context
+        field_values = self.validate_field_values(
+            plan, self.validated_data["data"]
+        )
+        self.check_unique_values(
+            [(field, value) for field, value in field_values if field.unique]
+        )
+        # files are stored ahead of the transaction, to keep it short
+        field_values = self.store_files(field_values)
+        with transaction.atomic():
+            # Log form submission event
+            form_submit = models.FormSubmit.objects.create(
+                risk_model_id=self.validated_data["risk_model"], success=True
             )
-            if field_value_serializer.is_valid():
-                # if field type is file and validation is successful,
-                # store file, then update field with file url
-                if field.field_type == "file":
-                    field_value_serializer.validated_data[
-                        "value"
-                    ] = utils.store_file(value)
-                bulk_field_value_ls.append(
-                    models.FieldValue(**field_value_serializer.validated_data)
-                )
-            else:
-                error_dict = field_value_serializer.errors
-                if "value" in error_dict:
-                    # rename the 'value' key to that of the field name
-                    error_dict[field.name] = error_dict.pop("value")
-                    raise serializers.ValidationError(error_dict)
-                else:
-                    raise serializers.ValidationError(error_dict)
-        # bulk save form data
-        models.FieldValue.objects.bulk_create(bulk_field_value_ls)
-        form_submit.success = True
-        form_submit.save()
+            # save form data
+            self.storage.insert([form_submit], [field_values])
         data = {
             "form_submit": form_submit.pk,
             "risk_model": self.validated_data["risk_model"],
@@ -89,3 +129,416 @@ class RiskDataProcessor:
             "time_created": form_submit.created_on,
         }
         return data
+
+
+class BulkRiskDataProcessor(RiskDataProcessor):
+    """
+    Class that helps with creating many risk data submissions at once
+    """
+
+    def __init__(
+        self, submissions, chunk_size=None, use_copy=False, workers=None
+    ):
+        """
+        instantiate class with a list or iterator of submissions. The
+        submissions are written in chunks of about 'chunk_size' field values,
+        with COPY if 'use_copy' is set and the db supports it. The chunks are
+        validated by a pool of 'workers' processes if more than one.
+        """
+        super().__init__(submissions)
+        self.chunk_size = chunk_size or settings.RISK_DATA_BULK_CHUNK_SIZE
+        self.use_copy = use_copy and bulk_copy.supports_copy()
+        self.workers = (
+            settings.RISK_DATA_VALIDATION_WORKERS
+            if workers is None
+            else workers
+        )
+        self.serializer = serializers.RiskDataSerializer()
+
+    def prepare_submission(self, submission):
+        """
+        validates a submission, but for its field values, and returns its
+        validated data and the validator plan of its risk model
+        """
+        # a single serializer is reused, sparing the per instance deep copy of
+        # its fields
+        validated_data = self.serializer.run_validation(submission)
+        plan = self.get_plan(
+            validated_data["risk_model"], validated_data["data"]
+        )
+        return validated_data, plan
+
+    def validate_chunk(self, submissions):
+        """
+        validates a chunk of (index, submission) pairs and returns an
+        (index, validated, errors) tuple per submission, in order, validated
+        being its validated data and (field, value) pairs if it is valid.
+        The field values are validated column by column, one column per
+        field, and each submission gets the first error of its data, as if
+        validated on its own. The deferred submissions get None.
+        """
+        results = [None] * len(submissions)
+        pending = []
+        columns = {}
+        for i, (index, submission) in enumerate(submissions):
+            if isinstance(submission, exceptions.ParseError):
+                # a malformed line of a streamed body
+                results[i] = (
+                    index,
+                    None,
+                    {"non_field_errors": [submission.detail]},
+                )
+                continue
+            try:
+                validated_data, plan = self.prepare_submission(submission)
+            except exceptions.ValidationError as e:
+                results[i] = (index, None, e.detail)
+                continue
+            except DeferredSubmission:
+                # left to the main process, see WorkerRiskDataProcessor
+                continue
+            pending.append((i, index, validated_data, plan))
+            for slug, value in validated_data["data"].items():
+                field = plan.fields.get(slug)
+                if field is None:
+                    break
+                positions, values = columns.setdefault((plan, slug), ([], []))
+                positions.append(i)
+                values.append(self.clean_value(field, value))
+        validated_columns = {}
+        for (plan, slug), (positions, values) in columns.items():
+            validated_columns[plan, slug] = dict(
+                zip(
+                    positions,
+                    zip(*plan.validate_column(plan.fields[slug], values)),
+                )
+            )
+        for i, index, validated_data, plan in pending:
+            field_values = []
+            errors = None
+            for slug in validated_data["data"]:
+                field = plan.fields.get(slug)
+                if field is None:
+                    errors = {
+                        "data": [f"{slug} is not a field of this risk model."]
+                    }
+                    break
+                value, errors = validated_columns[plan, slug][i]
+                if errors is not None:
+                    break
+                field_values.append((field, value))
+            if errors is not None:
+                results[i] = (index, None, errors)
+            else:
+                results[i] = (
+                    index,
+                    (validated_data, self.store_files(field_values)),
+                    None,
+                )
+        return results
+
+    def check_unique_chunk(self, chunk):
+        """
+        checks the unique values of a chunk of validated submissions, against
+        successful submissions and the submissions before them in the chunk,
+        in a single query. Returns the errors keyed by chunk position.
+        """
+        unique_values = [
+            (i, field, value)
+            for i, (index, validated, errors) in enumerate(chunk)
+            if validated is not None
+            for field, value in validated[1]
+            if field.unique
+        ]
+        taken_positions = self.storage.taken_values(
+            [(field, value) for i, field, value in unique_values]
+        )
+        submission_values = {}
+        for position, (i, field, value) in enumerate(unique_values):
+            submission_values.setdefault(i, []).append(
+                (position, field, value)
+            )
+        chunk_errors = {}
+        claimed_keys = set()
+        for i, values in submission_values.items():
+            keys = []
+            for position, field, value in values:
+                key = models.FieldValue.objects.value_key(field, value)
+                if position in taken_positions or key in claimed_keys:
+                    chunk_errors[i] = {
+                        field.name: [
+                            "An entry with this value already exists."
+                        ]
+                    }
+                    break
+                keys.append(key)
+            else:
+                # the submission is accepted, its values are now taken
+                claimed_keys.update(keys)
+        return chunk_errors
+
+    def insert_chunk(self, accepted):
+        """
+        inserts the form submits and field values of the accepted
+        submissions of a chunk and returns the form submits, in order
+        """
+        # Log form submission events
+        form_submits = [
+            models.FormSubmit(
+                risk_model_id=validated_data["risk_model"], success=True
+            )
+            for i, validated_data, field_values in accepted
+        ]
+        if self.use_copy:
+            self.copy_form_submits(form_submits)
+        else:
+            models.FormSubmit.objects.bulk_create(form_submits)
+        # bulk save form data
+        self.storage.insert(
+            form_submits,
+            [field_values for i, validated_data, field_values in accepted],
+            use_copy=self.use_copy,
+            batch_size=self.chunk_size,
+        )
+        return form_submits
+
+    def copy_form_submits(self, form_submits):
+        """
+        inserts form submits with COPY
+        """
+        now = timezone.now()
+        # the ids are reserved up front, COPY does not return them
+        form_submit_ids = bulk_copy.reserve_ids(
+            models.FormSubmit, len(form_submits)
+        )
+        for form_submit, form_submit_id in zip(form_submits, form_submit_ids):
+            form_submit.pk = form_submit_id
+            form_submit.created_on = now
+        bulk_copy.copy_rows(
+            models.FormSubmit,
+            ["id", "risk_model", "success", "created_on"],
+            (
+                (x.pk, x.risk_model_id, x.success, x.created_on)
+                for x in form_submits
+            ),
+        )
+
+    def write_chunk(self, chunk):
+        """
+        writes a chunk of validated submissions in a single transaction and
+        returns the per submission results, in order
+        """
+        chunk_errors = self.check_unique_chunk(chunk)
+        accepted = [
+            (i, *validated)
+            for i, (index, validated, errors) in enumerate(chunk)
+            if validated is not None and i not in chunk_errors
+        ]
+        with transaction.atomic():
+            form_submits = self.insert_chunk(accepted)
+        created = {
+            i: (validated_data, form_submit)
+            for form_submit, (i, validated_data, field_values) in zip(
+                form_submits, accepted
+            )
+        }
+        results = []
+        for i, (index, validated, errors) in enumerate(chunk):
+            errors = errors or chunk_errors.get(i)
+            if errors:
+                results.append({"index": index, "errors": errors})
+                continue
+            validated_data, form_submit = created[i]
+            results.append(
+                {
+                    "index": index,
+                    "form_submit": form_submit.pk,
+                    "risk_model": validated_data["risk_model"],
+                    "risk_model_name": validated_data["risk_model_name"],
+                    "time_created": form_submit.created_on,
+                }
+            )
+        return results
+
+    def chunks(self):
+        """
+        yields the submissions in chunks of (index, submission) pairs, of
+        about 'chunk_size' field values
+        """
+        chunk = []
+        chunk_rows = 0
+        for index, submission in enumerate(self.data):
+            chunk.append((index, submission))
+            if isinstance(submission, dict) and isinstance(
+                submission.get("data"), dict
+            ):
+                chunk_rows += len(submission["data"])
+            if chunk_rows >= self.chunk_size or len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+                chunk_rows = 0
+        if chunk:
+            yield chunk
+
+    def worker_plans(self, chunk):
+        """
+        returns the validator plans of the risk models submitted to in a
+        chunk, keyed by risk model id, which the validation workers are
+        started with
+        """
+        plans = {}
+        for index, submission in chunk:
+            if not isinstance(submission, dict):
+                continue
+            risk_model_id = submission.get("risk_model")
+            if type(risk_model_id) is not int or risk_model_id in plans:
+                continue
+            try:
+                plans[risk_model_id] = validator_plan.get_plan(risk_model_id)
+            except models.RiskModel.DoesNotExist:
+                pass
+        return plans
+
+    def merge_worker_results(self, chunk, worker_results, plans):
+        """
+        completes the results of a chunk validated by a worker: the fields of
+        the valid submissions are looked up by slug and their files stored,
+        and the submissions the worker deferred are validated here
+        """
+        results = []
+        deferred = []
+        for (index, submission), result in zip(chunk, worker_results):
+            if result is None:
+                deferred.append(len(results))
+                results.append((index, submission))
+                continue
+            index, validated, errors = result
+            if validated is not None:
+                validated_data, slug_values = validated
+                fields = plans[validated_data["risk_model"]].fields
+                validated = (
+                    validated_data,
+                    self.store_files(
+                        [(fields[slug], value) for slug, value in slug_values]
+                    ),
+                )
+            results.append((index, validated, errors))
+        if deferred:
+            deferred_results = self.validate_chunk(
+                [results[i] for i in deferred]
+            )
+            for i, result in zip(deferred, deferred_results):
+                results[i] = result
+        return results
+
+    def validate_in_parallel(self, chunks):
+        """
+        yields the validated chunks, in order, validated by a pool of worker
+        processes at most a chunk per worker ahead of the writes
+        """
+        chunks = iter(chunks)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            return
+        plans = self.worker_plans(first_chunk)
+        with parallel_validation.validation_pool(self.workers, plans) as pool:
+            pending = collections.deque()
+            for chunk in itertools.chain([first_chunk], chunks):
+                pending.append(
+                    (chunk, parallel_validation.submit(pool, chunk))
+                )
+                if len(pending) > self.workers:
+                    chunk, result = pending.popleft()
+                    yield self.merge_worker_results(chunk, result.get(), plans)
+            while pending:
+                chunk, result = pending.popleft()
+                yield self.merge_worker_results(chunk, result.get(), plans)
+
+    def create_fields_data(self):
+        """
+        validate and create the risk form field data of all the submissions.
+        The submissions are validated and inserted in chunks and a result is
+        yielded per submission, in order. With more than one worker, the
+        chunks are validated by worker processes while the previous ones are
+        written here, by this process only.
+        The submissions are consumed lazily, so at most a chunk of them (per
+        worker) is held in memory.
+        """
+        if self.workers > 1:
+            validated_chunks = self.validate_in_parallel(self.chunks())
+        else:
+            validated_chunks = map(self.validate_chunk, self.chunks())
+        for validated_chunk in validated_chunks:
+            yield from self.write_chunk(validated_chunk)
+
+
+class DeferredSubmission(Exception):
+    """
+    Raised by a validation worker for a submission it cannot validate
+    without db access, which is left to the main process
+    """
+
+
+class WorkerRiskDataProcessor(BulkRiskDataProcessor):
+    """
+    Class that validates chunks of submissions in a validation worker
+    process, against the validator plans it was started with
+    """
+
+    def __init__(self, plans):
+        """
+        instantiate class with the validator plans, keyed by risk model id
+        """
+        super().__init__([], workers=0)
+        self.plans = plans
+        self.serializer = serializers.RiskDataSerializer(
+            context={"plans": plans}
+        )
+
+    def prepare_submission(self, submission):
+        """
+        defers the malformed submissions and those of other risk models
+        """
+        if not isinstance(submission, dict):
+            raise DeferredSubmission()
+        risk_model_id = submission.get("risk_model")
+        if type(risk_model_id) is not int or risk_model_id not in self.plans:
+            raise DeferredSubmission()
+        return super().prepare_submission(submission)
+
+    def get_plan(self, risk_model_id, data):
+        """
+        returns the validator plan of the risk model, and defers the
+        submissions with fields it is missing, maybe added since
+        """
+        plan = self.plans[risk_model_id]
+        if not set(data).issubset(plan.fields):
+            raise DeferredSubmission()
+        return plan
+
+    def store_files(self, field_values):
+        """
+        leaves the files to the main process
+        """
+        return field_values
+
+    def validate_chunk(self, submissions):
+        """
+        validates a chunk of (index, submission) pairs, with the validated
+        field values as (slug, value) pairs, which are sent back to the main
+        process without their field
+        """
+        results = super().validate_chunk(submissions)
+        for i, result in enumerate(results):
+            if result is None or result[1] is None:
+                continue
+            index, (validated_data, field_values), errors = result
+            results[i] = (
+                index,
+                (
+                    validated_data,
+                    [(field.slug, value) for field, value in field_values],
+                ),
+                errors,
+            )
+        return results
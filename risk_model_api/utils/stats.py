@@ -0,0 +1,578 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from psycopg2.extras import execute_values
+
+from .. import models
+from . import typed_values
+
+# field types whose values are counted per choice
+CHOICE_FIELD_TYPES = ["select", "radio"]
+
+# field types whose values are aggregated
+NUMERIC_FIELD_TYPES = ["number", "float"]
+
+# adds up the daily submission counts of an insert to the rollup
+UPSERT_SUBMISSION_ROLLUPS = """
+INSERT INTO {table} (risk_model_id, day, count) VALUES %s
+ON CONFLICT (risk_model_id, day)
+DO UPDATE SET count = {table}.count + EXCLUDED.count
+"""
+
+# adds up the daily field value aggregates of an insert to the rollup
+UPSERT_FIELD_VALUE_ROLLUPS = """
+INSERT INTO {table} (
+    field_id, day, value, count, {total}, {minimum}, {maximum}
+)
+VALUES %s
+ON CONFLICT (field_id, day, value)
+DO UPDATE SET
+    count = {table}.count + EXCLUDED.count,
+    {total} = {table}.{total} + EXCLUDED.{total},
+    {minimum} = LEAST({table}.{minimum}, EXCLUDED.{minimum}),
+    {maximum} = GREATEST({table}.{maximum}, EXCLUDED.{maximum})
+"""
+
+# FieldValueRollup columns of the total, minimum and maximum of the values
+# of each numeric field type, and of the choice counts
+AGGREGATE_COLUMNS = {
+    "number": ["number_total", "number_minimum", "number_maximum"],
+    "float": ["total", "minimum", "maximum"],
+    "choice": ["total", "minimum", "maximum"],
+}
+
+# counts the stored values of the fields in the primary risk data documents
+# of a risk model's successful submissions, per field{, day} and value. The
+# field of a value is the one of its document entry.
+DOCUMENT_CHOICE_COUNTS = """
+SELECT field.id, {day}entry ->> 2, COUNT(*)
+FROM {document} document
+JOIN {form_submit} form_submit ON form_submit.id = document.form_submit_id
+CROSS JOIN LATERAL jsonb_array_elements(document."values") entry
+JOIN {field} field ON field.id = (entry ->> 1)::integer
+WHERE document.risk_model_id = %s AND document."primary"
+AND form_submit.success AND field.id = ANY(%s) AND entry ->> 2 IS NOT NULL
+GROUP BY {group}
+"""
+
+# aggregates the typed values of the fields in the primary risk data
+# documents of a risk model's successful submissions, per field{, day}.
+# Number values beyond the bigint range are skipped, as in the number_value
+# column.
+DOCUMENT_NUMBER_AGGREGATES = """
+SELECT field.id, {day}COUNT(*), SUM(typed.value), MIN(typed.value),
+    MAX(typed.value)
+FROM {document} document
+JOIN {form_submit} form_submit ON form_submit.id = document.form_submit_id
+CROSS JOIN LATERAL jsonb_array_elements(document."values") entry
+JOIN {field} field ON field.id = (entry ->> 1)::integer
+CROSS JOIN LATERAL (
+    SELECT CASE
+        WHEN jsonb_typeof(document.data -> field.slug) = 'number'
+        THEN (document.data ->> field.slug)::numeric
+    END AS value
+) typed
+WHERE document.risk_model_id = %s AND document."primary"
+AND form_submit.success AND field.id = ANY(%s) AND typed.value IS NOT NULL
+AND (field.field_type = 'float' OR typed.value BETWEEN %s AND %s)
+GROUP BY {group}
+"""
+
+
+def rollups_enabled():
+    """Checks if the stats rollups are maintained.
+
+    Returns:
+        {bool} -- The RISK_DATA_STATS_ROLLUP setting.
+    """
+    return settings.RISK_DATA_STATS_ROLLUP
+
+
+def documents_stored():
+    """Checks if the submissions are stored as primary risk data documents,
+    whose field values are aggregated along with the FieldValue rows.
+
+    Returns:
+        {bool} -- The RISK_DATA_STORAGE setting is "document".
+    """
+    return settings.RISK_DATA_STORAGE == "document"
+
+
+def add_aggregate(aggregates, key, aggregate):
+    """Adds a [count, total, minimum, maximum] aggregate up to the one of
+    the same key.
+
+    Arguments:
+        aggregates {dict} -- Aggregates, updated in place.
+        key {tuple} -- Key of the aggregate.
+        aggregate {list} -- Added aggregate.
+    """
+    current = aggregates.get(key)
+    if current is None:
+        aggregates[key] = list(aggregate)
+        return
+    aggregates[key] = [
+        current[0] + aggregate[0],
+        current[1] + aggregate[1],
+        min(current[2], aggregate[2]),
+        max(current[3], aggregate[3]),
+    ]
+
+
+def document_rows(
+    query, risk_model_id, fields, keys, params=(), per_day=False
+):
+    """Runs an aggregate query of the primary risk data documents of a risk
+    model.
+
+    Arguments:
+        query {str} -- DOCUMENT_CHOICE_COUNTS or DOCUMENT_NUMBER_AGGREGATES.
+        risk_model_id {int} -- Risk model id.
+        fields {list} -- Aggregated fields.
+        keys {int} -- Number of grouped columns, the day excluded.
+    Keyword Arguments:
+        params {tuple} -- Query parameters after the field ids.
+            (default: {()})
+        per_day {bool} -- Group the values by day too, the day following
+            the field id. (default: {False})
+    Returns:
+        {list} -- Rows of the query.
+    """
+    day = ""
+    if per_day:
+        # as TruncDate does
+        tzname = (
+            timezone.get_current_timezone_name() if settings.USE_TZ else None
+        )
+        day = "{}, ".format(
+            connection.ops.datetime_cast_date_sql(
+                "form_submit.created_on", tzname
+            )
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            query.format(
+                document=models.RiskDataDocument._meta.db_table,
+                form_submit=models.FormSubmit._meta.db_table,
+                field=models.FieldName._meta.db_table,
+                day=day,
+                group=", ".join(map(str, range(1, keys + per_day + 1))),
+            ),
+            [risk_model_id, [x.id for x in fields], *params],
+        )
+        return cursor.fetchall()
+
+
+def document_choice_counts(risk_model_id, fields, per_day=False):
+    """Counts the choices of the primary risk data documents of a risk
+    model.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        fields {list} -- Select and radio fields.
+    Keyword Arguments:
+        per_day {bool} -- Count the choices per day too. (default: {False})
+    Returns:
+        {list} -- (field id, [day,] value, count) tuples.
+    """
+    return document_rows(
+        DOCUMENT_CHOICE_COUNTS, risk_model_id, fields, 2, per_day=per_day
+    )
+
+
+def document_number_aggregates(risk_model_id, fields, per_day=False):
+    """Aggregates the numbers of the primary risk data documents of a risk
+    model.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        fields {list} -- Number and float fields.
+    Keyword Arguments:
+        per_day {bool} -- Aggregate the numbers per day too.
+            (default: {False})
+    Returns:
+        {list} -- ((field id, [day]), [count, total, minimum, maximum])
+            tuples, of the types of the FieldValue column of the field's
+            type.
+    """
+    field_types = {x.id: x.field_type for x in fields}
+    aggregates = []
+    for field_id, *key, count, total, minimum, maximum in document_rows(
+        DOCUMENT_NUMBER_AGGREGATES,
+        risk_model_id,
+        fields,
+        1,
+        (typed_values.BIGINT_RANGE[0], typed_values.BIGINT_RANGE[-1]),
+        per_day,
+    ):
+        if field_types[field_id] == "number":
+            # the total stays exact, as the one of the number_value column
+            aggregate = [count, total, int(minimum), int(maximum)]
+        else:
+            aggregate = [count, float(total), float(minimum), float(maximum)]
+        aggregates.append(((field_id, *key), aggregate))
+    return aggregates
+
+
+def field_value_aggregates(form_submits, submission_field_values):
+    """Aggregates the field values of inserted submissions by field, day
+    and choice.
+
+    Arguments:
+        form_submits {list} -- Saved form submits.
+        submission_field_values {list} -- (field, value) pairs of each form
+            submit.
+    Returns:
+        {dict} -- [count, total, minimum, maximum] keyed by (field id, day,
+            choice), the choice being empty for numeric values, by the key
+            of their AGGREGATE_COLUMNS.
+    """
+    prep_value = models.FieldValue._meta.get_field("value").get_prep_value
+    aggregates = {}
+    for form_submit, field_values in zip(
+        form_submits, submission_field_values
+    ):
+        day = timezone.localdate(form_submit.created_on)
+        for field, value in field_values:
+            if value is None:
+                continue
+            if field.field_type in CHOICE_FIELD_TYPES:
+                key = (field.id, day, prep_value(value))
+                aggregate = aggregates.setdefault("choice", {}).setdefault(
+                    key, [0, None, None, None]
+                )
+                aggregate[0] += 1
+                continue
+            if field.field_type not in NUMERIC_FIELD_TYPES:
+                continue
+            number = typed_values.parse_value(
+                field.field_type, prep_value(value)
+            )
+            if number is None:
+                continue
+            key = (field.id, day, "")
+            aggregate = aggregates.setdefault(field.field_type, {}).setdefault(
+                key, [0, 0, number, number]
+            )
+            aggregate[0] += 1
+            aggregate[1] += number
+            aggregate[2] = min(aggregate[2], number)
+            aggregate[3] = max(aggregate[3], number)
+    return aggregates
+
+
+def update_rollups(form_submits, submission_field_values):
+    """Adds inserted submissions to the stats rollups, in a statement per
+    table and aggregate columns. The rows are upserted in key order, so
+    that concurrent inserts lock them in the same order.
+
+    Arguments:
+        form_submits {list} -- Saved form submits.
+        submission_field_values {list} -- (field, value) pairs of each form
+            submit, whichever their storage.
+    """
+    submission_counts = {}
+    for form_submit in form_submits:
+        key = (
+            form_submit.risk_model_id,
+            timezone.localdate(form_submit.created_on),
+        )
+        submission_counts[key] = submission_counts.get(key, 0) + 1
+    aggregates = field_value_aggregates(form_submits, submission_field_values)
+    with connection.cursor() as cursor:
+        if submission_counts:
+            execute_values(
+                cursor,
+                UPSERT_SUBMISSION_ROLLUPS.format(
+                    table=models.SubmissionRollup._meta.db_table
+                ),
+                [
+                    key + (count,)
+                    for key, count in sorted(submission_counts.items())
+                ],
+            )
+        for columns, column_aggregates in sorted(aggregates.items()):
+            total, minimum, maximum = AGGREGATE_COLUMNS[columns]
+            execute_values(
+                cursor,
+                UPSERT_FIELD_VALUE_ROLLUPS.format(
+                    table=models.FieldValueRollup._meta.db_table,
+                    total=total,
+                    minimum=minimum,
+                    maximum=maximum,
+                ),
+                [
+                    key + tuple(aggregate)
+                    for key, aggregate in sorted(column_aggregates.items())
+                ],
+            )
+
+
+@transaction.atomic
+def rebuild_rollups(risk_model_id):
+    """Replaces the stats rollups of a risk model with the aggregates of its
+    successful submissions, stored as FieldValue rows and, with the document
+    storage, as primary risk data documents.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+    Returns:
+        {int} -- Number of rollup rows written.
+    """
+    fields = models.FieldName.all_objects.filter(risk_model_id=risk_model_id)
+    models.SubmissionRollup.objects.filter(
+        risk_model_id=risk_model_id
+    ).delete()
+    models.FieldValueRollup.objects.filter(field__in=fields).delete()
+    submission_rollups = [
+        models.SubmissionRollup(
+            risk_model_id=risk_model_id, day=day, count=count
+        )
+        for day, count in submissions_per_day(risk_model_id)
+    ]
+    field_values = models.FieldValue.objects.filter(
+        form_submit__success=True
+    ).annotate(day=TruncDate("form_submit__created_on"))
+    choice_fields = fields.filter(field_type__in=CHOICE_FIELD_TYPES)
+    choices = {
+        (field_id, day, value): count
+        for field_id, day, value, count in field_values.filter(
+            field__in=choice_fields, value__isnull=False
+        )
+        .values_list("field_id", "day", "value")
+        .annotate(count=Count("id"))
+        .order_by()
+    }
+    aggregates = {}
+    for column, field_type in [
+        ("number_value", "number"),
+        ("float_value", "float"),
+    ]:
+        aggregates.update(
+            ((field_id, day), aggregate)
+            for field_id, day, *aggregate in field_values.filter(
+                field__in=fields.filter(field_type=field_type),
+                **{f"{column}__isnull": False},
+            )
+            .values_list("field_id", "day")
+            .annotate(
+                count=Count("id"),
+                total=Sum(column),
+                minimum=Min(column),
+                maximum=Max(column),
+            )
+            .order_by()
+        )
+    if documents_stored():
+        for field_id, day, value, count in document_choice_counts(
+            risk_model_id, choice_fields, per_day=True
+        ):
+            key = (field_id, day, value)
+            choices[key] = choices.get(key, 0) + count
+        for key, aggregate in document_number_aggregates(
+            risk_model_id,
+            fields.filter(field_type__in=NUMERIC_FIELD_TYPES),
+            per_day=True,
+        ):
+            add_aggregate(aggregates, key, aggregate)
+    field_value_rollups = [
+        models.FieldValueRollup(
+            field_id=field_id, day=day, value=value, count=count
+        )
+        for (field_id, day, value), count in choices.items()
+    ]
+    field_types = dict(fields.values_list("id", "field_type"))
+    for (field_id, day), (count, *aggregate) in aggregates.items():
+        field_value_rollups.append(
+            models.FieldValueRollup(
+                field_id=field_id,
+                day=day,
+                count=count,
+                **dict(
+                    zip(AGGREGATE_COLUMNS[field_types[field_id]], aggregate)
+                ),
+            )
+        )
+    models.SubmissionRollup.objects.bulk_create(submission_rollups)
+    models.FieldValueRollup.objects.bulk_create(field_value_rollups)
+    return len(submission_rollups) + len(field_value_rollups)
+
+
+def submissions_per_day(risk_model_id):
+    """Counts the successful submissions of a risk model per day.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+    Returns:
+        {QuerySet} -- (day, count) tuples, in day order.
+    """
+    return (
+        models.FormSubmit.objects.filter(
+            risk_model_id=risk_model_id, success=True
+        )
+        .annotate(day=TruncDate("created_on"))
+        .values_list("day")
+        .annotate(count=Count("id"))
+        .order_by("day")
+    )
+
+
+def live_stats(risk_model_id, fields):
+    """Computes the stats of a risk model from its submissions, with a
+    GROUP BY query per aggregate, over the FieldValue rows and, with the
+    document storage, the primary risk data documents.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        fields {list} -- Fields of the risk model.
+    Returns:
+        {tuple} -- Per day counts, choice counts and numeric aggregates, see
+            risk_model_stats.
+    """
+    per_day = list(submissions_per_day(risk_model_id))
+    field_values = models.FieldValue.objects.filter(form_submit__success=True)
+    choice_fields = [x for x in fields if x.field_type in CHOICE_FIELD_TYPES]
+    choices = {
+        (field_id, value): count
+        for field_id, value, count in field_values.filter(
+            field__in=choice_fields, value__isnull=False
+        )
+        .values_list("field_id", "value")
+        .annotate(count=Count("id"))
+        .order_by()
+    }
+    aggregates = {}
+    for column, field_type in [
+        ("number_value", "number"),
+        ("float_value", "float"),
+    ]:
+        aggregates.update(
+            ((field_id,), aggregate)
+            for field_id, *aggregate in field_values.filter(
+                field__in=[x for x in fields if x.field_type == field_type],
+                **{f"{column}__isnull": False},
+            )
+            .values_list("field_id")
+            .annotate(
+                count=Count("id"),
+                total=Sum(column),
+                minimum=Min(column),
+                maximum=Max(column),
+            )
+            .order_by()
+        )
+    if documents_stored():
+        for field_id, value, count in document_choice_counts(
+            risk_model_id, choice_fields
+        ):
+            choices[(field_id, value)] = (
+                choices.get((field_id, value), 0) + count
+            )
+        for key, aggregate in document_number_aggregates(
+            risk_model_id,
+            [x for x in fields if x.field_type in NUMERIC_FIELD_TYPES],
+        ):
+            add_aggregate(aggregates, key, aggregate)
+    numbers = {
+        # the exact number total is divided before its conversion to float
+        field_id: [count, minimum, maximum, float(total / count)]
+        for (field_id,), (count, total, minimum, maximum) in aggregates.items()
+    }
+    return per_day, [key + (count,) for key, count in choices.items()], numbers
+
+
+def rollup_stats(risk_model_id, fields):
+    """Computes the stats of a risk model from its rollups, summing up their
+    daily aggregates.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        fields {list} -- Fields of the risk model.
+    Returns:
+        {tuple} -- Same as live_stats.
+    """
+    per_day = list(
+        models.SubmissionRollup.objects.filter(risk_model_id=risk_model_id)
+        .order_by("day")
+        .values_list("day", "count")
+    )
+    rollups = models.FieldValueRollup.objects.filter(field__in=fields)
+    choices = (
+        rollups.exclude(value="")
+        .values_list("field_id", "value")
+        .annotate(sum_count=Sum("count"))
+        .order_by()
+    )
+    numbers = {}
+    for field_id, count, *aggregates in (
+        rollups.filter(value="")
+        .values_list("field_id")
+        .annotate(
+            sum_count=Sum("count"),
+            sum_total=Sum("total"),
+            min_minimum=Min("minimum"),
+            max_maximum=Max("maximum"),
+            sum_number_total=Sum("number_total"),
+            min_number_minimum=Min("number_minimum"),
+            max_number_maximum=Max("number_maximum"),
+        )
+        .order_by()
+    ):
+        total, minimum, maximum = (
+            aggregates[3:] if aggregates[3] is not None else aggregates[:3]
+        )
+        # the exact number total is divided before its conversion to float
+        numbers[field_id] = [count, minimum, maximum, float(total / count)]
+    return per_day, list(choices), numbers
+
+
+def risk_model_stats(risk_model_id, fields):
+    """Computes the dashboard stats of a risk model: its successful
+    submissions per day, the count of each choice of its select and radio
+    fields, and the count, min, max and average of its number and float
+    fields. Read from the rollups when they are maintained.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        fields {list} -- Fields of the risk model, in order.
+    Returns:
+        {dict} -- Stats of the risk model.
+    """
+    compute = rollup_stats if rollups_enabled() else live_stats
+    per_day, choices, numbers = compute(risk_model_id, fields)
+    choice_counts = {}
+    for field_id, value, count in choices:
+        choice_counts.setdefault(field_id, {})[value] = count
+    field_stats = []
+    for field in fields:
+        stats = {
+            "field": field.slug,
+            "name": field.name,
+            "field_type": field.field_type,
+        }
+        if field.field_type in CHOICE_FIELD_TYPES:
+            counts = choice_counts.get(field.id, {})
+            # choices without values are counted too, in choice order
+            stats["choices"] = {
+                choice: counts.pop(choice, 0) for choice in field.choices or []
+            }
+            # values of choices removed since
+            stats["choices"].update(counts)
+        elif field.field_type in NUMERIC_FIELD_TYPES:
+            count, minimum, maximum, average = numbers.get(
+                field.id, [0, None, None, None]
+            )
+            stats.update(count=count, min=minimum, max=maximum, avg=average)
+        else:
+            continue
+        field_stats.append(stats)
+    return {
+        "risk_model": risk_model_id,
+        "submissions": sum(count for day, count in per_day),
+        "per_day": [
+            {"day": day, "submissions": count} for day, count in per_day
+        ],
+        "fields": field_stats,
+    }
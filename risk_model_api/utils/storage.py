@@ -0,0 +1,275 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .. import models
+from . import bulk_copy, projection, stats, typed_values
+
+
+def prep_value(value):
+    """Prepares a field value as it is stored by FieldValue.
+
+    Arguments:
+        value {object} -- Validated field value.
+    Returns:
+        {str} -- Stored value.
+    """
+    return models.FieldValue._meta.get_field("value").get_prep_value(value)
+
+
+def copy_documents(documents):
+    """Inserts risk data documents with COPY.
+
+    Arguments:
+        documents {iterable} -- Unsaved RiskDataDocument instances.
+    """
+    bulk_copy.copy_rows(
+        models.RiskDataDocument,
+        ["form_submit", "risk_model", "values", "data", "primary"],
+        (
+            (
+                x.form_submit_id,
+                x.risk_model_id,
+                json.dumps(x.values),
+                json.dumps(x.data),
+                x.primary,
+            )
+            for x in documents
+        ),
+    )
+
+
+class RowStorage:
+    """
+    Stores the field values of a submission as a FieldValue row per field,
+    and its document too when the projection is maintained.
+    """
+
+    def taken_values(self, field_values):
+        """
+        returns the positions of the (field, value) pairs whose value is
+        already taken by a successful submission
+        """
+        return models.FieldValue.objects.taken_values(field_values)
+
+    def insert(
+        self,
+        form_submits,
+        submission_field_values,
+        use_copy=False,
+        batch_size=None,
+    ):
+        """
+        inserts the (field, value) pairs of saved form submits, with COPY if
+        'use_copy' is set
+        """
+        if stats.rollups_enabled():
+            stats.update_rollups(form_submits, submission_field_values)
+        if use_copy:
+            return self.copy(form_submits, submission_field_values)
+        submission_field_values = [
+            [
+                models.FieldValue(
+                    form_submit=form_submit,
+                    field=field,
+                    value=value,
+                    **typed_values.typed_columns(
+                        field.field_type, prep_value(value)
+                    ),
+                )
+                for field, value in field_values
+            ]
+            for form_submit, field_values in zip(
+                form_submits, submission_field_values
+            )
+        ]
+        models.FieldValue.objects.bulk_create(
+            [
+                x
+                for field_values in submission_field_values
+                for x in field_values
+            ],
+            batch_size=batch_size,
+        )
+        if projection.projection_enabled():
+            models.RiskDataDocument.objects.bulk_create(
+                [
+                    projection.build_document(
+                        form_submit.pk,
+                        form_submit.risk_model_id,
+                        [(x.pk, x.field, x.value) for x in field_values],
+                    )
+                    for form_submit, field_values in zip(
+                        form_submits, submission_field_values
+                    )
+                ],
+                batch_size=batch_size,
+            )
+
+    def copy(self, form_submits, submission_field_values):
+        """
+        inserts the (field, value) pairs of saved form submits with COPY.
+        The rows are written as plain tuples, skipping the model instances.
+        """
+        # the timestamp is formatted once for all the rows
+        created_on = str(form_submits[0].created_on) if form_submits else None
+        submission_field_values = [
+            [(field, prep_value(value)) for field, value in field_values]
+            for field_values in submission_field_values
+        ]
+        field_names = (
+            ["form_submit", "field", "value"]
+            + typed_values.TYPED_FIELD_NAMES
+            + ["created_on", "updated_on"]
+        )
+        rows = (
+            (form_submit.pk, field.id, value)
+            + typed_values.typed_row(field.field_type, value)
+            + (created_on, created_on)
+            for form_submit, field_values in zip(
+                form_submits, submission_field_values
+            )
+            for field, value in field_values
+        )
+        if not projection.projection_enabled():
+            bulk_copy.copy_rows(models.FieldValue, field_names, rows)
+            return
+        # the documents hold the field value ids, reserve them up front
+        field_value_ids = bulk_copy.reserve_ids(
+            models.FieldValue,
+            sum(len(field_values) for field_values in submission_field_values),
+        )
+        bulk_copy.copy_rows(
+            models.FieldValue,
+            ["id"] + field_names,
+            (
+                (field_value_id,) + row
+                for field_value_id, row in zip(field_value_ids, rows)
+            ),
+        )
+        field_value_ids = iter(field_value_ids)
+        copy_documents(
+            projection.build_document(
+                form_submit.pk,
+                form_submit.risk_model_id,
+                [
+                    (next(field_value_ids), field, value)
+                    for field, value in field_values
+                ],
+            )
+            for form_submit, field_values in zip(
+                form_submits, submission_field_values
+            )
+        )
+
+
+class DocumentStorage:
+    """
+    Stores the field values of a submission as a single primary risk data
+    document, without FieldValue rows.
+    """
+
+    def taken_values(self, field_values):
+        """
+        returns the positions of the (field, value) pairs whose value is
+        already taken by a successful submission, stored as a document or,
+        before the switch to documents, as FieldValue rows
+        """
+        taken_positions = models.FieldValue.objects.taken_values(field_values)
+        stored_values = [
+            (field, prep_value(value)) for field, value in field_values
+        ]
+        return taken_positions | models.RiskDataDocument.objects.taken_values(
+            [
+                (field, value, projection.typed_value(field.field_type, value))
+                for field, value in stored_values
+            ]
+        )
+
+    def insert(
+        self,
+        form_submits,
+        submission_field_values,
+        use_copy=False,
+        batch_size=None,
+    ):
+        """
+        inserts the (field, value) pairs of saved form submits as their
+        documents, with COPY if 'use_copy' is set
+        """
+        if stats.rollups_enabled():
+            stats.update_rollups(form_submits, submission_field_values)
+        # there are no FieldValue rows, the ids of the values are reserved
+        # from their sequence so that they are unique across the storages
+        field_value_ids = iter(
+            bulk_copy.reserve_ids(
+                models.FieldValue,
+                sum(
+                    len(field_values)
+                    for field_values in submission_field_values
+                ),
+            )
+        )
+        documents = [
+            projection.build_document(
+                form_submit.pk,
+                form_submit.risk_model_id,
+                [
+                    (next(field_value_ids), field, value)
+                    for field, value in field_values
+                ],
+                primary=True,
+            )
+            for form_submit, field_values in zip(
+                form_submits, submission_field_values
+            )
+        ]
+        if use_copy:
+            copy_documents(documents)
+        else:
+            models.RiskDataDocument.objects.bulk_create(
+                documents, batch_size=batch_size
+            )
+
+
+def submission_field_values(form_submit_id):
+    """Returns the field values of a submission, read from its risk data
+    document if it has one, whichever the storage it was written with.
+
+    Arguments:
+        form_submit_id {int} -- Form submit id.
+    Returns:
+        {list|QuerySet} -- FieldValue instances, in id order.
+    """
+    document = None
+    if projection.documents_readable():
+        document = models.RiskDataDocument.objects.filter(
+            form_submit_id=form_submit_id
+        ).first()
+    if document is not None:
+        return projection.document_field_values(document)
+    return (
+        models.FieldValue.objects.filter(form_submit_id=form_submit_id)
+        .select_related("field")
+        .order_by("id")
+    )
+
+
+# storage classes by RISK_DATA_STORAGE setting
+STORAGES = {"rows": RowStorage, "document": DocumentStorage}
+
+
+def get_storage():
+    """Returns the storage of the submissions' field values.
+
+    Returns:
+        {RowStorage|DocumentStorage} -- Storage of the RISK_DATA_STORAGE
+            setting.
+    """
+    try:
+        return STORAGES[settings.RISK_DATA_STORAGE]()
+    except KeyError:
+        raise ImproperlyConfigured(
+            "RISK_DATA_STORAGE must be one of {}".format(", ".join(STORAGES))
+        )
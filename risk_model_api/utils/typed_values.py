@@ -0,0 +1,128 @@
+import ast
+import math
+
+from django.utils import dateparse
+
+# typed FieldValue column of the values of each field type, the values of
+# the other field types are only stored as text
+TYPED_COLUMNS = {
+    "number": "number_value",
+    "float": "float_value",
+    "date": "date_value",
+    "time": "time_value",
+    "checkbox": "boolean_value",
+    "switch": "boolean_value",
+    "array": "array_value",
+    "multiselect": "array_value",
+}
+
+# typed FieldValue columns, in the order of typed_row
+TYPED_FIELD_NAMES = sorted(set(TYPED_COLUMNS.values()))
+
+# range of the bigint number_value column
+BIGINT_RANGE = range(-(2 ** 63), 2 ** 63)
+
+
+def typed_column(field_type):
+    """Returns the typed FieldValue column of a field type's values.
+
+    Arguments:
+        field_type {str} -- Field type.
+    Returns:
+        {str} -- Column name, or None if the values are only stored as text.
+    """
+    return TYPED_COLUMNS.get(field_type)
+
+
+def parse_stored_value(field_type, value):
+    """Parses a stored field value into the value of its field type, shared
+    by the typed columns and the risk data documents.
+
+    Arguments:
+        field_type {str} -- Field type of the value's field.
+        value {str} -- Stored value.
+    Returns:
+        {object} -- Parsed value, the stored value itself if the field type
+            has no typed column, or None if the value is null or cannot be
+            parsed.
+    """
+    if value is None:
+        return None
+    if typed_column(field_type) is None:
+        return value
+    try:
+        if field_type == "number":
+            return int(value)
+        if field_type == "float":
+            number = float(value)
+            # NaN and infinity can be neither filtered on nor stored as JSON
+            return number if math.isfinite(number) else None
+        if field_type == "date":
+            return dateparse.parse_date(value)
+        if field_type == "time":
+            return dateparse.parse_time(value)
+        if field_type in ["checkbox", "switch"]:
+            return value == "True"
+        if field_type == "array":
+            items = ast.literal_eval(value)
+            return items if isinstance(items, list) else None
+        if field_type == "multiselect":
+            # stored as the repr of a set
+            items = set() if value == "set()" else ast.literal_eval(value)
+            if isinstance(items, (set, list)):
+                return sorted(items, key=str)
+    except (ValueError, TypeError, SyntaxError):
+        pass
+    return None
+
+
+def parse_value(field_type, value):
+    """Parses a stored field value into the value of its typed column.
+
+    Arguments:
+        field_type {str} -- Field type of the value's field.
+        value {str} -- Stored value.
+    Returns:
+        {object} -- Typed value, or None if the value is null, the field
+            type has no typed column or the value does not fit it.
+    """
+    if typed_column(field_type) is None:
+        return None
+    parsed = parse_stored_value(field_type, value)
+    if field_type == "number" and parsed is not None:
+        return parsed if parsed in BIGINT_RANGE else None
+    if field_type in ["array", "multiselect"] and parsed is not None:
+        # the array_value column holds text
+        return [str(x) for x in parsed]
+    return parsed
+
+
+def typed_columns(field_type, value):
+    """Returns the typed column values of a stored field value, as
+    FieldValue keyword arguments.
+
+    Arguments:
+        field_type {str} -- Field type of the value's field.
+        value {str} -- Stored value.
+    Returns:
+        {dict} -- Typed value keyed by its column, empty if the field type
+            has no typed column.
+    """
+    column = typed_column(field_type)
+    if column is None:
+        return {}
+    return {column: parse_value(field_type, value)}
+
+
+def typed_row(field_type, value):
+    """Returns the typed column values of a stored field value, as a row
+    of all the typed columns.
+
+    Arguments:
+        field_type {str} -- Field type of the value's field.
+        value {str} -- Stored value.
+    Returns:
+        {tuple} -- Typed column values, in TYPED_FIELD_NAMES order.
+    """
+    columns = typed_columns(field_type, value)
+    return tuple(columns.get(name) for name in TYPED_FIELD_NAMES)
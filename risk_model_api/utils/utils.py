@@ -1,8 +1,11 @@
+import re
 from io import StringIO
 
 from django.conf import settings
 from django.core.files.storage import FileSystemStorage
 from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.db.models import BigIntegerField, Count, F, Func, Max, Q, Value
+from django.db.models.functions import Cast
 from django.utils.text import slugify
 
 from django_s3_storage.storage import S3Storage
@@ -57,8 +60,47 @@ def nested_field_parse(result):
     return data
 
 
+def suffixed_slug(slug, suffix, max_slug_len):
+    """Appends a numeric suffix to a slug, truncating the slug so the result
+    fits in max_slug_len.
+
+    Arguments:
+        slug {str} -- Slug to be suffixed.
+        suffix {int} -- Numeric suffix.
+        max_slug_len {int} -- Max length of the suffixed slug.
+    Returns:
+        {str} -- Suffixed slug.
+    """
+    suffix = "%s%s" % ("-", suffix)
+    return "%s%s" % (slug[: max_slug_len - len(suffix)], suffix)
+
+
+def suffixed_slug_regex(slug, max_slug_len):
+    """Builds a regex matching the suffixed slugs generated from a slug, with
+    suffixes of up to 9 digits.
+
+    Arguments:
+        slug {str} -- Slug without suffix.
+        max_slug_len {int} -- Max length of the suffixed slugs.
+    Returns:
+        {str} -- Regex pattern.
+    """
+    # longer suffixes may truncate the slug, group the suffix lengths by
+    # the slug prefix they leave
+    prefixes = {}
+    for digits in range(1, 10):
+        prefix = slug[: max_slug_len - digits - 1]
+        prefixes.setdefault(prefix, []).append(digits)
+    alternatives = [
+        "%s-[1-9][0-9]{%s,%s}" % (re.escape(prefix), min(d) - 1, max(d) - 1)
+        for prefix, d in prefixes.items()
+    ]
+    return "^(%s)$" % "|".join(alternatives)
+
+
 def generate_unique_slug(klass, field):
-    """Generates a unique slug from a string value.
+    """Generates a unique slug from a string value. The highest suffix in use
+    for the slug is found with a single query.
 
     Arguments:
         klass {Model} -- Model class.
@@ -68,16 +110,23 @@ def generate_unique_slug(klass, field):
     """
     slug_field = klass._meta.get_field("slug")
     max_slug_len = slug_field.max_length
-    origin_slug = slugify(field)
-    unique_slug = origin_slug
-    count = 1
-    while klass.objects.filter(slug=unique_slug).exists():
-        suffix = "%s%s" % ("-", count)
-        if len(origin_slug) + len(suffix) > max_slug_len:
-            origin_slug = origin_slug[: max_slug_len - len(suffix)]
-        unique_slug = "%s%s" % (origin_slug, suffix)
-        count += 1
-    return unique_slug
+    origin_slug = slugify(field)[:max_slug_len]
+    suffixed_regex = suffixed_slug_regex(origin_slug, max_slug_len)
+    suffix = Cast(
+        Func(F("slug"), Value("[0-9]+$"), function="substring"),
+        BigIntegerField(),
+    )
+    result = klass.objects.filter(
+        Q(slug=origin_slug) | Q(slug__regex=suffixed_regex)
+    ).aggregate(
+        taken=Count("id", filter=Q(slug=origin_slug)),
+        last_suffix=Max(suffix, filter=Q(slug__regex=suffixed_regex)),
+    )
+    if not result["taken"]:
+        return origin_slug
+    return suffixed_slug(
+        origin_slug, (result["last_suffix"] or 0) + 1, max_slug_len
+    )
 
 
 def store_file(file):
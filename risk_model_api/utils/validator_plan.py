@@ -0,0 +1,309 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import serializers
+
+from .. import models
+from . import batch_validation
+
+# in-process tier of the compiled validator plans, keyed by risk model id
+# in least recently used order
+_plans = OrderedDict()
+_plans_lock = threading.Lock()
+
+# shared tier keys of the current schema version of a risk model, and of the
+# fields of each of its schema versions
+VERSION_KEY = "risk_model_schema:{risk_model_id}:version"
+SCHEMA_KEY = "risk_model_schema:{risk_model_id}:{version}"
+
+
+def build_value_field(field):
+    """Builds the DRF field that validates the values submitted to a field.
+
+    Arguments:
+        field {FieldName} -- Field the values are submitted to.
+    Returns:
+        {Field} -- DRF field, or None if the field type is not supported.
+    """
+    if field.field_type in ["text", "textarea", "password"]:
+        return serializers.CharField(
+            max_length=field.max_length,
+            min_length=field.min_length,
+            allow_null=not field.required,
+        )
+    elif field.field_type == "email":
+        return serializers.EmailField(
+            max_length=field.max_length,
+            min_length=field.min_length,
+            allow_null=not field.required,
+        )
+    elif field.field_type == "float":
+        return serializers.FloatField(allow_null=not field.required)
+    elif field.field_type == "number":
+        return serializers.IntegerField(
+            allow_null=not field.required, max_value=None, min_value=None
+        )  # add min and max
+    elif field.field_type == "date":
+        return serializers.DateField(allow_null=not field.required)
+    elif field.field_type == "time":
+        return serializers.TimeField(allow_null=not field.required)
+    elif field.field_type in ["select", "radio"]:
+        return serializers.ChoiceField(
+            allow_null=not field.required, choices=field.choices
+        )
+    elif field.field_type == "multiselect":
+        return serializers.MultipleChoiceField(
+            allow_null=not field.required, choices=field.choices
+        )
+    elif field.field_type in ["checkbox", "switch"]:
+        return serializers.BooleanField()
+    elif field.field_type == "url":
+        return serializers.URLField(
+            max_length=field.max_length,
+            min_length=field.min_length,
+            allow_null=not field.required,
+        )
+    elif field.field_type == "array":
+        return serializers.ListField(
+            allow_null=not field.required
+        )  # add minlen and max
+    elif field.field_type == "regex":
+        return serializers.RegexField(
+            field.regex_pattern,
+            max_length=field.max_length,
+            min_length=field.min_length,
+            allow_null=not field.required,
+        )
+    elif field.field_type == "file":
+        return serializers.FileField(allow_null=not field.required)
+    return None
+
+
+def invalid_field_type(field):
+    """Builds the validation error of the values of a field whose field type
+    is not supported.
+
+    Arguments:
+        field {FieldName} -- Field the values are submitted to.
+    Returns:
+        {ValidationError} -- Validation error keyed by "fields".
+    """
+    return serializers.ValidationError(
+        {"fields": [f"{field.field_type} is not a valid field type."]}
+    )
+
+
+class ValidatorPlan:
+    """
+    Precomputed slug to validator mapping of a risk model's fields.
+    """
+
+    def __init__(self, fields, version=None):
+        """
+        compile a validator for each of the fields of a schema version
+        """
+        self.version = version
+        # when the plan was last known to be of the current schema version
+        self.checked_on = time.monotonic()
+        self.fields = {}
+        self.validators = {}
+        self.columns = {}
+        for field in fields:
+            value_field = build_value_field(field)
+            self.fields[field.slug] = field
+            self.validators[field.slug] = (
+                value_field.run_validation if value_field else None
+            )
+            self.columns[field.slug] = (
+                batch_validation.build_column(value_field)
+                if value_field
+                else None
+            )
+
+    def validate(self, field, value):
+        """
+        validates a value with the field's compiled validator and returns
+        the validated value. Errors are keyed by the field name.
+        """
+        validator = self.validators[field.slug]
+        if validator is None:
+            raise invalid_field_type(field)
+        try:
+            return validator(value)
+        except serializers.ValidationError as e:
+            raise serializers.ValidationError({field.name: e.detail})
+
+    def validate_column(self, field, values):
+        """
+        validates a column of values of the field in one pass, leaving the
+        values its fast path cannot tell valid to the field's validator.
+        Returns the validated values and the per value errors, None for the
+        valid values, both in order. The errors are the ones validate
+        raises.
+        """
+        validator = self.validators[field.slug]
+        if validator is None:
+            error = invalid_field_type(field).detail
+            return [None] * len(values), [error] * len(values)
+        column = self.columns[field.slug]
+        validated = (
+            column(values) if column else [batch_validation.SLOW] * len(values)
+        )
+        errors = [None] * len(values)
+        for i, value in enumerate(validated):
+            if value is not batch_validation.SLOW:
+                continue
+            try:
+                validated[i] = validator(values[i])
+            except serializers.ValidationError as e:
+                validated[i] = None
+                errors[i] = {field.name: e.detail}
+        return validated, errors
+
+
+def shared_cache():
+    """Returns the shared tier of the schema cache.
+
+    Returns:
+        {BaseCache} -- The RISK_MODEL_SCHEMA_CACHE cache, or None if the
+            schemas are only cached in process.
+    """
+    alias = settings.RISK_MODEL_SCHEMA_CACHE
+    return caches[alias] if alias else None
+
+
+def load_plan(risk_model_id, version, cache):
+    """Compiles the validator plan of a risk model from the shared tier, or
+    from the db on a miss, which then fills the shared tier.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        version {int} -- Current schema version, None if unknown.
+        cache {BaseCache} -- Shared tier, None if disabled.
+    Returns:
+        {ValidatorPlan} -- Validator plan of the risk model's fields.
+    Raises:
+        {RiskModel.DoesNotExist} -- If the risk model does not exist.
+    """
+    if cache is not None and version is not None:
+        fields = cache.get(
+            SCHEMA_KEY.format(risk_model_id=risk_model_id, version=version)
+        )
+        if fields is not None:
+            return ValidatorPlan(fields, version)
+    risk_model = models.RiskModel.objects.prefetch_related("fields").get(
+        id=risk_model_id
+    )
+    fields = list(risk_model.fields.all())
+    version = risk_model.schema_version
+    if cache is not None:
+        cache.set(
+            SCHEMA_KEY.format(risk_model_id=risk_model_id, version=version),
+            fields,
+        )
+        # an update committed since publishes its own version, which is not
+        # overwritten
+        cache.add(VERSION_KEY.format(risk_model_id=risk_model_id), version)
+    return ValidatorPlan(fields, version)
+
+
+def current_version(risk_model_id, cache):
+    """Reads the current schema version of a risk model, from the shared
+    tier if enabled, else from the db in a single query.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+        cache {BaseCache} -- Shared tier, None if disabled.
+    Returns:
+        {int} -- Current schema version, None if unknown or if the risk
+            model does not exist.
+    """
+    if cache is not None:
+        return cache.get(VERSION_KEY.format(risk_model_id=risk_model_id))
+    return (
+        models.RiskModel.objects.filter(id=risk_model_id)
+        .values_list("schema_version", flat=True)
+        .first()
+    )
+
+
+def get_plan(risk_model_id, reload=False):
+    """Returns the cached validator plan of a risk model, compiling it on
+    first use. The plan cached in process is used for up to
+    RISK_MODEL_SCHEMA_CHECK_INTERVAL seconds, then only if it is still of
+    the current schema version, read from the shared tier if enabled, so
+    that the updates made by other processes are seen within that
+    interval.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+    Keyword Arguments:
+        reload {bool} -- Recompile the plan from the db. (default: {False})
+    Returns:
+        {ValidatorPlan} -- Validator plan of the risk model's fields.
+    Raises:
+        {RiskModel.DoesNotExist} -- If the risk model does not exist.
+    """
+    cache = shared_cache()
+    version = None
+    if not reload:
+        with _plans_lock:
+            plan = _plans.get(risk_model_id)
+            if plan is not None:
+                _plans.move_to_end(risk_model_id)
+        now = time.monotonic()
+        if (
+            plan is not None
+            and now - plan.checked_on
+            < settings.RISK_MODEL_SCHEMA_CHECK_INTERVAL
+        ):
+            return plan
+        if plan is not None or cache is not None:
+            version = current_version(risk_model_id, cache)
+        if plan is not None and plan.version == version:
+            plan.checked_on = now
+            return plan
+    plan = load_plan(risk_model_id, version, cache)
+    with _plans_lock:
+        _plans[risk_model_id] = plan
+        _plans.move_to_end(risk_model_id)
+        while len(_plans) > settings.RISK_MODEL_SCHEMA_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def drop_plan(risk_model_id):
+    """Drops the validator plan of a risk model cached in process.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+    """
+    with _plans_lock:
+        _plans.pop(risk_model_id, None)
+
+
+def invalidate_plan(risk_model_id, version=None):
+    """Drops the validator plan of a risk model cached in process, and
+    publishes its new schema version to the shared tier once the change is
+    committed. The plan is dropped again on commit, as a concurrent request
+    may have cached the plan of the previous version in the meantime.
+
+    Arguments:
+        risk_model_id {int} -- Risk model id.
+    Keyword Arguments:
+        version {int} -- New schema version of the risk model.
+            (default: {None})
+    """
+    drop_plan(risk_model_id)
+    cache = shared_cache()
+
+    def publish():
+        drop_plan(risk_model_id)
+        if cache is not None and version is not None:
+            cache.set(VERSION_KEY.format(risk_model_id=risk_model_id), version)
+
+    transaction.on_commit(publish)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from rest_framework import pagination
+
+
+class IdCursorPagination(pagination.CursorPagination):
+    """
+    Keyset pagination on '-id': pages stay stable under concurrent inserts
+    and deep pages cost the same as the first one.
+    """
+
+    ordering = "-id"
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 500
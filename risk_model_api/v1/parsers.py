@@ -0,0 +1,42 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline delimited JSON, one JSON document per line. The documents
+    are parsed lazily, as the returned iterator is consumed, so the request
+    body is never held in memory as a whole.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        returns an iterator over the documents of the incoming bytestream
+        """
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        return self.iter_documents(stream, encoding)
+
+    def iter_documents(self, stream, encoding):
+        """
+        yields the documents of the stream, line by line. Blank lines are
+        skipped and a line that is not valid JSON is yielded as a ParseError,
+        so the consumer can report it without dropping the rest of the stream.
+        """
+        if stream is None:
+            return
+        for line_number, line in enumerate(stream, 1):
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield ParseError(
+                    f"NDJSON parse error on line {line_number} - {exc}"
+                )
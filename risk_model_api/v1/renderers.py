@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # parquet exports are optional
+    pyarrow = None
+
+
+class Echo:
+    """
+    File-like object that returns what is written to it, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+class StreamSink(io.RawIOBase):
+    """
+    Write-only binary stream that buffers what is written until drained,
+    while reporting the total written as its position.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self.chunks.append(bytes(b))
+        self.position += len(b)
+        return len(b)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        """
+        returns and clears the buffered bytes
+        """
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class TableStreamRenderer(BaseRenderer):
+    """
+    Base class of the renderers streaming a table, one row at a time.
+    Responses other than the table, errors, are rendered as JSON.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        renders non table data as JSON
+        """
+        return json.dumps(data, cls=encoders.JSONEncoder).encode()
+
+    def stream(self, columns, rows):
+        """
+        yields the table as chunks of bytes. 'rows' is an iterable of lists
+        of values, in the order of 'columns'.
+        """
+        raise NotImplementedError(
+            "TableStreamRenderer.stream() must be implemented."
+        )
+
+
+class CSVStreamRenderer(TableStreamRenderer):
+    """
+    Streams a table as CSV with a header row. NULLs are left empty.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def stream(self, columns, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(columns).encode()
+        for row in rows:
+            yield writer.writerow(row).encode()
+
+
+class NDJSONStreamRenderer(TableStreamRenderer):
+    """
+    Streams a table as newline delimited JSON, one column keyed object per
+    row.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def stream(self, columns, rows):
+        encoder = encoders.JSONEncoder()
+        for row in rows:
+            yield (encoder.encode(dict(zip(columns, row))) + "\n").encode()
+
+
+class ParquetStreamRenderer(TableStreamRenderer):
+    """
+    Streams a table as Parquet, one row group per 'row_group_size' rows.
+    Every column is written as a string column. Requires pyarrow.
+    """
+
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    charset = None
+    row_group_size = 10000
+
+    def stream(self, columns, rows):
+        schema = pyarrow.schema(
+            [pyarrow.field(column, pyarrow.string()) for column in columns]
+        )
+        sink = StreamSink()
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+        row_group = []
+        for row in rows:
+            row_group.append(row)
+            if len(row_group) == self.row_group_size:
+                writer.write_table(self.to_table(schema, row_group))
+                row_group = []
+                yield sink.drain()
+        if row_group:
+            writer.write_table(self.to_table(schema, row_group))
+        writer.close()
+        yield sink.drain()
+
+    def to_table(self, schema, rows):
+        """
+        builds an arrow table of a group of rows
+        """
+        return pyarrow.Table.from_arrays(
+            [
+                pyarrow.array(
+                    [None if x is None else str(x) for x in column],
+                    pyarrow.string(),
+                )
+                for column in zip(*rows)
+            ],
+            schema=schema,
+        )
+
+
+def table_stream_renderers():
+    """Returns the table stream renderers available, the Parquet one only
+    if pyarrow is installed.
+
+    Returns:
+        {list} -- Renderer classes, CSV first.
+    """
+    renderer_classes = [CSVStreamRenderer, NDJSONStreamRenderer]
+    if pyarrow is not None:
+        renderer_classes.append(ParquetStreamRenderer)
+    return renderer_classes
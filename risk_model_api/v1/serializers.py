@@ -1,9 +1,14 @@
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.functional import cached_property
 from rest_framework import serializers
 from rest_framework.fields import empty
 
 from .. import models
+from ..utils import storage, typed_values, validator_plan
 
 
 class ValidationError(serializers.ValidationError):
@@ -122,6 +127,7 @@ class RiskModelSerializer(serializers.ModelSerializer):
             )
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         """
         Handles POST requests to riskmodel endpoint
@@ -135,8 +141,12 @@ class RiskModelSerializer(serializers.ModelSerializer):
             field_data.pop("id", None)
 
         self.create_fields()
+        validator_plan.invalidate_plan(
+            self.instance.id, self.instance.schema_version
+        )
         return self.instance
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """
         Handles PUT requests to riskmodel endpoint
@@ -145,46 +155,66 @@ class RiskModelSerializer(serializers.ModelSerializer):
         """
         fields_data = validated_data.pop("fields")
 
-        # update riskmodel, without 'fields' field
+        # update riskmodel, without 'fields' field, and bump its schema version
+        instance.schema_version = F("schema_version") + 1
         super().update(instance, validated_data)
+        instance.refresh_from_db(fields=["schema_version"])
 
         self.update_fields(fields_data)
         self.delete_fields()
         self.create_fields()
+        validator_plan.invalidate_plan(instance.id, instance.schema_version)
 
         return instance
 
     def update_fields(self, fields_data):
         """
-        update fields that exist in db with data
+        update fields that exist in db with data, fetching and saving them in
+        bulk
         """
         self.new_fields = []
         self.updated_fields_id = []
+        field_ids = [x["id"] for x in fields_data if x.get("id", None)]
+        existing_fields = {
+            field.id: field
+            for field in self.instance.fields.filter(id__in=field_ids)
+        }
+        updated_fields = []
+        updated_attrs = {"updated_on"}
+        now = timezone.now()
         for field_data in fields_data:
             field_id = field_data.get("id", None)
             if field_id:
                 # update
-                field = get_object_or_404(models.FieldName, id=field_id)
+                field = existing_fields.get(field_id) or get_object_or_404(
+                    self.instance.fields, id=field_id
+                )
                 update_field_serializer = FieldSerializer(
                     instance=field, data=field_data
                 )
                 update_field_serializer.is_valid(raise_exception=True)
-                update_field_serializer.save()
+                validated_data = update_field_serializer.validated_data
+                for attr, value in validated_data.items():
+                    setattr(field, attr, value)
+                    updated_attrs.add(attr)
+                field.updated_on = now
+                updated_fields.append(field)
                 self.updated_fields_id.append(field.id)
             else:
                 # create: append to bulk list
                 self.new_fields.append(field_data)
+        updated_attrs.discard("id")
+        models.FieldName.objects.bulk_update(
+            updated_fields, sorted(updated_attrs)
+        )
 
     def delete_fields(self):
         """
         Soft Deletes fields in db that were not re-posted
         """
-        delete_queryset = self.instance.fields.all().exclude(
-            id__in=self.updated_fields_id
+        self.instance.fields.exclude(id__in=self.updated_fields_id).update(
+            deleted=True, updated_on=timezone.now()
         )
-        for x in delete_queryset:
-            x.deleted = True
-            x.save()
 
     def create_fields(self):
         """
@@ -196,16 +226,6 @@ class RiskModelSerializer(serializers.ModelSerializer):
         create_field_serializer.is_valid(raise_exception=True)
         create_field_serializer.save(risk_model_id=self.instance.id)
 
-    def to_representation(self, instance):
-        """
-        list nested fields in ascending order of 'order' attribute
-        """
-        response = super().to_representation(instance)
-        response["fields"] = sorted(
-            response["fields"], key=lambda x: x["order"]
-        )
-        return response
-
 
 class FieldValueSerializer(serializers.ModelSerializer):
     """
@@ -220,67 +240,20 @@ class FieldValueSerializer(serializers.ModelSerializer):
         # Instantiate the superclass normally
         super(FieldValueSerializer, self).__init__(data=data, **kwargs)
         field = kwargs["context"].pop("field", None)
+        form_submit = kwargs["context"].pop("form_submit", None)
         self.invalid_field_errors = {}
 
-        if field.field_type in ["text", "textarea", "password"]:
-            self.fields["value"] = serializers.CharField(
-                max_length=field.max_length,
-                min_length=field.min_length,
-                allow_null=not field.required,
-            )
-        elif field.field_type == "email":
-            self.fields["value"] = serializers.EmailField(
-                max_length=field.max_length,
-                min_length=field.min_length,
-                allow_null=not field.required,
-            )
-        elif field.field_type == "float":
-            self.fields["value"] = serializers.FloatField(
-                allow_null=not field.required
-            )
-        elif field.field_type == "number":
-            self.fields["value"] = serializers.IntegerField(
-                allow_null=not field.required, max_value=None, min_value=None
-            )  # add min and max
-        elif field.field_type == "date":
-            self.fields["value"] = serializers.DateField(
-                allow_null=not field.required
-            )
-        elif field.field_type == "time":
-            self.fields["value"] = serializers.TimeField(
-                allow_null=not field.required
-            )
-        elif field.field_type in ["select", "radio"]:
-            self.fields["value"] = serializers.ChoiceField(
-                allow_null=not field.required, choices=field.choices
-            )
-        elif field.field_type == "multiselect":
-            self.fields["value"] = serializers.MultipleChoiceField(
-                allow_null=not field.required, choices=field.choices
-            )
-        elif field.field_type in ["checkbox", "switch"]:
-            self.fields["value"] = serializers.BooleanField()
-        elif field.field_type == "url":
-            self.fields["value"] = serializers.URLField(
-                max_length=field.max_length,
-                min_length=field.min_length,
-                allow_null=not field.required,
-            )
-        elif field.field_type == "array":
-            self.fields["value"] = serializers.ListField(
-                allow_null=not field.required
-            )  # add minlen and max
-        elif field.field_type == "regex":
-            self.fields["value"] = serializers.RegexField(
-                field.regex_pattern,
-                max_length=field.max_length,
-                min_length=field.min_length,
-                allow_null=not field.required,
-            )
-        elif field.field_type == "file":
-            self.fields["value"] = serializers.FileField(
-                allow_null=not field.required
+        # the field (and form submit, when known) are resolved by the caller,
+        # so skip the primary key lookups on them
+        self.fields["field"] = serializers.HiddenField(default=field)
+        if form_submit is not None:
+            self.fields["form_submit"] = serializers.HiddenField(
+                default=form_submit
             )
+
+        value_field = validator_plan.build_value_field(field)
+        if value_field is not None:
+            self.fields["value"] = value_field
         else:
             self.invalid_field_errors = {
                 "fields": [f"{field.field_type} is not a valid field type."]
@@ -290,13 +263,8 @@ class FieldValueSerializer(serializers.ModelSerializer):
         """
         validates the uniqueness of the field's value for unique fields
         """
-        if (
-            data["field"].unique
-            and models.FieldValue.objects.filter(
-                field=data["field"],
-                value=data["value"],
-                form_submit__success=True,
-            ).exists()
+        if data["field"].unique and storage.get_storage().taken_values(
+            [(data["field"], data["value"])]
         ):
             raise ValidationError(
                 {
@@ -330,23 +298,34 @@ class FieldValueResponseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.FieldValue
-        exclude = ("form_submit", "field", "created_on", "updated_on")
+        exclude = (
+            "form_submit",
+            "field",
+            "created_on",
+            "updated_on",
+            "search_vector",
+            *typed_values.TYPED_FIELD_NAMES,
+        )
+
+    @cached_property
+    def file_url_prefix(self):
+        """
+        url prefix of stored files, computed once per response
+        """
+        if (
+            settings.DEFAULT_FILE_STORAGE
+            != "django.core.files.storage.FileSystemStorage"
+        ):
+            return settings.STATIC_URL
+        protocol = (
+            "https://" if self.context["request"].is_secure() else "http://"
+        )
+        host = self.context["request"].META["HTTP_HOST"]
+        return f"{protocol}{host}"
 
     def get_value(self, obj):
         if obj.field.field_type == "file":
-            if (
-                settings.DEFAULT_FILE_STORAGE
-                != "django.core.files.storage.FileSystemStorage"
-            ):
-                return f"{settings.STATIC_URL}{obj.value}"
-            else:
-                protocol = (
-                    "https://"
-                    if self.context["request"].is_secure()
-                    else "http://"
-                )
-                host = self.context["request"].META["HTTP_HOST"]
-                return f"{protocol}{host}{obj.value}"
+            return f"{self.file_url_prefix}{obj.value}"
         return obj.value
 
 
@@ -363,12 +342,22 @@ class RiskDataSerializer(serializers.Serializer):
 
     def validate(self, data):
         """
-        Custom validation that confirms all required fields are in data json
+        Custom validation that confirms all required fields are in data json.
+        The validator plans are taken from the 'plans' context, keyed by risk
+        model id, when given.
         """
-        fields = models.RiskModel.objects.get(
-            id=data["risk_model"]
-        ).fields.all()
-        for field in fields:
+        try:
+            plans = self.context.get("plans")
+            plan = (
+                plans[data["risk_model"]]
+                if plans is not None
+                else validator_plan.get_plan(data["risk_model"])
+            )
+        except models.RiskModel.DoesNotExist:
+            raise serializers.ValidationError(
+                {"risk_model": ["Risk model does not exist."]}
+            )
+        for field in plan.fields.values():
             if field.required and field.slug not in data["data"]:
                 raise serializers.ValidationError(
                     {"data": [f"{field.name} is required."]}
@@ -1,10 +1,27 @@
+import json
+from collections.abc import Iterator
+
+from django.http import StreamingHttpResponse
+from django.utils.text import slugify
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.utils import encoders
 
 from .. import models
-from ..utils import serializer_helpers
-from . import serializers
+from ..utils import (
+    exports,
+    field_types,
+    filters,
+    http_cache,
+    serializer_helpers,
+    stats,
+    storage,
+    validator_plan,
+)
+from . import pagination, parsers, renderers, serializers
 
 
 class RiskModelViewSet(
@@ -19,14 +36,87 @@ class RiskModelViewSet(
     """
 
     serializer_class = serializers.RiskModelSerializer
-    queryset = models.RiskModel.objects.all().order_by("-id")
+    # the non deleted fields are prefetched in 'order'
+    queryset = models.RiskModel.objects.prefetch_related("fields").order_by(
+        "-id"
+    )
+    pagination_class = pagination.IdCursorPagination
+
+    def list(self, request, *args, **kwargs):
+        """
+        lists the risk models, or returns a 304 without serializing them if
+        the client has the current version of the requested page
+        """
+        etag, last_modified = http_cache.risk_models_version(
+            request.META.get("QUERY_STRING", ""),
+            request.accepted_renderer.format,
+        )
+        response = http_cache.not_modified(request, etag, last_modified)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return http_cache.patch_cache_headers(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        retrieves a risk model, or returns a 304 without serializing it if
+        the client has its current version
+        """
+        version = http_cache.risk_model_version(
+            kwargs[self.lookup_field], request.accepted_renderer.format
+        )
+        if version is None:
+            return super().retrieve(request, *args, **kwargs)
+        response = http_cache.not_modified(request, *version)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return http_cache.patch_cache_headers(response, *version)
+
+    @action(detail=True, renderer_classes=renderers.table_stream_renderers())
+    def export(self, request, pk=None):
+        """
+        streams the successful submissions of a risk model as a table, one
+        row per submission and one column per field slug. The format query
+        param selects csv (default), ndjson or parquet.
+        """
+        risk_model = self.get_object()
+        fields = list(risk_model.fields.all())
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f"{content_type}; charset={renderer.charset}"
+        response = StreamingHttpResponse(
+            renderer.stream(
+                exports.export_columns(fields),
+                exports.export_rows(risk_model.id, fields),
+            ),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{slugify(risk_model.name)}.'
+            f'{renderer.format}"'
+        )
+        return response
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """
+        returns the dashboard stats of a risk model's successful
+        submissions, aggregated in the db
+        """
+        risk_model = self.get_object()
+        return Response(
+            stats.risk_model_stats(
+                risk_model.id, list(risk_model.fields.all())
+            )
+        )
 
     @action(detail=False)
     def field_types(self, request):
         """
-        route for fetching the list of field type choices
+        route for fetching the list of field type choices, with their
+        validation attributes, served from bytes serialized at import
         """
-        return Response(models.FieldName().field_choices())
+        return field_types.field_types_response(request)
 
 
 class RiskDataViewSet(viewsets.ViewSet):
@@ -48,13 +138,40 @@ class RiskDataViewSet(viewsets.ViewSet):
             risk_data.create_fields_data(), status=status.HTTP_201_CREATED
         )
 
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, parsers.NDJSONParser],
+    )
+    def bulk(self, request):
+        """
+        creates the risk data of a JSON array or NDJSON stream of
+        submissions, returning a result per submission.
+        An NDJSON body is parsed and answered as a stream, one result per
+        line, so memory use is bounded by the chunk size, not the body size.
+        """
+        if not isinstance(request.data, (list, Iterator)):
+            raise ValidationError(
+                {"non_field_errors": ["Expected a list of submissions."]}
+            )
+        risk_data = serializer_helpers.BulkRiskDataProcessor(request.data)
+        results = risk_data.create_fields_data()
+        if isinstance(request.data, list):
+            return Response(list(results))
+        return StreamingHttpResponse(
+            (
+                json.dumps(result, cls=encoders.JSONEncoder) + "\n"
+                for result in results
+            ),
+            content_type=parsers.NDJSONParser.media_type,
+        )
+
     def retrieve(self, request, pk=None):
         """
-        retrieves the submitted risk data from the FieldValue model
+        retrieves the submitted risk data from its risk data document if
+        it has one, else from the FieldValue model
         """
-        queryset = models.FieldValue.objects.filter(
-            form_submit_id=pk
-        ).order_by("id")
+        queryset = storage.submission_field_values(pk)
         return Response(
             serializers.FieldValueResponseSerializer(
                 queryset, many=True, context={"request": request}
@@ -68,11 +185,14 @@ class RiskDataLogViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     """
 
     serializer_class = serializers.RiskDataLogSerializer
+    pagination_class = pagination.IdCursorPagination
 
     def get_queryset(self):
         """
         This view returns a list of all the successful risk data submission
-        events by filtering against the risk_model portion of the URL.
+        events by filtering against the risk_model portion of the URL, a
+        full-text search of the text values and the field value filters of
+        the risk model's fields.
         """
         queryset = models.FormSubmit.objects.filter(success=True).order_by(
             "-id"
@@ -80,4 +200,34 @@ class RiskDataLogViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
         risk_model = self.request.query_params.get("risk_model", None)
         if risk_model is not None:
             queryset = queryset.filter(risk_model=risk_model)
+        search = self.request.query_params.get("search", None)
+        if search:
+            queryset = filters.search_submissions(queryset, search)
+        if set(self.request.query_params).difference(filters.RESERVED_PARAMS):
+            queryset = filters.filter_submissions(
+                queryset,
+                filters.build_filters(
+                    self.get_plan(risk_model), self.request.query_params
+                ),
+            )
         return queryset
+
+    def get_plan(self, risk_model):
+        """
+        returns the validator plan of the risk model the submissions are
+        filtered by field values of
+        """
+        if risk_model is None:
+            raise ValidationError(
+                {
+                    "risk_model": [
+                        "A risk model is required to filter on fields."
+                    ]
+                }
+            )
+        try:
+            return validator_plan.get_plan(int(risk_model))
+        except (ValueError, models.RiskModel.DoesNotExist):
+            raise ValidationError(
+                {"risk_model": ["Risk model does not exist."]}
+            )
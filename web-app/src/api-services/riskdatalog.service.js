@@ -10,5 +10,14 @@ export default {
    */
   getAll (id) {
     return Axios.get(`${RESOURCE_NAME}/?risk_model=${id}`)
+  },
+
+  /**
+   * getPage() returns an axios request promise object that retrieves the next page of a list.
+   * @param {string} url  'next' url of the previous page.
+   * @return {Promise} GET request Promise object.
+   */
+  getPage (url) {
+    return Axios.get(url)
   }
 }
@@ -1,4 +1,5 @@
 import Axios from 'axios'
+import FieldTypes from '@/field_types.json'
 
 const RESOURCE_NAME = '/risk_model'
 
@@ -11,6 +12,15 @@ export default {
     return Axios.get(RESOURCE_NAME)
   },
 
+  /**
+   * getPage() returns an axios request promise object that retrieves the next page of a list.
+   * @param {string} url  'next' url of the previous page.
+   * @return {Promise} GET request Promise object.
+   */
+  getPage (url) {
+    return Axios.get(url)
+  },
+
   /**
    * get() returns an axios request promise object that retrieves a risk model.
    * @param {number} id  risk model id.
@@ -40,11 +50,12 @@ export default {
   },
 
   /**
-   * getFieldTypes() returns an axios request promise object that retrieves the list of field types.
-   * @return {Promise} GET request Promise object.
+   * getFieldTypes() returns a promise object that resolves to the list of field types, bundled by the build
+   * from the file written by the export_field_types command instead of being fetched.
+   * @return {Promise} Promise object resolving to a {data} response like object.
    */
   getFieldTypes () {
-    return Axios.get(`${RESOURCE_NAME}/field_types/`)
+    return Promise.resolve({ data: FieldTypes })
   }
 
   // FIXME: implement risk model delete